@@ -0,0 +1,4 @@
+"""
+Benchmarks for the concept mapper. Run each module as a script from the
+project root, e.g. `python benchmarks/bench_backups.py`.
+"""
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Bytes written per save: the content-addressed backup store versus the old
+full-copy backups (shutil.copy2 of the state file before every save).
+
+    python benchmarks/bench_backups.py --sizes 1000 10000 --saves 20
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from benchmarks.synthetic import make_concept_map, make_implementation
+from src.utils.state_manager import StateManager
+
+def run(n_implementations: int, saves: int):
+    concept_map = make_concept_map(n_implementations)
+    rng = random.Random(1)
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = StateManager(os.path.join(tmp, "concepts_map.json"))
+        manager.save_state(concept_map)
+        store_before = manager.backups.bytes_written
+
+        state_bytes = legacy_bytes = 0
+        for i in range(saves):
+            previous_size = manager.state_file.stat().st_size
+            concept_map.add_implementation("concept_0", make_implementation(rng, n_implementations + i, 100))
+            manager.save_state(concept_map)
+            size = manager.state_file.stat().st_size
+            state_bytes += size
+            legacy_bytes += previous_size + size  # copy2 of the old file, then the new file
+
+        store_bytes = manager.backups.bytes_written - store_before
+        return {
+            "implementations": n_implementations,
+            "state_size": manager.state_file.stat().st_size,
+            "legacy_per_save": legacy_bytes / saves,
+            "store_per_save": (state_bytes + store_bytes) / saves,
+            "restore_points": len(manager.backups.list_points()),
+            "store_size": manager.backups.total_stored_bytes(),
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--saves", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'impls':>8} {'state file':>12} {'legacy/save':>12} {'store/save':>12} {'ratio':>6} {'points':>7} {'store size':>11}")
+    for n in args.sizes:
+        r = run(n, args.saves)
+        print(f"{r['implementations']:>8} {r['state_size']:>12,} {r['legacy_per_save']:>12,.0f} "
+              f"{r['store_per_save']:>12,.0f} {r['store_per_save'] / r['legacy_per_save']:>6.2f} "
+              f"{r['restore_points']:>7} {r['store_size']:>11,}")
+
+if __name__ == "__main__":
+    main()
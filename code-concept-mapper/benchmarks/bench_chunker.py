@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Chunking a generated source tree for the local index: fixed windows of
+--max-tokens with --overlap, cut wherever the budget runs out, against the
+AST-aware chunker. Reports how many definitions that would fit in one chunk
+end up cut across chunks, how many tokens the index stores per source
+token, and the throughput and peak memory of streaming the whole tree.
+
+    python benchmarks/bench_chunker.py --files 2000 --workers 1 2
+"""
+import argparse
+import ast
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from benchmarks.synthetic import make_large_module, make_source_tree
+from src.providers.base import CodeChunk
+from src.providers.chunker import FileChunker, iter_chunks
+from src.utils.symbol_index import walk_source_files
+from src.utils.tokens import count_tokens
+
+def fixed_windows(rel_path: str, content: str, max_tokens: int, overlap: int):
+    """Windows of whole lines holding up to `max_tokens` tokens, each starting `overlap` tokens back."""
+    lines = content.split("\n")
+    counts = [count_tokens(line) for line in lines]
+    start = 0
+    while start < len(lines):
+        end, total = start, 0
+        while end < len(lines) and (end == start or total + counts[end] <= max_tokens):
+            total += counts[end]
+            end += 1
+        yield CodeChunk(rel_path, start + 1, end, "\n".join(lines[start:end]), None)
+        if end >= len(lines):
+            return
+        back, shared = end, 0
+        while back - 1 > start and shared + counts[back - 1] <= overlap:
+            back -= 1
+            shared += counts[back]
+        start = back
+
+def iter_fixed_windows(root: str, max_tokens: int, overlap: int):
+    for rel_path in walk_source_files(root):
+        with open(os.path.join(root, rel_path), "r", encoding="utf-8") as f:
+            yield from fixed_windows(rel_path, f.read(), max_tokens, overlap)
+
+def cut_definitions(root: str, chunks: list, max_tokens: int) -> tuple:
+    """(definitions fitting the budget, how many of them no single chunk contains whole)."""
+    by_file = {}
+    for chunk in chunks:
+        by_file.setdefault(chunk.file_path, []).append((chunk.line_start, chunk.line_end))
+    fitting = cut = 0
+    for rel_path, spans in by_file.items():
+        with open(os.path.join(root, rel_path), "r", encoding="utf-8") as f:
+            content = f.read()
+        counter = FileChunker(rel_path, content)
+        for node in ast.walk(ast.parse(content)):
+            if isinstance(node, (ast.FunctionDef, ast.ClassDef)):
+                start = min([node.lineno] + [d.lineno for d in node.decorator_list])
+                if counter.tokens(start, node.end_lineno) > max_tokens:
+                    continue
+                fitting += 1
+                cut += not any(s <= start and node.end_lineno <= e for s, e in spans)
+    return fitting, cut
+
+def stream(chunks) -> tuple:
+    """Consumes a chunk stream as the index builder does, returning (chunks, tokens, seconds, peak MB)."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    count = tokens = 0
+    for chunk in chunks:
+        count += 1
+        tokens += count_tokens(chunk.content)
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return count, tokens, seconds, peak / 2 ** 20
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--large-files", type=int, default=5, help="Extra 5,000-line modules in the tree.")
+    parser.add_argument("--max-tokens", type=int, default=250)
+    parser.add_argument("--overlap", type=int, default=50)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        make_source_tree(root, args.files)
+        for i in range(args.large_files):
+            with open(os.path.join(root, f"large_{i}.py"), "w", encoding="utf-8") as f:
+                f.write(make_large_module(5000, seed=i))
+        source_tokens = 0
+        for rel_path in walk_source_files(root):
+            with open(os.path.join(root, rel_path), "r", encoding="utf-8") as f:
+                source_tokens += count_tokens(f.read())
+        print(f"{args.files + args.large_files} files, {source_tokens:,} tokens, "
+              f"budget {args.max_tokens} tokens, overlap {args.overlap}")
+        print(f"{'chunker':<16} {'chunks':>8} {'tokens/source':>14} {'cut defs':>10} {'files/s':>9} {'peak MB':>8}")
+        runs = [("fixed windows", lambda: iter_fixed_windows(root, args.max_tokens, args.overlap))]
+        runs += [(f"ast, {w} worker(s)", lambda w=w: iter_chunks(root, args.max_tokens, args.overlap, w))
+                 for w in args.workers]
+        for name, make in runs:
+            count, tokens, seconds, peak = stream(make())
+            fitting, cut = cut_definitions(root, list(make()), args.max_tokens)
+            print(f"{name:<16} {count:>8,} {tokens / source_tokens:>14.2f} {cut / fitting:>9.1%} "
+                  f"{(args.files + args.large_files) / seconds:>9.0f} {peak:>8.1f}")
+
+if __name__ == "__main__":
+    main()
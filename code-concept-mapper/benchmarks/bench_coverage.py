@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Coverage of a large taxonomy: every concept through the local BM25 index,
+cold and from the retrieval cache, and through a simulated remote provider
+where rows stream out as results arrive.
+
+    python benchmarks/bench_coverage.py --concepts 1000 --chunks 100000
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from benchmarks.synthetic import make_code_chunks, make_vocabulary
+from src.business_logic.coverage import CoverageWriter, stream_coverage
+from src.providers.base import RetrievalQuery
+from src.providers.cache import CachedProvider, RetrievalCache
+from src.providers.fake_provider import FakeProvider
+from src.providers.local_provider import BM25Index, LocalProvider
+
+class TimedWriter(CoverageWriter):
+    """Records when the first rows were written."""
+    first_write = None
+
+    def write(self, rows):
+        if self.first_write is None:
+            self.first_write = time.perf_counter()
+        super().write(rows)
+
+def run(provider, queries, path) -> str:
+    with open(path, "w", encoding="utf-8") as f:
+        writer = TimedWriter(f, "jsonl")
+        start = time.perf_counter()
+        summary = asyncio.run(stream_coverage(provider, queries, writer, max_concurrency=32))
+        elapsed = time.perf_counter() - start
+    first = (writer.first_write - start) if writer.first_write else elapsed
+    return (f"{elapsed:.2f}s, first rows after {first:.3f}s, {summary['covered']}/{summary['concepts']} covered, "
+            f"{summary['rows']} rows ({os.path.getsize(path) / 2 ** 20:.1f} MB), {summary['cached']} cached")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concepts", type=int, default=1000)
+    parser.add_argument("--chunks", type=int, default=100000)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds per simulated remote call.")
+    args = parser.parse_args()
+
+    rng = random.Random(2)
+    words = make_vocabulary(5000)
+    queries = [RetrievalQuery(f"Concept {c} " + " ".join(rng.sample(words, 4)), top_k=20, concept=f"concept_{c}")
+               for c in range(args.concepts)]
+    chunks = make_code_chunks(args.chunks)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        BM25Index.build(chunks, os.path.join(tmp, "index"))
+        cached = CachedProvider(LocalProvider(os.path.join(tmp, "index")),
+                                RetrievalCache(os.path.join(tmp, "cache.sqlite3")))
+        report = os.path.join(tmp, "coverage.jsonl")
+        print(f"local BM25, {args.chunks} chunks, cold:  {run(cached, queries, report)}")
+        print(f"local BM25, {args.chunks} chunks, cached: {run(cached, queries, report)}")
+
+        results = {q.text: chunks[i * 20 % len(chunks):i * 20 % len(chunks) + 20] for i, q in enumerate(queries)}
+        remote = FakeProvider(results, latency=args.latency)
+        print(f"remote, {args.latency * 1000:.0f} ms per call, 32 in flight: {run(remote, queries, report)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Dense index over generated code chunks: size, open time, and search time
+for a batch of queries scored as one matrix product against one query at
+a time, for float16 and int8 storage. Recall@k is measured against exact
+float32 scores.
+
+    python benchmarks/bench_dense_index.py --chunks 100000 --queries 500
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from benchmarks.synthetic import make_code_chunks, make_vocabulary
+from src.providers.local_provider import VECTORS_FILE, DenseIndex, HashingEmbedding
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--top-k", type=int, default=10)
+    args = parser.parse_args()
+
+    chunks = make_code_chunks(args.chunks)
+    rng = random.Random(1)
+    words = make_vocabulary(20000)
+    queries = [" ".join(rng.choice(words[:5000]) for _ in range(rng.randint(2, 4))) for _ in range(args.queries)]
+    embedding = HashingEmbedding(args.dim)
+
+    start = time.perf_counter()
+    exact = embedding([c.content for c in chunks])
+    print(f"embed {len(chunks)} chunks: {time.perf_counter() - start:.2f}s")
+    query_vectors = embedding(queries)
+    exact_scores = query_vectors @ exact.T
+    exact_top = np.argsort(-exact_scores, axis=1)[:, :args.top_k]
+
+    for dtype in ("float16", "int8"):
+        with tempfile.TemporaryDirectory() as tmp:
+            start = time.perf_counter()
+            DenseIndex.build(chunks, tmp, embedding, dtype)
+            build_seconds = time.perf_counter() - start
+            size = os.path.getsize(os.path.join(tmp, VECTORS_FILE)) / 2 ** 20
+
+            start = time.perf_counter()
+            index = DenseIndex(tmp, embedding)
+            open_ms = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            batched = index.search_many(queries, args.top_k)
+            batch_seconds = time.perf_counter() - start
+
+            sample = queries[:20]
+            start = time.perf_counter()
+            for query in sample:
+                index.search(query, args.top_k)
+            single_seconds = (time.perf_counter() - start) / len(sample) * len(queries)
+
+            positions = {(c.file_path, c.line_start, c.identifier): i for i, c in enumerate(chunks)}
+            recall = np.mean([len({positions[(c.file_path, c.line_start, c.identifier)] for c in results}
+                                  & set(exact_top[q].tolist())) / args.top_k
+                              for q, results in enumerate(batched)])
+            print(f"{dtype}: build {build_seconds:.2f}s, matrix {size:.1f} MB, open {open_ms:.1f} ms, "
+                  f"{len(queries)} queries batched {batch_seconds:.2f}s vs one by one {single_seconds:.2f}s, "
+                  f"recall@{args.top_k} {recall:.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+JavaScript/TypeScript definition locator: tokenizer and locator throughput
+on one large generated file, then the repository indexer on a generated
+tree of Express router modules, by number of worker processes.
+
+    python benchmarks/bench_js_locator.py --files 5000 --lines 100000 --workers 1 2 4
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from benchmarks.synthetic import make_js_module_source, make_js_source_tree
+from src.utils import code_parser
+from src.utils.js_locator import DefinitionLocator, tokenize
+from src.utils.symbol_index import RepositoryIndexer, SymbolIndex
+
+def make_large_js_module(n_lines: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    parts, lines, index = [], 0, 0
+    while lines < n_lines:
+        part = make_js_module_source(rng, index)
+        parts.append(part)
+        lines += part.count("\n")
+        index += 1
+    return "".join(parts)
+
+def best_of(repeat: int, run) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=5000)
+    parser.add_argument("--lines", type=int, default=100000, help="Lines of the single large file.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    content = make_large_js_module(args.lines)
+    n_lines, megabytes = content.count("\n"), len(content.encode("utf-8")) / 2 ** 20
+    tokenized = best_of(args.repeat, lambda: tokenize(content))
+    located = best_of(args.repeat, lambda: DefinitionLocator(content).locate())
+    symbols = len(DefinitionLocator(content).locate())
+    print(f"one file: {n_lines:,} lines, {megabytes:.1f} MB, {symbols:,} symbols")
+    print(f"   tokenize {tokenized:.3f}s, tokenize + locate {located:.3f}s "
+          f"({n_lines / located:,.0f} lines/s, {megabytes / located:.1f} MB/s)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.join(tmp, "repo")
+        make_js_source_tree(root, args.files)
+        print(f"{args.files} files, {os.cpu_count()} core(s)")
+        print(f"{'workers':>8} {'seconds':>9} {'files/s':>9} {'symbols':>9}")
+        index = None
+        for workers in args.workers:
+            index = SymbolIndex(os.path.join(tmp, f"index_{workers}.sqlite3"))
+            stats = RepositoryIndexer(root, index, workers=workers).build()
+            print(f"{workers:>8} {stats['seconds']:>9.2f} {stats['files_per_second']:>9.0f} {stats['symbols']:>9}")
+
+        paths = [(os.path.join(root, f"routes_{i // 100}", f"module_{i}.js"), f"router.get /items{i}/3/:id")
+                 for i in range(0, args.files, max(1, args.files // 200))]
+        def lookups():
+            for path, identifier in paths:
+                code_parser.clear_parse_cache()
+                assert code_parser.find_lines_by_identifier(path, identifier)[0]
+        parsed = best_of(1, lookups) / len(paths)
+        code_parser.set_symbol_index(index)
+        indexed = best_of(1, lookups) / len(paths)
+        code_parser.set_symbol_index(None)
+        print(f"lookup: {parsed * 1e3:.2f} ms locating, {indexed * 1e3:.2f} ms from the index")
+
+if __name__ == "__main__":
+    main()
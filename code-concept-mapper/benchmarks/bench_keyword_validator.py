@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Keyword validation of generated code chunks: one `in` check per concept and
+keyword against the single token automaton, for taxonomies of growing size.
+
+    python benchmarks/bench_keyword_validator.py --chunks 5000 --concepts 3 100 1000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from benchmarks.synthetic import make_module_source
+from phase1_validation.validators.keyword_validators import KeywordValidator
+
+PYTHON_CORE = {
+    "context_managers": ["__enter__", "__exit__", "contextmanager", "with"],
+    "decorators": ["@", "functools.wraps", "wrapper"],
+    "generators": ["yield", "yield from", "generator"],
+}
+
+def make_taxonomy(n_concepts: int, rng: random.Random) -> dict:
+    """The python_core keywords plus synthetic concepts whose keywords mostly do not occur."""
+    concepts = dict(list(PYTHON_CORE.items())[:n_concepts])
+    for c in range(len(concepts), n_concepts):
+        concepts[f"concept_{c}"] = [f"kw_{c}_{k}" for k in range(6)] + [f"value * {rng.randint(1, 99)}", f"step_{c}"]
+    return concepts
+
+def make_chunks(n_chunks: int, rng: random.Random) -> list:
+    chunks = []
+    for i in range(n_chunks // 20 + 1):
+        source = make_module_source(rng, i)
+        chunks.extend(part for part in source.split("\n\n") if part.strip())
+    return chunks[:n_chunks]
+
+def naive(concepts: dict, chunks: list) -> list:
+    return [{key: {kw: chunk.count(kw) for kw in keywords if kw in chunk}
+             for key, keywords in concepts.items() if any(kw in chunk for kw in keywords)}
+            for chunk in chunks]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=5000)
+    parser.add_argument("--concepts", type=int, nargs="+", default=[3, 100, 1000])
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    chunks = make_chunks(args.chunks, rng)
+    print(f"{len(chunks)} chunks, {sum(map(len, chunks)):,} characters")
+    print(f"{'concepts':>9} {'keywords':>9} {'`in` checks s':>14} {'automaton s':>12} {'speedup':>8}")
+    for n_concepts in args.concepts:
+        concepts = make_taxonomy(n_concepts, rng)
+        start = time.perf_counter()
+        naive(concepts, chunks)
+        naive_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        KeywordValidator(concepts).validate_many(chunks)
+        automaton_seconds = time.perf_counter() - start
+        print(f"{n_concepts:>9} {sum(map(len, concepts.values())):>9} {naive_seconds:>14.3f} "
+              f"{automaton_seconds:>12.3f} {naive_seconds / automaton_seconds:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
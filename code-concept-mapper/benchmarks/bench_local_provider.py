@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+BM25 index over generated code chunks: build time, open time and query
+latency, against scoring with a Python loop over the same postings.
+
+    python benchmarks/bench_local_provider.py --chunks 100000 --queries 200
+"""
+import argparse
+import math
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from benchmarks.synthetic import make_code_chunks, make_vocabulary
+from src.providers.local_provider import BM25Index, tokenize_code
+
+def python_scores(index: BM25Index, query: str) -> dict:
+    """BM25 accumulated posting by posting, as a plain Python implementation would."""
+    n = len(index)
+    scores = {}
+    norm = index._norm.tolist()
+    for term in dict.fromkeys(tokenize_code(query)):
+        term_id = index._terms.find(term)
+        if term_id is None:
+            continue
+        start, end = int(index._posting_offsets[term_id]), int(index._posting_offsets[term_id + 1])
+        idf = math.log(1 + (n - (end - start) + 0.5) / (end - start + 0.5))
+        for doc, freq in zip(index._docs[start:end].tolist(), index._freqs[start:end].tolist()):
+            scores[doc] = scores.get(doc, 0.0) + idf * (index.k1 + 1) * freq / (freq + norm[doc])
+    return scores
+
+def percentile(values: list, q: float) -> float:
+    return sorted(values)[min(len(values) - 1, int(q * len(values)))]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    chunks = make_code_chunks(args.chunks)
+    rng = random.Random(1)
+    words = make_vocabulary(20000)
+    # Mostly mid-frequency words, plus some of the most common ones.
+    queries = [" ".join(rng.choice(words[:50] if rng.random() < 0.3 else words[50:5000])
+                        for _ in range(rng.randint(2, 4))) for _ in range(args.queries)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        index = BM25Index.build(chunks, tmp)
+        print(f"build: {time.perf_counter() - start:.2f}s for {len(index)} chunks, "
+              f"{index.meta['terms']} terms, {index.meta['postings']} postings")
+        del index
+
+        start = time.perf_counter()
+        index = BM25Index(tmp)
+        print(f"open: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+        latencies = []
+        for query in queries:
+            start = time.perf_counter()
+            index.search(query, 10)
+            latencies.append((time.perf_counter() - start) * 1000)
+        print(f"search (numpy): p50 {statistics.median(latencies):.2f} ms, p95 {percentile(latencies, 0.95):.2f} ms, "
+              f"p99 {percentile(latencies, 0.99):.2f} ms")
+
+        latencies = []
+        for query in queries[:50]:
+            start = time.perf_counter()
+            scores = python_scores(index, query)
+            sorted(scores, key=scores.get, reverse=True)[:10]
+            latencies.append((time.perf_counter() - start) * 1000)
+        print(f"search (Python loop): p50 {statistics.median(latencies):.2f} ms, p95 {percentile(latencies, 0.95):.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Memory held by a loaded concept map: the slotted, interned Implementation
+against the plain dataclass it replaced. Both are built from the same JSON
+text, the way StateManager.load_state builds them.
+
+    python benchmarks/bench_models_memory.py --sizes 10000 100000
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import tracemalloc
+from dataclasses import dataclass
+from unittest.mock import patch
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from benchmarks.synthetic import make_concept_map
+from src.domain.models import ConceptMap
+from src.utils.state_manager import StateManager
+
+@dataclass
+class LegacyImplementation:
+    file_path: str
+    identifier: str
+    line_start: int
+    line_end: int
+    code_snippet: str
+    confidence: str
+    pattern_type: str
+    evidence: str
+    added_at: str
+
+def load_legacy(text: str):
+    data = json.loads(text)
+    return {
+        key: [LegacyImplementation(**impl) for impl in concept["implementations"]]
+        for key, concept in data["concepts"].items()
+    }
+
+def load_compact(text: str):
+    return StateManager(os.devnull)._deserialize(json.loads(text))
+
+def measure(loader, text: str) -> int:
+    gc.collect()
+    tracemalloc.start()
+    loaded = loader(text)
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del loaded
+    return current
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--shared-fraction", type=float, default=0.2,
+                        help="Fraction of implementations that repeat code mapped to another concept.")
+    args = parser.parse_args()
+
+    print(f"{'impls':>8} {'legacy MB':>10} {'compact MB':>11} {'saved':>6} {'+ indexes MB':>13} {'bytes/impl':>11}")
+    for n in args.sizes:
+        concept_map = make_concept_map(n, shared_fraction=args.shared_fraction)
+        text = json.dumps(StateManager(os.devnull)._serialize(concept_map))
+        del concept_map
+        legacy = measure(load_legacy, text)
+        load_compact(text)  # warm up: grow the interpreter's interned-string table outside the measurement
+        # The legacy model had no indexes, so compare the representation alone first.
+        with patch.object(ConceptMap, "rebuild_indexes", lambda self: None):
+            compact = measure(load_compact, text)
+        indexed = measure(load_compact, text)
+        print(f"{n:>8} {legacy / 1e6:>10.1f} {compact / 1e6:>11.1f} {1 - compact / legacy:>6.0%} "
+              f"{indexed / 1e6:>13.1f} {indexed / n:>11.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+A 500-concept batch through the async provider contract: one query after
+another against `retrieve_many` at growing concurrency, for a simulated
+remote provider (fixed latency per call) and the local dense provider.
+
+    python benchmarks/bench_providers.py --concepts 500 --latency 0.05
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from benchmarks.synthetic import make_code_chunks, make_vocabulary
+from src.providers.base import RetrievalQuery
+from src.providers.fake_provider import FakeProvider
+from src.providers.local_provider import DenseIndex, LocalProvider
+
+async def one_by_one(provider, queries):
+    return [await provider.retrieve(query) for query in queries]
+
+def timed(coroutine) -> float:
+    start = time.perf_counter()
+    asyncio.run(coroutine)
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concepts", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds per simulated remote call.")
+    parser.add_argument("--chunks", type=int, default=100000, help="Chunks in the local dense index.")
+    args = parser.parse_args()
+
+    words = make_vocabulary(5000)
+    queries = [RetrievalQuery(f"{words[i]} {words[-i - 1]}", top_k=10, concept=f"concept_{i}")
+               for i in range(args.concepts)]
+
+    remote = FakeProvider(latency=args.latency)
+    print(f"simulated remote, {args.latency * 1000:.0f} ms per call:")
+    print(f"  one by one: {timed(one_by_one(remote, queries)):.2f}s")
+    for concurrency in (8, 32, 128, args.concepts):
+        print(f"  retrieve_many, {concurrency} at a time: "
+              f"{timed(remote.retrieve_many(queries, max_concurrency=concurrency)):.2f}s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        DenseIndex.build(make_code_chunks(args.chunks), tmp, dtype="int8")
+        local = LocalProvider(tmp)
+        print(f"local dense provider, {len(local.index)} chunks:")
+        print(f"  one by one: {timed(one_by_one(local, queries)):.2f}s")
+        for concurrency in (8, 32, 128, args.concepts):
+            print(f"  retrieve_many, {concurrency} per search: "
+                  f"{timed(local.retrieve_many(queries, max_concurrency=concurrency)):.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Reranking retrieved candidates with the multi-signal ranker: one vectorized
+pass over a whole batch, against scoring every candidate in a Python loop.
+The ranker is timed cold, then again on the same batch with the keywords
+of its chunks already known, as when streamed results are reranked.
+
+    python benchmarks/bench_rankers.py --concepts 100 500 --candidates 20 100
+"""
+import argparse
+import heapq
+import os
+import random
+import sys
+import time
+from fnmatch import fnmatchcase
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from benchmarks.synthetic import make_code_chunks, make_vocabulary
+from src.business_logic.rankers import DEFINITION_START, MultiSignalRanker
+from src.providers.base import CodeChunk
+from src.utils.tokens import keyword_tokens, tokenize
+
+def make_batch(n_concepts: int, n_candidates: int, pool: list, rng: random.Random):
+    """Concept keywords and, per concept, `n_candidates` scored chunks drawn from a shared pool."""
+    words = make_vocabulary(20000)[:2000]
+    keywords = {f"concept_{c}": rng.sample(words, 6) + [f"self . {rng.choice(words)}"] for c in range(n_concepts)}
+    candidates = []
+    for _ in range(n_concepts):
+        chosen = rng.sample(pool, n_candidates)
+        candidates.append([CodeChunk(c.file_path if rng.random() > 0.1 else "tests/" + c.file_path, c.line_start,
+                                     c.line_end, c.content, c.identifier, rng.uniform(1, 20)) for c in chosen])
+    return keywords, list(keywords), candidates
+
+def naive(ranker: MultiSignalRanker, keywords: dict, concepts: list, candidates: list, top_k: int):
+    """Every signal of every candidate computed on its own, one query at a time."""
+    w = ranker.weights
+    ranked = []
+    for concept, chunks in zip(concepts, candidates):
+        best = max((c.score for c in chunks), default=0.0)
+        wanted = [keyword_tokens(k) for k in keywords.get(concept, [])]
+        scored = []
+        for i, chunk in enumerate(chunks):
+            tokens = tokenize(chunk.content)
+            grams = {tuple(tokens[j:j + n]) for n in {len(k) for k in wanted} for j in range(len(tokens))}
+            hits = len({k for k in wanted if k in grams})
+            keyword = min(1.0, hits / min(len(wanted), ranker.keyword_saturation)) if wanted else 0.0
+            aligned = 0.5 * (chunk.identifier is not None) + 0.5 * bool(DEFINITION_START.match(chunk.content))
+            prior = min(1.0, max(-1.0, sum(p for pattern, p in ranker.path_priors
+                                           if fnmatchcase(chunk.file_path, pattern))))
+            score = (w.retrieval * (chunk.score / best if best > 0 else 0.0) + w.keywords * keyword
+                     + w.alignment * aligned + w.path * prior)
+            scored.append((score, -i, chunk))
+        ranked.append([c for _, _, c in heapq.nlargest(top_k, scored, key=lambda t: t[:2])])
+    return ranked
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concepts", type=int, nargs="+", default=[100, 500])
+    parser.add_argument("--candidates", type=int, nargs="+", default=[20, 100])
+    parser.add_argument("--pool", type=int, default=20000, help="Distinct chunks the candidates are drawn from.")
+    parser.add_argument("--top-k", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    pool = make_code_chunks(args.pool)
+    print(f"{'concepts':>9} {'per concept':>12} {'candidates':>11} {'loop s':>8} {'cold s':>8} {'warm s':>8} {'speedup':>8}")
+    for n_concepts in args.concepts:
+        for n_candidates in args.candidates:
+            keywords, concepts, candidates = make_batch(n_concepts, n_candidates, pool, rng)
+            ranker = MultiSignalRanker(keywords)
+            start = time.perf_counter()
+            expected = naive(ranker, keywords, concepts, candidates, args.top_k)
+            loop_seconds = time.perf_counter() - start
+            start = time.perf_counter()
+            ranked = ranker.rank(concepts, candidates, args.top_k)
+            cold_seconds = time.perf_counter() - start
+            assert [[r.chunk for r in q] for q in ranked] == expected
+            start = time.perf_counter()
+            ranker.rank(concepts, candidates, args.top_k)
+            warm_seconds = time.perf_counter() - start
+            print(f"{n_concepts:>9} {n_candidates:>12} {n_concepts * n_candidates:>11,} {loop_seconds:>8.3f} "
+                  f"{cold_seconds:>8.3f} {warm_seconds:>8.3f} {loop_seconds / cold_seconds:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
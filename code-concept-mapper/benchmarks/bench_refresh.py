@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+`refresh` over a map with one mapping per definition of a generated source
+tree: with nothing changed, and after a line is inserted at the top of 10%
+of the files. Run with and without a persistent symbol index.
+
+    python benchmarks/bench_refresh.py --files 1000 --workers 1 2
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from benchmarks.synthetic import make_source_tree
+from src.business_logic.concept_mapping_service import ConceptMappingService
+from src.domain.models import Concept, Implementation
+from src.utils import code_parser
+from src.utils.state_manager import StateManager
+from src.utils.symbol_index import RepositoryIndexer, SymbolIndex, walk_source_files
+
+def _implementation(path, symbol, source) -> Implementation:
+    return Implementation(file_path=path, identifier=symbol.qualname, line_start=symbol.line_start,
+                          line_end=symbol.line_end, code_snippet=source.snippet(symbol.line_start, symbol.line_end),
+                          confidence="high", pattern_type="definition", evidence="bench", added_at="2025-12-05")
+
+def build_map(root: str, state_path: str) -> int:
+    manager = StateManager(state_path, keep_backups=False, serializer="fast")
+    state = manager.initialize_state("bench")
+    state.add_concept("methods", Concept(display_name="Methods", definition="Every definition."))
+    count = 0
+    for rel_path in walk_source_files(root):
+        path = os.path.join(root, rel_path)
+        source = code_parser.get_source_file(path)
+        for symbol in source.symbols.symbols:
+            state.add_implementation("methods", _implementation(path, symbol, source))
+            count += 1
+    manager.save_state(state)
+    return count
+
+def timed_refresh(state_path: str, workers: int) -> float:
+    service = ConceptMappingService(StateManager(state_path, keep_backups=False, serializer="fast"))
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        service.refresh_mappings(workers=workers)
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=1000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.join(tmp, "repo")
+        make_source_tree(root, args.files)
+        state_path = os.path.join(tmp, "concepts_map.json")
+        mappings = build_map(root, state_path)
+        print(f"{args.files} files, {mappings} mappings, {os.cpu_count()} core(s)")
+        print(f"{'index':>6} {'workers':>8} {'unchanged s':>12} {'10% moved s':>12}")
+        for use_index in (False, True):
+            for workers in args.workers:
+                make_source_tree(root, args.files)  # restore the original sources
+                build_map(root, state_path)
+                index = None
+                if use_index:
+                    index = SymbolIndex(os.path.join(tmp, "index.sqlite3"))
+                    RepositoryIndexer(root, index, workers=1).build()
+                code_parser.set_symbol_index(index)
+                unchanged = timed_refresh(state_path, workers)
+                for i in range(0, args.files, 10):
+                    path = os.path.join(root, f"pkg_{i // 100}", f"module_{i}.py")
+                    with open(path, "r", encoding="utf-8") as f:
+                        content = f.read()
+                    with open(path, "w", encoding="utf-8") as f:
+                        f.write("# edited\n" + content)
+                if index is not None:
+                    RepositoryIndexer(root, index, workers=1).update()
+                moved = timed_refresh(state_path, workers)
+                print(f"{'yes' if use_index else 'no':>6} {workers:>8} {unchanged:>12.2f} {moved:>12.2f}")
+                code_parser.set_symbol_index(None)
+                if index is not None:
+                    index.close()
+                    os.remove(index.index_path)
+
+if __name__ == "__main__":
+    main()
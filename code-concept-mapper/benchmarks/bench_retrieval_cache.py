@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+The retrieval cache in front of a simulated remote provider: a cold run of
+a concept batch, the same batch again, and the cost of lookups and
+eviction in a cache holding many entries.
+
+    python benchmarks/bench_retrieval_cache.py --concepts 500 --latency 0.05
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from benchmarks.synthetic import make_code_chunks
+from src.providers.base import RetrievalQuery
+from src.providers.cache import CachedProvider, RetrievalCache
+from src.providers.fake_provider import FakeProvider
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concepts", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds per simulated remote call.")
+    parser.add_argument("--entries", type=int, default=100000, help="Entries for the lookup and eviction timing.")
+    args = parser.parse_args()
+
+    pool = make_code_chunks(1000)
+    results = {f"concept {i}": pool[(i * 10) % 1000:(i * 10) % 1000 + 10] for i in range(args.concepts)}
+    queries = [RetrievalQuery(text, top_k=10) for text in results]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = RetrievalCache(os.path.join(tmp, "cache.sqlite3"))
+        provider = CachedProvider(FakeProvider(results, latency=args.latency), cache)
+        for label in ("cold", "warm"):
+            start = time.perf_counter()
+            provider.retrieve_many_sync(queries)
+            print(f"{label}: {time.perf_counter() - start:.3f}s for {len(queries)} queries")
+        print(f"stats: {cache.stats()}")
+
+        big = RetrievalCache(os.path.join(tmp, "big.sqlite3"), max_entries=args.entries)
+        chunks = pool[:10]
+        keys = [big.key("p", "v", f"query {i}") for i in range(args.entries)]
+        start = time.perf_counter()
+        for i in range(0, len(keys), 1000):
+            big.put_many("p", ((key, 10, chunks) for key in keys[i:i + 1000]))
+        print(f"fill {args.entries} entries: {time.perf_counter() - start:.2f}s, "
+              f"{big.stats()['bytes'] / 2 ** 20:.1f} MB")
+        start = time.perf_counter()
+        big.get_many(keys[:1000], [10] * 1000)
+        print(f"1,000 hits: {(time.perf_counter() - start) * 1000:.1f} ms")
+        big.max_entries = args.entries // 2
+        start = time.perf_counter()
+        evicted = big.evict()
+        print(f"evict {evicted} entries: {(time.perf_counter() - start) * 1000:.0f} ms")
+
+if __name__ == "__main__":
+    main()
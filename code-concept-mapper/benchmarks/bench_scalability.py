@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+How the core operations scale: StateManager.load_state and save_state,
+ConceptMappingService.add_mapping (one load and one save of the whole map)
+at growing numbers of implementations, and find_lines_by_identifier on a
+large source file, parsed cold and then from the parse cache.
+
+Each operation is timed as the best of --repeat runs, and its peak memory
+is measured in a separate run under tracemalloc, which would slow the
+timed runs. --save-baseline stores the results; --baseline compares a run
+against them and exits with status 1 if any operation got slower or used
+more memory than the tolerances allow.
+
+    python benchmarks/bench_scalability.py --save-baseline benchmarks/baselines/scalability.json
+    python benchmarks/bench_scalability.py --baseline benchmarks/baselines/scalability.json
+    python benchmarks/bench_scalability.py --sizes 1000 10000 --lines 20000 --repeat 5
+"""
+import argparse
+import contextlib
+import functools
+import gc
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from benchmarks.synthetic import make_concept_map, make_large_module
+from src.business_logic.concept_mapping_service import ConceptMappingService
+from src.utils import code_parser
+from src.utils.state_manager import StateManager
+
+Operation = Tuple[str, Callable[[], None], Callable[[], object]]  # (name, setup, run)
+
+# Operations faster than this are compared on memory only: their timings are mostly noise.
+MIN_COMPARED_SECONDS = 0.005
+
+def measure(setup: Callable[[], None], run: Callable[[], object], repeat: int) -> Dict[str, float]:
+    """The best time of `repeat` runs and the peak memory of one more, each after a fresh setup."""
+    best = float("inf")
+    for _ in range(repeat):
+        setup()
+        gc.collect()
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    setup()
+    gc.collect()
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": round(best, 5), "peak_mb": round(peak / 2 ** 20, 2)}
+
+def state_operations(tmp: str, size: int) -> List[Operation]:
+    """load_state, save_state and add_mapping on a map of `size` implementations."""
+    state_path = os.path.join(tmp, f"state_{size}", "concepts_map.json")
+    os.makedirs(os.path.dirname(state_path))
+    manager = StateManager(state_path)
+    concept_map = make_concept_map(size, shared_fraction=0.2)
+    manager.save_state(concept_map)
+    module = os.path.join(tmp, f"state_{size}", "handlers.py")
+    with open(module, "w", encoding="utf-8") as f:
+        f.write("".join(f"def handler_{i}(value):\n    return value + {i}\n\n" for i in range(1000)))
+
+    loaded = {}
+    added = iter(range(1000))
+
+    def load():
+        loaded["state"] = manager.load_state()
+
+    def save():
+        state = loaded["state"]
+        state.mark_modified()
+        manager.save_state(state)
+
+    def add():
+        with contextlib.redirect_stdout(io.StringIO()):
+            ConceptMappingService(manager).add_mapping(
+                "concept_0", module, f"handler_{next(added)}", None, "high", "function", "bench")
+
+    return [
+        (f"load_state@{size}", lambda: None, load),
+        (f"save_state@{size}", load, save),
+        (f"add_mapping@{size}", lambda: None, add),
+    ]
+
+def parser_operations(tmp: str, n_lines: int) -> List[Operation]:
+    """find_lines_by_identifier on one `n_lines`-line module, cold and from the parse cache."""
+    path = os.path.join(tmp, f"large_{n_lines}.py")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(make_large_module(n_lines))
+    with open(path, "r", encoding="utf-8") as f:
+        n_defs = f.read().count("\nclass ")
+    last = f"Handler{n_defs // 10 - 1}_9.step_4"  # the last class of the last module part
+
+    def find():
+        start, _ = code_parser.find_lines_by_identifier(path, last)
+        assert start is not None, last
+
+    def find_many():
+        for i in range(100):
+            code_parser.find_lines_by_identifier(path, f"Handler{i * n_defs // 1000}_{i % 10}.step_{i % 5}")
+
+    return [
+        (f"find_lines_cold@{n_lines}_lines", code_parser.clear_parse_cache, find),
+        (f"find_lines_cached_x100@{n_lines}_lines", find, find_many),
+    ]
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], time_tolerance: float,
+            memory_tolerance: float) -> List[str]:
+    """A message for every operation slower or bigger than its baseline allows."""
+    regressions = []
+    for name, current in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        if (max(current["seconds"], before["seconds"]) >= MIN_COMPARED_SECONDS
+                and current["seconds"] > before["seconds"] * (1 + time_tolerance)):
+            regressions.append(f"{name}: {current['seconds']:.4f}s vs {before['seconds']:.4f}s")
+        if current["peak_mb"] > before["peak_mb"] * (1 + memory_tolerance) + 0.1:
+            regressions.append(f"{name}: {current['peak_mb']:.2f} MB vs {before['peak_mb']:.2f} MB peak")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--lines", type=int, nargs="+", default=[50000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--baseline", help="Results file to compare against.")
+    parser.add_argument("--save-baseline", help="Write this run's results to a file.")
+    parser.add_argument("--time-tolerance", type=float, default=0.25,
+                        help="Allowed slowdown before a regression is flagged (default: %(default)s).")
+    parser.add_argument("--memory-tolerance", type=float, default=0.10,
+                        help="Allowed peak memory growth before a regression is flagged (default: %(default)s).")
+    args = parser.parse_args()
+
+    results: Dict[str, dict] = {}
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+    print(f"{'operation':<36} {'seconds':>9} {'peak MB':>8} {'baseline s':>11} {'change':>7}")
+    with tempfile.TemporaryDirectory() as tmp:
+        # Each group's data is generated just before it is measured and released after.
+        groups = [functools.partial(state_operations, tmp, size) for size in args.sizes]
+        groups += [functools.partial(parser_operations, tmp, n_lines) for n_lines in args.lines]
+        for name, setup, run in (op for group in groups for op in group()):
+            results[name] = measure(setup, run, args.repeat)
+            before = baseline.get(name)
+            change = f"{results[name]['seconds'] / before['seconds'] - 1:+.0%}" if before and before["seconds"] else ""
+            before_seconds = f"{before['seconds']:.4f}" if before else "-"
+            print(f"{name:<36} {results[name]['seconds']:>9.4f} {results[name]['peak_mb']:>8.2f} "
+                  f"{before_seconds:>11} {change:>7}")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save_baseline)), exist_ok=True)
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump({"python": platform.python_version(), "machine": platform.machine(),
+                       "cpus": os.cpu_count(), "results": results}, f, indent=2)
+            f.write("\n")
+        print(f"✅ Baseline written to {args.save_baseline}")
+    if args.baseline:
+        regressions = compare(results, baseline, args.time_tolerance, args.memory_tolerance)
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s) against {args.baseline}:", file=sys.stderr)
+            for message in regressions:
+                print(f"   {message}", file=sys.stderr)
+            sys.exit(1)
+        print(f"✅ No regressions against {args.baseline}")
+
+if __name__ == "__main__":
+    main()
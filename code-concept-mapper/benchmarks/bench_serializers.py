@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+save_state / load_state times and file sizes for each serializer, plain and
+gzip-compressed. Each timing is the best of --repeat runs.
+
+    python benchmarks/bench_serializers.py --sizes 1000 10000 100000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from benchmarks.synthetic import make_concept_map
+from src.utils.serializers import SERIALIZERS
+from src.utils.state_manager import StateManager
+
+def best_of(repeat: int, fn) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def run(n_implementations: int, serializer: str, compress: bool, repeat: int):
+    concept_map = make_concept_map(n_implementations)
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = StateManager(os.path.join(tmp, "concepts_map.json"), keep_backups=False,
+                               serializer=serializer, compress=compress)
+        save = best_of(repeat, lambda: manager.save_state(concept_map))
+        load = best_of(repeat, manager.load_state)
+        return {
+            "implementations": n_implementations,
+            "format": manager.serializer.name + (" + gzip" if compress else ""),
+            "size": manager.state_file.stat().st_size,
+            "save": save,
+            "load": load,
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'impls':>8} {'format':>16} {'file size':>13} {'save s':>8} {'load s':>8}")
+    for n in args.sizes:
+        for compress in (False, True):
+            for serializer in SERIALIZERS:
+                r = run(n, serializer, compress, args.repeat)
+                print(f"{r['implementations']:>8} {r['format']:>16} {r['size']:>13,} "
+                      f"{r['save']:>8.3f} {r['load']:>8.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""Deterministic synthetic data for the benchmarks."""
+import itertools
+import os
+import random
+
+from src.domain.models import Concept, ConceptMap, Implementation, Metadata
+from src.providers.base import CodeChunk
+
+CONFIDENCES = ("high", "medium", "low")
+PATTERN_TYPES = ("class_definition", "function_decorator", "context_manager_class", "generator_function")
+
+def make_implementation(rng: random.Random, index: int, n_files: int) -> Implementation:
+    file_index = rng.randrange(n_files)
+    line_start = rng.randint(1, 5000)
+    body_lines = rng.randint(3, 30)
+    snippet = "".join(
+        f"    value_{index}_{i} = compute(value_{index}_{i - 1}, {rng.randint(0, 999)})\n"
+        for i in range(body_lines)
+    )
+    return Implementation(
+        file_path=f"corpus/project/pkg_{file_index % 50}/module_{file_index}.py",
+        identifier=f"Handler{index}.process",
+        line_start=line_start,
+        line_end=line_start + body_lines,
+        code_snippet=f"def process(self):\n{snippet}",
+        confidence=rng.choice(CONFIDENCES),
+        pattern_type=rng.choice(PATTERN_TYPES),
+        evidence=f"Calls compute() in a loop over {rng.randint(2, 9)} values.",
+        added_at=f"2025-12-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00.000000",
+    )
+
+def make_concept_map(n_implementations: int, n_concepts: int = 20, seed: int = 0,
+                     shared_fraction: float = 0.0) -> ConceptMap:
+    """
+    Builds a ConceptMap with `n_implementations` spread over `n_concepts`.
+
+    `shared_fraction` of the implementations map code that is already
+    mapped to another concept, as happens when one class is both a context
+    manager and a decorator.
+    """
+    rng = random.Random(seed)
+    n_files = max(1, n_implementations // 10)
+    concept_map = ConceptMap(metadata=Metadata(project="synthetic", version="1.1", created_at="2025-12-05T00:00:00"))
+    for c in range(n_concepts):
+        concept_map.concepts[f"concept_{c}"] = Concept(
+            display_name=f"Concept {c}", definition=f"Synthetic concept number {c}.",
+            keywords=[f"kw{c}", "common"], languages=["python"], category="synthetic",
+        )
+    keys = list(concept_map.concepts)
+    made = []
+    for i in range(n_implementations):
+        if made and rng.random() < shared_fraction:
+            impl = Implementation(**rng.choice(made).to_dict())
+        else:
+            impl = make_implementation(rng, i, n_files)
+            made.append(impl)
+        concept_map.concepts[keys[i % n_concepts]].implementations.append(impl)
+    return concept_map
+
+def make_module_source(rng: random.Random, index: int, n_classes: int = 4, n_methods: int = 5) -> str:
+    """A Python module of `n_classes` classes with `n_methods` methods each, plus a helper function."""
+    parts = ["import os\n\n"]
+    for c in range(n_classes):
+        parts.append(f"class Handler{index}_{c}:\n    \"\"\"Handles case {c}.\"\"\"\n")
+        for m in range(n_methods):
+            parts.append(f"    def step_{m}(self, value):\n")
+            for i in range(rng.randint(2, 8)):
+                parts.append(f"        value = value * {rng.randint(1, 99)} + {i}\n")
+            parts.append("        return value\n\n")
+    parts.append(f"def helper_{index}(items):\n    def key(item):\n        return item[0]\n"
+                 f"    return sorted(items, key=key)\n")
+    return "".join(parts)
+
+def make_large_module(n_lines: int, seed: int = 0) -> str:
+    """One Python module of at least `n_lines` lines: classes of `make_module_source` shape, one after another."""
+    rng = random.Random(seed)
+    parts = []
+    lines = 0
+    index = 0
+    while lines < n_lines:
+        part = make_module_source(rng, index, n_classes=10)
+        parts.append(part)
+        lines += part.count("\n")
+        index += 1
+    return "".join(parts)
+
+def make_source_tree(root: str, n_files: int, seed: int = 0, files_per_dir: int = 100):
+    """Writes `n_files` Python modules under `root`, `files_per_dir` per package."""
+    rng = random.Random(seed)
+    for i in range(n_files):
+        package = os.path.join(root, f"pkg_{i // files_per_dir}")
+        if i % files_per_dir == 0:
+            os.makedirs(package, exist_ok=True)
+            with open(os.path.join(package, "__init__.py"), "w", encoding="utf-8") as f:
+                f.write("")
+        with open(os.path.join(package, f"module_{i}.py"), "w", encoding="utf-8") as f:
+            f.write(make_module_source(rng, i))
+
+def make_js_module_source(rng: random.Random, index: int, n_routes: int = 6, n_methods: int = 5) -> str:
+    """An Express router module: a service class, helper functions, arrow handlers and route registrations."""
+    parts = ["const express = require('express');\nconst router = express.Router();\n\n"]
+    parts.append(f"class Service{index} {{\n  constructor(db) {{\n    this.db = db;\n  }}\n\n")
+    for m in range(n_methods):
+        parts.append(f"  async step{m}(value) {{\n")
+        for i in range(rng.randint(2, 8)):
+            parts.append(f"    value = value * {rng.randint(1, 99)} + {i}; // {{ not a brace\n")
+        parts.append("    return this.db.query(`select ${value}`);\n  }\n\n")
+    parts.append("}\n\n")
+    parts.append(f"function helper{index}(items) {{\n  return items.filter(item => /^[a-z]+$/.test(item.name));\n}}\n\n")
+    for r in range(n_routes):
+        parts.append(f"const handle{r} = async (req, res) => {{\n  const rows = await service.step{r % n_methods}(req.params.id);\n"
+                     f"  res.json({{ rows, total: rows.length / {r + 1} }});\n}};\n\n")
+        parts.append(f"router.get('/items{index}/{r}/:id', auth, handle{r});\n")
+    parts.append("\nmodule.exports = router;\n")
+    return "".join(parts)
+
+def make_js_source_tree(root: str, n_files: int, seed: int = 0, files_per_dir: int = 100):
+    """Writes `n_files` Express router modules under `root`, `files_per_dir` per directory."""
+    rng = random.Random(seed)
+    for i in range(n_files):
+        directory = os.path.join(root, f"routes_{i // files_per_dir}")
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f"module_{i}.js"), "w", encoding="utf-8") as f:
+            f.write(make_js_module_source(rng, i))
+
+SYLLABLES = ("ba", "co", "de", "fi", "ga", "hu", "ka", "lo", "me", "no", "pa", "qui", "ro", "si", "tu", "ve", "xa", "zo")
+
+def make_vocabulary(size: int) -> list:
+    """`size` distinct pronounceable words, shortest first."""
+    words = []
+    for length in itertools.count(2):
+        for parts in itertools.product(SYLLABLES, repeat=length):
+            words.append("".join(parts))
+            if len(words) == size:
+                return words
+
+def make_code_chunks(n_chunks: int, seed: int = 0, vocabulary_size: int = 20000) -> list:
+    """
+    Function-sized CodeChunks whose identifiers are drawn from a Zipf-like
+    vocabulary, so a few words occur in most chunks and most words in few,
+    as in real code.
+    """
+    rng = random.Random(seed)
+    words = make_vocabulary(vocabulary_size)
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(vocabulary_size)))
+    draw = lambda k: rng.choices(words, cum_weights=cum_weights, k=k)
+    chunks = []
+    for i in range(n_chunks):
+        name = "_".join(draw(2))
+        params = ", ".join(draw(rng.randint(1, 3)))
+        lines = [f"def {name}(self, {params}):\n"]
+        for _ in range(rng.randint(3, 12)):
+            target, obj, method, arg = draw(4)
+            lines.append(f"    {target}{method.capitalize()} = self.{obj}_{method}({arg}, {rng.randint(0, 99)})\n")
+        lines.append(f"    return {draw(1)[0]}\n")
+        line_start = rng.randint(1, 2000)
+        chunks.append(CodeChunk(f"pkg_{i % 100}/module_{i // 100}.py", line_start, line_start + len(lines) - 1,
+                                "".join(lines), name))
+    return chunks
@@ -0,0 +1,48 @@
+import asyncio
+import csv
+import io
+import json
+from src.business_logic.coverage import CoverageWriter, coverage_rows, stream_coverage
+from src.providers.base import CodeChunk, RetrievalQuery
+from src.providers.fake_provider import FakeProvider
+
+CHUNKS = [
+    CodeChunk("src/flask/ctx.py", 10, 20, "", "AppContext", 4.0),
+    CodeChunk("src/flask/ctx.py", 30, 40, "", None, 2.5),
+    CodeChunk("src/flask/app.py", 5, 9, "", "Flask.app_context", 1.0),
+    CodeChunk("setup.py", 1, 3, "", "setup", 0.2),
+]
+
+def test_coverage_rows_group_chunks_by_file_and_directory():
+    """Test that a concept's chunks become file rows, then rows for every directory above them."""
+    rows = coverage_rows("context_managers", CHUNKS, min_score=0.5)
+    assert [(r["level"], r["path"], r["chunks"], r["best_score"]) for r in rows] == [
+        ("file", "src/flask/ctx.py", 2, 4.0),
+        ("file", "src/flask/app.py", 1, 1.0),
+        ("directory", "src/flask", 3, 4.0),
+        ("directory", "src", 3, 4.0),
+        ("directory", ".", 3, 4.0),
+    ]
+    assert rows[0]["identifiers"] == ["AppContext", "src/flask/ctx.py:30-40"]
+    assert coverage_rows("context_managers", []) == []
+
+def test_stream_coverage_writes_each_concept_as_it_arrives():
+    """Test that rows are streamed per concept in CSV, with failures and empty concepts summarized."""
+    provider = FakeProvider({"with": CHUNKS[:1], "yield": CHUNKS[2:3]},
+                            failures={"@": RuntimeError("quota exceeded")})
+    queries = [RetrievalQuery("with", concept="context_managers"), RetrievalQuery("@", concept="decorators"),
+               RetrievalQuery("yield", concept="generators"), RetrievalQuery("async", concept="coroutines")]
+    output = io.StringIO()
+    summary = asyncio.run(stream_coverage(provider, queries, CoverageWriter(output, "csv")))
+
+    rows = list(csv.DictReader(io.StringIO(output.getvalue())))
+    assert sorted((r["concept"], r["level"], r["path"]) for r in rows if r["level"] == "file") == [
+        ("context_managers", "file", "src/flask/ctx.py"), ("generators", "file", "src/flask/app.py")]
+    assert rows[0]["identifiers"] in ("AppContext", "Flask.app_context")
+    assert summary["covered"] == 2 and summary["rows"] == len(rows) == 8
+    assert summary["uncovered"] == ["coroutines"]
+    assert summary["errors"] == [{"concept": "decorators", "error": "RuntimeError: quota exceeded"}]
+
+    jsonl = io.StringIO()
+    CoverageWriter(jsonl).write(coverage_rows("generators", CHUNKS[2:3]))
+    assert json.loads(jsonl.getvalue().splitlines()[0])["identifiers"] == ["Flask.app_context"]
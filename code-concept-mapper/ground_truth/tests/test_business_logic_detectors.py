@@ -0,0 +1,123 @@
+import functools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from unittest.mock import MagicMock, patch
+from src.business_logic import detectors
+from src.business_logic.concept_mapping_service import ConceptMappingService
+from src.business_logic.detectors import ConceptDetector, detect_files, detect_source, select_detectors
+from src.domain.models import ConceptMap, Concept, Metadata
+
+SOURCE = '''\
+import functools
+from contextlib import contextmanager
+
+class Resource:
+    def __enter__(self):
+        return self
+    def __exit__(self, *exc):
+        return False
+
+@contextmanager
+def opened(path):
+    yield path
+
+def logged(func):
+    @functools.wraps(func)
+    def wrapper(*args):
+        return func(*args)
+    return wrapper
+
+def retry(times):
+    def decorator(func):
+        def inner(*args):
+            return func(*args)
+        return inner
+    return decorator
+
+def make_adder(n):
+    def add(x):
+        return x + n
+    return add
+
+def outer():
+    def numbers():
+        yield from range(3)
+    key = lambda: (yield)
+    return numbers
+'''
+
+def _found(detections):
+    return [(d.concept, d.qualname, d.pattern_type, d.confidence) for d in detections]
+
+def test_detect_source_runs_every_detector_in_one_pass():
+    """Test that classes and functions are matched against all concepts, in source order."""
+    assert _found(detect_source(SOURCE)) == [
+        ("Context Managers", "Resource", "context_manager_class", "high"),
+        ("Context Managers", "opened", "context_manager_function", "high"),
+        ("Generators", "opened", "generator_function", "high"),
+        ("Decorators", "logged", "function_decorator", "high"),
+        ("Decorators", "retry", "decorator_factory", "high"),
+        ("Decorators", "make_adder", "function_decorator", "low"),
+        ("Generators", "outer.<locals>.numbers", "generator_function", "high"),
+    ]
+    resource = detect_source(SOURCE)[0]
+    assert (resource.line_start, resource.line_end) == (4, 8)
+
+def test_select_detectors_by_taxonomy_concepts():
+    """Test that detection can be restricted to some concepts."""
+    detections = detect_source(SOURCE, detectors=select_detectors(["generators"]))
+    assert {d.concept for d in detections} == {"Generators"}
+
+def test_detect_files_in_parallel(tmp_path):
+    """Test that the process pool yields the same results as scanning inline, in input order."""
+    paths = []
+    for i in range(4):
+        path = tmp_path / f"mod_{i}.py"
+        path.write_text(SOURCE if i % 2 else "def broken(:\n")
+        paths.append(str(path))
+
+    parallel = list(detect_files(paths, workers=2, chunk_size=1))
+    assert [(p, _found(d), e) for p, d, e in parallel] == [(p, _found(d), e) for p, d, e in detect_files(paths, workers=1)]
+    assert [p for p, _, _ in parallel] == paths
+    assert parallel[0][2].startswith("SyntaxError") and len(parallel[1][1]) == 7
+
+class PropertyDetector(ConceptDetector):
+    concept = "Properties"
+
+    def check(self, definition):
+        if "property" in definition.decorators:
+            return self.detection(definition, "property", "high", "Decorated with @property.")
+        return None
+
+def test_registered_detectors_reach_spawned_workers(tmp_path):
+    """Test that detectors registered at run time are used by workers that do not share the parent's memory."""
+    paths = []
+    for i in range(2):
+        path = tmp_path / f"mod_{i}.py"
+        path.write_text("class A:\n    @property\n    def size(self):\n        return 1\n")
+        paths.append(str(path))
+    spawn_pool = functools.partial(ProcessPoolExecutor, mp_context=multiprocessing.get_context("spawn"))
+
+    with patch.object(detectors, "DETECTORS", detectors.DETECTORS + [PropertyDetector()]), \
+            patch.object(detectors, "ProcessPoolExecutor", spawn_pool):
+        results = list(detect_files(paths, ["Properties"], workers=2, chunk_size=1))
+
+    assert [[d.qualname for d in found] for _, found, _ in results] == [["A.size"], ["A.size"]]
+
+def test_detections_feed_add_batch(tmp_path):
+    """Test that detector output is accepted by the add-batch flow."""
+    path = tmp_path / "source.py"
+    path.write_text(SOURCE)
+    state = ConceptMap(metadata=Metadata(project="test", version="1.0"), concepts={
+        key: Concept(display_name=name, definition="...")
+        for key, name in (("context_managers", "Context Managers"), ("decorators", "Decorators"), ("generators", "Generators"))
+    })
+    state_manager = MagicMock()
+    state_manager.load_state.return_value = state
+    state_manager.save_state.return_value = True
+
+    entries = [d.to_batch_entry(str(path)) for d in detect_source(SOURCE)]
+    results = ConceptMappingService(state_manager).add_mappings_batch(entries)
+
+    assert [r["status"] for r in results] == ["added"] * 7
+    assert state.concepts["decorators"].implementations[1].code_snippet.startswith("def retry(times):")
@@ -0,0 +1,57 @@
+import math
+import pytest
+from src.business_logic.evaluation import compare_metrics, evaluate_query, latency_summary, same_file, summarize
+from src.domain.models import Implementation
+from src.providers.base import CodeChunk
+
+def impl(path, start, end):
+    return Implementation(path, None, start, end, "", "high", "t", "e", "2025-12-05T00:00:00")
+
+def chunk(path, start, end):
+    return CodeChunk(path, start, end, "")
+
+IMPLEMENTATIONS = [impl("corpus/flask/src/flask/ctx.py", 10, 30), impl("corpus/flask/src/flask/ctx.py", 50, 60)]
+
+def test_same_file_accepts_paths_relative_to_different_roots():
+    """Test that index paths match mapped paths that include the corpus directory."""
+    assert same_file("src/flask/ctx.py", "corpus/flask/src/flask/ctx.py")
+    assert same_file("./src\\flask/ctx.py", "src/flask/ctx.py")
+    assert not same_file("flask/myctx.py", "src/flask/ctx.py")
+
+def test_evaluate_query_metrics():
+    """Test P@k, recall, reciprocal rank and nDCG, with repeated hits on one implementation gaining once."""
+    chunks = [chunk("src/flask/app.py", 10, 30),   # wrong file
+              chunk("src/flask/ctx.py", 25, 40),   # overlaps the first implementation
+              chunk("src/flask/ctx.py", 12, 14),   # the same implementation again
+              chunk("src/flask/ctx.py", 31, 49),   # between the two
+              chunk("src/flask/ctx.py", 60, 70)]   # overlaps the second
+    e = evaluate_query("context_managers", chunks, IMPLEMENTATIONS, k=5)
+    assert e.relevant_ranks == [2, 3, 5]
+    assert e.precision == pytest.approx(3 / 5)
+    assert e.recall == 1.0
+    assert e.reciprocal_rank == 0.5
+    ideal = 1 + 1 / math.log2(3)
+    assert e.ndcg == pytest.approx((1 / math.log2(3) + 1 / math.log2(6)) / ideal)
+
+    top2 = evaluate_query("context_managers", chunks, IMPLEMENTATIONS, k=2)
+    assert (top2.precision, top2.recall, top2.relevant_ranks) == (0.5, 0.5, [2])
+
+def test_summarize_skips_concepts_without_ground_truth():
+    """Test that means cover judged concepts only, failures score zero, and runs can be compared."""
+    found = evaluate_query("a", [chunk("src/flask/ctx.py", 10, 11)], IMPLEMENTATIONS, k=5)
+    failed = evaluate_query("b", [], IMPLEMENTATIONS, k=5, error="Timed out after 1s.")
+    unjudged = evaluate_query("c", [chunk("x.py", 1, 2)], [], k=5)
+    metrics = summarize([found, failed, unjudged], k=5)
+    assert metrics["precision_at_5"] == pytest.approx(0.1)
+    assert (metrics["mrr"], metrics["hit_rate"]) == (0.5, 0.5)
+    assert (metrics["judged"], metrics["unjudged"], metrics["errors"]) == (2, 1, 1)
+
+    assert compare_metrics(metrics, dict(metrics, mrr=0.25, k=10)) == pytest.approx(
+        {name: 0.25 if name == "mrr" else 0.0 for name in metrics if name != "k"})
+
+def test_latency_summary_percentiles():
+    """Test that latency percentiles are in milliseconds and throughput is over the wall time."""
+    summary = latency_summary([i / 1000 for i in range(1, 101)], wall_seconds=2.0)
+    assert (summary["p50_ms"], summary["p99_ms"], summary["max_ms"]) == (50.5, 99.01, 100.0)
+    assert summary["qps"] == 50.0
+    assert latency_summary([], 0.0)["queries"] == 0
@@ -0,0 +1,60 @@
+import pytest
+from src.business_logic.rankers import MultiSignalRanker, RankingWeights, SIGNALS
+from src.providers.base import CodeChunk, RetrievalQuery, RetrievalResult
+
+KEYWORDS = {
+    "context_managers": ["__enter__", "__exit__", "with", "contextmanager"],
+    "decorators": ["@", "functools.wraps", "wrapper"],
+}
+
+WHOLE_CLASS = CodeChunk("pkg/resource.py", 1, 6, "class Resource:\n    def __enter__(self):\n        return self\n"
+                        "    def __exit__(self, *exc):\n        pass\n", "Resource", score=4.0)
+FRAGMENT = CodeChunk("pkg/other.py", 10, 12, "    x = without_it()\n    return x\n", None, score=8.0)
+IN_TESTS = CodeChunk("tests/test_resource.py", 1, 3, "def test_enter():\n    with Resource():\n        pass\n",
+                     "test_enter", score=6.0)
+WRAPPER = CodeChunk("pkg/deco.py", 1, 5, "def logged(f):\n    @functools.wraps(f)\n    def wrapper(*a):\n"
+                    "        return f(*a)\n    return wrapper\n", "logged", score=2.0)
+
+def test_signals_are_computed_per_candidate():
+    """Test that each signal column reflects its source: scores, keywords, definitions and paths."""
+    ranker = MultiSignalRanker(KEYWORDS)
+    signals = ranker.signals(["context_managers", "decorators"], [[WHOLE_CLASS, FRAGMENT, IN_TESTS], [WRAPPER]])
+    by_name = {name: signals[:, i].tolist() for i, name in enumerate(SIGNALS)}
+
+    assert by_name["retrieval"] == [0.5, 1.0, 0.75, 1.0]
+    # three of the saturating three keywords; `without_it` is not `with`; `with`; @, functools.wraps and wrapper
+    assert by_name["keywords"] == pytest.approx([2 / 3, 0.0, 1 / 3, 1.0])
+    assert by_name["alignment"] == [1.0, 0.0, 1.0, 1.0]
+    assert by_name["path"] == [0.0, 0.0, -1.0, 0.0]
+
+def test_rank_combines_signals_with_weights():
+    """Test that the whole definition outranks a higher-scoring fragment, and weights change the order."""
+    ranker = MultiSignalRanker(KEYWORDS)
+    ranked, = ranker.rank(["context_managers"], [[FRAGMENT, IN_TESTS, WHOLE_CLASS]], top_k=2)
+    assert [r.chunk.identifier for r in ranked] == ["Resource", None]
+    assert ranked[0].signals["keywords"] == pytest.approx(2 / 3)
+
+    retrieval_only = MultiSignalRanker(KEYWORDS, RankingWeights.from_dict({"keywords": 0, "alignment": 0, "path": 0}))
+    ranked, = retrieval_only.rank(["context_managers"], [[WHOLE_CLASS, IN_TESTS, FRAGMENT]], top_k=3)
+    assert [r.chunk.file_path for r in ranked] == ["pkg/other.py", "tests/test_resource.py", "pkg/resource.py"]
+    with pytest.raises(ValueError, match="Unknown ranking signals"):
+        RankingWeights.from_dict({"popularity": 1})
+
+def test_rank_results_handles_unknown_concepts_and_empty_results():
+    """Test that unknown concepts get no keyword signal and failed queries rank nothing."""
+    ranker = MultiSignalRanker(KEYWORDS)
+    results = [RetrievalResult(RetrievalQuery("x", concept="unknown"), [WRAPPER]),
+               RetrievalResult(RetrievalQuery("y", concept="decorators"), [], error="down")]
+    ranked = ranker.rank_results(results)
+    assert [len(r) for r in ranked] == [1, 0]
+    assert ranked[0][0].signals["keywords"] == 0.0
+    assert ranker.rank([], []) == []
+
+def test_keywords_match_whole_token_runs():
+    """Test that multi-token keywords match however they are spaced, but not across token boundaries."""
+    ranker = MultiSignalRanker({"middleware": ["function(req, res, next)", "app.use", "next"],
+                                "other": ["app . use . x", "res"]})
+    found = lambda text: sorted(k for k, i in ranker.keyword_ids.items() if i in ranker.chunk_keywords(text))
+    assert found("app.use(function (req,res,next) {})") == [
+        ("app", ".", "use"), ("function", "(", "req", ",", "res", ",", "next", ")"), ("next",), ("res",)]
+    assert found("myapp.user(nextTick)") == []
@@ -3,6 +3,8 @@ import os
 import json
 from unittest.mock import patch
 
+import pytest
+
 from ground_truth.tools.concept_mapper import main as cli_main
 
 def test_cli_init_command(tmp_path, monkeypatch):
@@ -118,3 +120,184 @@ def test_cli_add_command(tmp_path, monkeypatch):
     assert implementations[0]['line_start'] == 1
     assert implementations[0]['line_end'] == 2
     assert "class MyDecorator" in implementations[0]['code_snippet']
+
+
+def test_cli_add_batch_command(tmp_path, monkeypatch):
+    """Tests the 'add-batch' command reading JSONL from a file."""
+    state_file = tmp_path / "ground_truth" / "data" / "concepts_map.json"
+    state_file.parent.mkdir(parents=True)
+
+    source_file = tmp_path / "source.py"
+    source_file.write_text("def deco(fn):\n    return fn\n\ndef other(fn):\n    return fn\n")
+    concepts_file = tmp_path / "concepts.json"
+    concepts_file.write_text(json.dumps({
+        "concepts": [{"name": "Decorators", "description": "..."}]
+    }))
+    batch_file = tmp_path / "batch.jsonl"
+    batch_file.write_text("\n".join(json.dumps({
+        "concept": "Decorators", "file": str(source_file), "identifier": name,
+        "type": "function_decorator", "evidence": "Returns the wrapped function"
+    }) for name in ("deco", "other")) + "\n")
+    report_file = tmp_path / "report.jsonl"
+
+    for argv in (['concept_mapper', 'init', 'batch-test'],
+                 ['concept_mapper', 'load-concepts', str(concepts_file)],
+                 ['concept_mapper', 'add-batch', str(batch_file), '--report', str(report_file)]):
+        monkeypatch.setattr(sys, 'argv', argv)
+        with patch('ground_truth.tools.concept_mapper.project_root', str(tmp_path)):
+            cli_main()
+
+    with open(state_file, "r") as f:
+        data = json.load(f)
+    implementations = data['concepts']['decorators']['implementations']
+    assert [impl['identifier'] for impl in implementations] == ['deco', 'other']
+    assert [impl['line_start'] for impl in implementations] == [1, 4]
+
+    report = [json.loads(line) for line in report_file.read_text().splitlines()]
+    assert [r['status'] for r in report] == ['added', 'added']
+
+
+def test_cli_journal_storage(tmp_path, monkeypatch, capsys):
+    """Tests that --storage journal records mappings in the journal until 'compact'."""
+    state_file = tmp_path / "ground_truth" / "data" / "concepts_map.json"
+    journal_file = state_file.parent / "concepts_map.json.journal"
+    state_file.parent.mkdir(parents=True)
+
+    source_file = tmp_path / "source.py"
+    source_file.write_text("def deco(fn):\n    return fn\n")
+    concepts_file = tmp_path / "concepts.json"
+    concepts_file.write_text(json.dumps({
+        "concepts": [{"name": "Decorators", "description": "..."}]
+    }))
+
+    for argv in (['concept_mapper', '--storage', 'journal', 'init', 'journal-test'],
+                 ['concept_mapper', '--storage', 'journal', 'load-concepts', str(concepts_file)],
+                 ['concept_mapper', '--storage', 'journal', 'add', 'Decorators', '--file', str(source_file),
+                  '--identifier', 'deco', '--type', 'function_decorator', '--evidence', 'Returns fn']):
+        monkeypatch.setattr(sys, 'argv', argv)
+        with patch('ground_truth.tools.concept_mapper.project_root', str(tmp_path)):
+            cli_main()
+
+    assert journal_file.exists()
+    with open(state_file, "r") as f:
+        assert json.load(f)['concepts'] == {}
+
+    monkeypatch.setattr(sys, 'argv', ['concept_mapper', 'compact'])
+    with patch('ground_truth.tools.concept_mapper.project_root', str(tmp_path)):
+        cli_main()
+
+    assert not journal_file.exists()
+    with open(state_file, "r") as f:
+        data = json.load(f)
+    assert data['concepts']['decorators']['implementations'][0]['identifier'] == 'deco'
+
+
+def test_cli_restore_command(tmp_path, monkeypatch, capsys):
+    """Tests listing restore points and restoring the state file from one."""
+    state_file = tmp_path / "ground_truth" / "data" / "concepts_map.json"
+    state_file.parent.mkdir(parents=True)
+    concepts_file = tmp_path / "concepts.json"
+    concepts_file.write_text(json.dumps({
+        "concepts": [{"name": "Decorators", "description": "..."}]
+    }))
+
+    for argv in (['concept_mapper', 'init', 'restore-test'],
+                 ['concept_mapper', 'load-concepts', str(concepts_file)],
+                 ['concept_mapper', 'restore', '--list'],
+                 ['concept_mapper', 'restore', '1']):
+        monkeypatch.setattr(sys, 'argv', argv)
+        with patch('ground_truth.tools.concept_mapper.project_root', str(tmp_path)):
+            cli_main()
+
+    captured = capsys.readouterr()
+    assert "#1" in captured.out and "#2" in captured.out
+    assert "Restored" in captured.out
+    with open(state_file, "r") as f:
+        assert json.load(f)['concepts'] == {}
+
+
+def test_cli_sqlite_backend_and_export(tmp_path, monkeypatch):
+    """Tests the SQLite backend end-to-end, then exporting it to JSON."""
+    data_dir = tmp_path / "ground_truth" / "data"
+    data_dir.mkdir(parents=True)
+    source_file = tmp_path / "source.py"
+    source_file.write_text("class MyDecorator:\n    pass\n")
+    concepts_file = tmp_path / "concepts.json"
+    concepts_file.write_text(json.dumps({
+        "concepts": [{"name": "Decorators", "description": "..."}]
+    }))
+    export_file = tmp_path / "export.json"
+
+    for argv in (['concept_mapper', '--backend', 'sqlite', 'init', 'sqlite-test'],
+                 ['concept_mapper', '--backend', 'sqlite', 'load-concepts', str(concepts_file)],
+                 ['concept_mapper', '--backend', 'sqlite', 'add', 'Decorators', '--file', str(source_file),
+                  '--identifier', 'MyDecorator', '--type', 'class_definition', '--evidence', 'A test decorator'],
+                 ['concept_mapper', '--backend', 'sqlite', 'export', str(export_file)]):
+        monkeypatch.setattr(sys, 'argv', argv)
+        with patch('ground_truth.tools.concept_mapper.project_root', str(tmp_path)):
+            cli_main()
+
+    assert (data_dir / "concepts_map.sqlite3").exists()
+    assert not (data_dir / "concepts_map.json").exists()
+    with open(export_file, "r") as f:
+        data = json.load(f)
+    assert data['metadata']['project'] == 'sqlite-test'
+    assert data['concepts']['decorators']['implementations'][0]['identifier'] == 'MyDecorator'
+
+def test_cli_sqlite_backend_rejects_json_options(tmp_path, monkeypatch, capsys):
+    """Tests that JSON-only options and restore points are refused with the SQLite backend."""
+    (tmp_path / "ground_truth" / "data").mkdir(parents=True)
+
+    for argv in (['concept_mapper', '--backend', 'sqlite', '--storage', 'journal', 'status'],
+                 ['concept_mapper', '--backend', 'sqlite', '--compress', 'init', 'sqlite-test']):
+        monkeypatch.setattr(sys, 'argv', argv)
+        with patch('ground_truth.tools.concept_mapper.project_root', str(tmp_path)):
+            with pytest.raises(SystemExit) as excinfo:
+                cli_main()
+        assert excinfo.value.code == 2
+    assert "--compress: JSON backend only" in capsys.readouterr().err
+
+    monkeypatch.setattr(sys, 'argv', ['concept_mapper', '--backend', 'sqlite', 'restore', '--list'])
+    with patch('ground_truth.tools.concept_mapper.project_root', str(tmp_path)):
+        with pytest.raises(SystemExit) as excinfo:
+            cli_main()
+    assert excinfo.value.code == 1
+    assert "only kept for the JSON backend" in capsys.readouterr().err
+
+def test_cli_coverage_command(tmp_path, monkeypatch, capsys):
+    """Tests that 'coverage' streams rows from the local index and serves a rerun from the cache."""
+    from src.providers.local_provider import BM25Index, iter_definition_chunks
+
+    (tmp_path / "ground_truth" / "data").mkdir(parents=True)
+    repo = tmp_path / "repo" / "pkg"
+    repo.mkdir(parents=True)
+    (repo / "session.py").write_text(
+        "class Session:\n    def __enter__(self):\n        return self\n\n"
+        "    def __exit__(self, *exc):\n        return False\n")
+    (repo / "items.py").write_text("def chunks(items):\n    for item in items:\n        yield item\n")
+    BM25Index.build(iter_definition_chunks(str(tmp_path / "repo")), str(tmp_path / "ground_truth" / "data" / "local_index"))
+    concepts_file = tmp_path / "concepts.json"
+    concepts_file.write_text(json.dumps({"concepts": [
+        {"name": "Context Managers", "description": "With.", "keywords": ["__enter__", "__exit__"]},
+        {"name": "Generators", "description": "Lazy.", "keywords": ["yield"]},
+        {"name": "Metaclasses", "description": "Types.", "keywords": ["metaclass"]},
+    ]}))
+    report = tmp_path / "coverage.jsonl"
+
+    for argv in (['concept_mapper', 'init', 'coverage-test'],
+                 ['concept_mapper', 'load-concepts', str(concepts_file)],
+                 ['concept_mapper', 'coverage', '--output', str(report)],
+                 ['concept_mapper', 'coverage', '--output', str(tmp_path / "coverage.csv")]):
+        monkeypatch.setattr(sys, 'argv', argv)
+        with patch('ground_truth.tools.concept_mapper.project_root', str(tmp_path)):
+            cli_main()
+
+    rows = [json.loads(line) for line in report.read_text().splitlines()]
+    files = {(r["concept"], r["path"]): r["identifiers"] for r in rows if r["level"] == "file"}
+    assert files == {("context_managers", "pkg/session.py"): ["Session.__enter__", "Session.__exit__"],
+                     ("generators", "pkg/items.py"): ["chunks"]}
+    assert (tmp_path / "coverage.csv").read_text().startswith("level,path,concept,chunks,best_score,identifiers")
+    err = capsys.readouterr().err
+    assert "✅ Coverage: 2/3 concepts found, 0 failed, 0 from cache" in err
+    assert "✅ Coverage: 2/3 concepts found, 0 failed, 3 from cache" in err
+    assert "Not found: metaclasses" in err
@@ -0,0 +1,81 @@
+from src.domain.models import ConceptMap, Metadata, Concept, Implementation
+
+def _impl(file_path, line_start):
+    return Implementation(
+        file_path=file_path, identifier=None, line_start=line_start, line_end=line_start + 1,
+        code_snippet="...", confidence="high", pattern_type="t", evidence="e", added_at="now",
+    )
+
+def _map_with_two_concepts():
+    return ConceptMap(
+        metadata=Metadata(project="test", version="1.0"),
+        concepts={
+            "decorators": Concept(display_name="Decorators", definition="...",
+                                  implementations=[_impl("a.py", 1), _impl("b.py", 5)]),
+            "generators": Concept(display_name="Generators", definition="...",
+                                  implementations=[_impl("a.py", 10)]),
+        },
+    )
+
+def test_indexes_built_on_construction():
+    """Test that location and file indexes cover implementations passed to the constructor."""
+    concept_map = _map_with_two_concepts()
+
+    assert concept_map.find_implementation("decorators", "b.py", 5) is not None
+    assert concept_map.find_implementation("decorators", "a.py", 10) is None
+    assert concept_map.concepts_for_file("a.py") == ["decorators", "generators"]
+    assert concept_map.concepts_for_file("missing.py") == []
+
+def test_indexes_updated_on_mutation():
+    """Test that add_concept and add_implementation keep the indexes current."""
+    concept_map = _map_with_two_concepts()
+    concept_map.add_concept("closures", Concept(display_name="Closures", definition="..."))
+    concept_map.add_implementation("closures", _impl("b.py", 20))
+
+    assert concept_map.find_implementation("closures", "b.py", 20) is not None
+    assert concept_map.concepts_for_file("b.py") == ["decorators", "closures"]
+    assert sorted(concept_map.mapped_files()) == ["a.py", "b.py"]
+
+def test_replacing_a_concept_drops_its_old_implementations():
+    """Test that add_concept on an existing key removes the replaced implementations from the indexes."""
+    concept_map = _map_with_two_concepts()
+    concept_map.add_concept("decorators", Concept(display_name="Decorators", definition="...",
+                                                  implementations=[_impl("c.py", 2)]))
+
+    generator, = concept_map.concepts["generators"].implementations
+    assert concept_map.implementations_for_file("a.py") == [("generators", generator)]
+    assert concept_map.concepts_for_file("b.py") == []
+    assert "b.py" not in concept_map.mapped_files()
+    assert concept_map.find_implementation("decorators", "a.py", 1) is None
+    assert concept_map.find_implementation("decorators", "c.py", 2) is not None
+
+    concept_map.concepts["generators"].implementations.append(_impl("d.py", 4))  # edited behind the index
+    concept_map.add_concept("generators", Concept(display_name="Generators", definition="..."))
+    assert concept_map.mapped_files() == ["c.py"]
+
+def test_indexes_detect_direct_edits():
+    """Test that implementations appended outside add_implementation are still found."""
+    concept_map = _map_with_two_concepts()
+    concept_map.concepts["generators"].implementations.append(_impl("c.py", 3))
+    concept_map.concepts["closures"] = Concept(display_name="Closures", definition="...",
+                                               implementations=[_impl("c.py", 8)])
+
+    assert concept_map.find_implementation("generators", "c.py", 3) is not None
+    assert concept_map.concepts_for_file("c.py") == ["generators", "closures"]
+
+def test_implementation_is_compact():
+    """Test that implementations are slotted and share interned strings and snippets."""
+    first = Implementation(**_impl("pkg/" + "a.py", 1).to_dict())
+    second = Implementation(**_impl("".join(["pkg/", "a.py"]), 1).to_dict())
+    assert not hasattr(first, "__dict__")
+    assert first.file_path is second.file_path
+    assert first == second
+
+    concept_map = _map_with_two_concepts()
+    concept_map.add_implementation("generators", Implementation(
+        **{**first.to_dict(), "code_snippet": "".join(["def f():\n", "    yield 1\n"])}))
+    concept_map.add_implementation("decorators", Implementation(
+        **{**first.to_dict(), "code_snippet": "def f():\n    yield 1\n"}))
+    snippets = [impls[-1].code_snippet for impls in
+                (concept_map.concepts["generators"].implementations, concept_map.concepts["decorators"].implementations)]
+    assert snippets[0] is snippets[1]
@@ -0,0 +1,38 @@
+import os
+from phase1_validation.validators.keyword_validators import KeywordAutomaton, KeywordValidator, tokenize
+
+TAXONOMY_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "config", "taxonomies")
+
+def test_tokenize_splits_words_and_punctuation():
+    """Test that code is split into words and single punctuation characters."""
+    assert tokenize("app.use(fn)  # ok") == ["app", ".", "use", "(", "fn", ")", "#", "ok"]
+
+def test_automaton_reports_overlapping_patterns():
+    """Test that patterns sharing prefixes and suffixes are all reported."""
+    automaton = KeywordAutomaton()
+    for pattern in (["a", "b", "c"], ["b", "c"], ["b"], ["c", "d"]):
+        automaton.add(pattern, "".join(pattern))
+    assert sorted(automaton.iter_matches(["a", "b", "c", "d"])) == [(1, "b"), (2, "abc"), (2, "bc"), (3, "cd")]
+
+def test_validate_matches_whole_tokens():
+    """Test that keywords match whole tokens regardless of spacing, and count occurrences."""
+    validator = KeywordValidator({
+        "context_managers": ["with", "__enter__"],
+        "generators": ["yield", "yield from"],
+        "middleware": ["function(req, res, next)"],
+    })
+    hits = validator.validate(
+        "def without(): pass\n"
+        "def gen():\n    yield 1\n    yield from other()\n"
+        "app.use(function (req,res,next) {})\n"
+    )
+    assert hits == {"generators": {"yield": 2, "yield from": 1}, "middleware": {"function(req, res, next)": 1}}
+
+def test_validate_many_keeps_chunk_order():
+    """Test that the bulk API returns one result per chunk, empty for chunks without keywords."""
+    validator = KeywordValidator.from_taxonomy(os.path.join(TAXONOMY_DIR, "python_core.json"))
+    chunks = ["x = 1", "@functools.wraps(f)\ndef wrapper(): pass", "with open(p) as f: pass"]
+
+    assert validator.validate_many(chunks) == [
+        {}, {"decorators": {"@": 1, "functools.wraps": 1, "wrapper": 1}}, {"context_managers": {"with": 1}}]
+    assert validator.matching_concepts(chunks, min_keywords=2) == [[], ["decorators"], []]
@@ -0,0 +1,50 @@
+import asyncio
+import time
+import pytest
+from src.providers.base import CodeChunk, RetrievalQuery
+from src.providers.fake_provider import FakeProvider
+
+def chunk(name: str) -> CodeChunk:
+    return CodeChunk(f"pkg/{name}.py", 1, 2, f"def {name}(): pass\n", name)
+
+def test_retrieve_many_runs_queries_concurrently():
+    """Test that a batch takes about as long as its slowest round, within the concurrency limit."""
+    provider = FakeProvider({f"q{i}": [chunk(f"f{i}"), chunk("shared")] for i in range(40)},
+                            latency=0.05, max_concurrency=20)
+    queries = [RetrievalQuery(f"q{i}", top_k=1, concept=f"c{i}") for i in range(40)]
+
+    start = time.perf_counter()
+    results = provider.retrieve_many_sync(queries)
+    elapsed = time.perf_counter() - start
+
+    assert [r.query for r in results] == queries
+    assert [[c.identifier for c in r.chunks] for r in results] == [[f"f{i}"] for i in range(40)]
+    assert all(r.ok and r.seconds >= 0.05 for r in results)
+    assert provider.max_in_flight == 20
+    assert elapsed < 0.5  # 40 sequential calls would take 2s
+
+def test_failures_and_timeouts_stay_in_their_result():
+    """Test that a failing or slow query is reported without stopping the rest of the batch."""
+    provider = FakeProvider({"ok": [chunk("f")]}, failures={"bad": RuntimeError("quota exceeded")})
+    results = provider.retrieve_many_sync([RetrievalQuery("bad"), RetrievalQuery("ok")])
+    assert [(r.ok, r.error) for r in results] == [(False, "RuntimeError: quota exceeded"), (True, None)]
+
+    slow = FakeProvider({"slow": [chunk("f")]}, latency=1.0, timeout=0.05)
+    result, = slow.retrieve_many_sync([RetrievalQuery("slow")])
+    assert result.error == "Timed out after 0.05s." and result.chunks == []
+    assert slow.in_flight == 0
+
+def test_cancelling_a_batch_cancels_its_queries():
+    """Test that cancelling retrieve_many cancels every query still running."""
+    provider = FakeProvider(latency=10.0, max_concurrency=2)
+
+    async def run():
+        task = asyncio.ensure_future(provider.retrieve_many([RetrievalQuery(f"q{i}") for i in range(5)]))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    assert len(provider.calls) == 2
+    assert provider.in_flight == 0
@@ -0,0 +1,112 @@
+import asyncio
+
+import pytest
+from src.providers.base import CodeChunk, RetrievalQuery
+from src.providers.cache import CachedProvider, RetrievalCache
+from src.providers.fake_provider import FakeProvider
+
+def chunks(name: str, n: int = 3):
+    return [CodeChunk(f"pkg/{name}.py", i, i + 1, f"def {name}_{i}(): pass\n", f"{name}_{i}") for i in range(n)]
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / "cache.sqlite3")
+
+def test_repeated_queries_are_served_from_cache(cache_path):
+    """Test that only misses reach the provider, smaller top k reuse entries, and entries persist."""
+    provider = FakeProvider({"with statement": chunks("a"), "decorators": chunks("b")},
+                            failures={"broken": RuntimeError("down")})
+    cache = RetrievalCache(cache_path)
+    cached = CachedProvider(provider, cache)
+
+    first = cached.retrieve_many_sync([RetrievalQuery("with statement", top_k=3), RetrievalQuery("broken")])
+    assert [(r.cached, r.ok) for r in first] == [(False, True), (False, False)]
+
+    second = cached.retrieve_many_sync([RetrievalQuery("  With   STATEMENT ", top_k=2), RetrievalQuery("broken"),
+                                        RetrievalQuery("decorators", top_k=1)])
+    assert [(r.cached, r.ok) for r in second] == [(True, True), (False, False), (False, True)]
+    assert second[0].chunks == chunks("a", 2)
+    assert [q.text for q in provider.calls] == ["with statement", "broken", "broken", "decorators"]
+    assert (cache.hits, cache.misses) == (1, 4)
+
+    # A larger top k than was cached is a miss; the larger result replaces the entry.
+    cached.retrieve_many_sync([RetrievalQuery("decorators", top_k=3)])
+    assert len(provider.calls) == 5
+    cache.close()
+
+    reopened = CachedProvider(provider, RetrievalCache(cache_path))
+    result, = reopened.retrieve_many_sync([RetrievalQuery("decorators", top_k=3)])
+    assert result.cached and result.chunks == chunks("b")
+    assert len(provider.calls) == 5
+
+def test_corpus_version_change_invalidates(cache_path):
+    """Test that entries cached for one corpus version are dropped when the version changes."""
+    provider = FakeProvider({"q": chunks("a")})
+    provider.version = "v1"
+    cache = RetrievalCache(cache_path)
+    cached = CachedProvider(provider, cache)
+    cached.retrieve_many_sync([RetrievalQuery("q")])
+    assert cached.retrieve_many_sync([RetrievalQuery("q")])[0].cached
+
+    provider.version = "v2"
+    assert not cached.retrieve_many_sync([RetrievalQuery("q")])[0].cached
+    assert cache.stats()["invalidations"] == 1
+    assert CachedProvider(provider, cache, params={"model": "other"}).retrieve_many_sync(
+        [RetrievalQuery("q")])[0].cached is False
+
+def test_providers_of_one_name_are_kept_apart_by_identity(cache_path):
+    """Test that two indexes behind same-named providers neither share entries nor invalidate each other."""
+    cache = RetrievalCache(cache_path)
+    first, second = FakeProvider({"q": chunks("a")}), FakeProvider({"q": chunks("b")})
+    first.identity, first.version = "/indexes/first", "v1"
+    second.identity, second.version = "/indexes/second", "v2"
+    cached_first, cached_second = CachedProvider(first, cache), CachedProvider(second, cache)
+
+    for _ in range(2):
+        assert cached_first.retrieve_many_sync([RetrievalQuery("q")])[0].chunks == chunks("a")
+        assert cached_second.retrieve_many_sync([RetrievalQuery("q")])[0].chunks == chunks("b")
+    assert (len(first.calls), len(second.calls)) == (1, 1)
+    assert cache.stats()["invalidations"] == 0
+
+def test_stream_answers_every_duplicate_miss(cache_path):
+    """Test that a query missed at several positions is fetched once and yielded for each of them."""
+    provider = FakeProvider({"q": chunks("a"), "r": chunks("b")})
+    cached = CachedProvider(provider, RetrievalCache(cache_path))
+    queries = [RetrievalQuery("q"), RetrievalQuery("r"), RetrievalQuery("q")]
+
+    async def collect():
+        return [result async for result in cached.stream(queries)]
+
+    results = asyncio.run(collect())
+    assert sorted(r.query.text for r in results) == ["q", "q", "r"]
+    assert [q.text for q in provider.calls] == ["q", "r"]
+    assert all(r.cached for r in asyncio.run(collect()))
+
+def test_least_recently_used_entries_are_evicted(cache_path):
+    """Test that eviction honours the entry and byte limits in least recently used order."""
+    ticks = iter(range(100))
+    cache = RetrievalCache(cache_path, max_entries=2, clock=lambda: next(ticks))
+    keys = [cache.key("p", "", q) for q in ("a", "b", "c")]
+    cache.put_many("p", [(keys[0], 3, chunks("a")), (keys[1], 3, chunks("b"))])
+    cache.get_many([keys[0]], [3])  # "a" is now more recent than "b"
+    cache.put_many("p", [(keys[2], 3, chunks("c"))])
+
+    assert [r is not None for r in cache.get_many(keys, [3, 3, 3])] == [True, False, True]
+    assert cache.stats()["evictions"] == 1
+
+    cache.max_bytes = cache.stats()["bytes"] - 1
+    assert cache.evict() == 1
+    assert cache.stats()["entries"] == 1
+
+def test_expired_entries_are_misses(cache_path):
+    """Test that entries older than the TTL are refetched."""
+    now = [1000.0]
+    cache = RetrievalCache(cache_path, ttl=60, clock=lambda: now[0])
+    key = cache.key("p", "", "q")
+    cache.put_many("p", [(key, 3, chunks("a"))])
+
+    now[0] += 59
+    assert cache.get_many([key], [3]) == [chunks("a")]
+    now[0] += 2
+    assert cache.get_many([key], [3]) == [None]
+    assert cache.stats()["entries"] == 0
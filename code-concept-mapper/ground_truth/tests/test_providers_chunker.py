@@ -0,0 +1,74 @@
+import ast
+import pytest
+from src.providers.chunker import FileChunker, chunk_file, iter_chunks
+
+SMALL = '''import os
+
+LIMIT = 10
+
+class Session:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+@cache
+def load(path):
+    return open(path).read()
+'''
+
+def long_function(n_statements: int) -> str:
+    body = "".join(f"    value_{i} = compute(value_{i - 1}, {i})\n" for i in range(1, n_statements))
+    return f"def process(items):\n    value_0 = items[0]\n{body}    return value_{n_statements - 1}\n"
+
+def spans(chunks):
+    return [(c.identifier, c.line_start, c.line_end) for c in chunks]
+
+def test_definitions_within_budget_are_whole_chunks():
+    """Test that classes and functions that fit are one chunk each, decorators included."""
+    chunks = list(FileChunker("pkg/app.py", SMALL).chunks())
+    assert spans(chunks) == [(None, 1, 3), ("Session", 5, 10), ("load", 12, 14)]
+    assert chunks[2].content == "@cache\ndef load(path):\n    return open(path).read()\n"
+
+    # With a smaller budget the class is split into its methods.
+    assert spans(FileChunker("pkg/app.py", SMALL, max_tokens=12, overlap=0).chunks()) == [
+        (None, 1, 3), ("Session", 5, 5), ("Session.__enter__", 6, 7), ("Session.__exit__", 9, 10), ("load", 12, 14)]
+
+def test_large_functions_split_at_statements_within_budget():
+    """Test that windows hold whole statements, stay in budget, cover the body and overlap by whole statements."""
+    source = long_function(60)
+    chunker = FileChunker("pkg/long.py", source, max_tokens=100, overlap=30)
+    chunks = list(chunker.chunks())
+    statement_starts = {node.lineno for node in ast.walk(ast.parse(source)) if isinstance(node, ast.stmt)}
+
+    assert len(chunks) > 3 and {c.identifier for c in chunks} == {"process"}
+    assert all(chunker.tokens(c.line_start, c.line_end) <= 100 for c in chunks)
+    assert all(c.line_start in statement_starts for c in chunks)
+    assert (chunks[0].line_start, chunks[-1].line_end) == (1, 62)
+    for before, after in zip(chunks, chunks[1:]):
+        assert after.line_start <= before.line_end + 1
+        assert after.line_start > before.line_start
+        if after.line_start <= before.line_end:
+            assert chunker.tokens(after.line_start, before.line_end) <= 30
+
+    # A compound statement too large on its own is split into its nested statements.
+    nested = "def outer(xs):\n    for x in xs:\n" + "".join(f"        total += x * {i}\n" for i in range(40))
+    chunks = list(FileChunker("pkg/nested.py", nested, max_tokens=60, overlap=0).chunks())
+    assert chunks[0].line_start == 1 and chunks[-1].line_end == 42 and len(chunks) > 1
+
+def test_iter_chunks_streams_a_repository(tmp_path):
+    """Test that a tree is chunked the same inline and across workers, and unparseable files by lines."""
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "app.py").write_text(SMALL)
+    (tmp_path / "pkg" / "long.py").write_text(long_function(60))
+    (tmp_path / "broken.py").write_text("def broken(:\n" + "x = 1\n" * 100)
+
+    inline = list(iter_chunks(str(tmp_path), max_tokens=100, overlap=30, workers=1))
+    pooled = list(iter_chunks(str(tmp_path), max_tokens=100, overlap=30, workers=2, files_per_task=1))
+    assert inline == pooled
+    assert [c.file_path for c in inline][:1] == ["broken.py"]
+    assert chunk_file(str(tmp_path), "broken.py", 100, 0)[0].line_start == 1
+    assert chunk_file(str(tmp_path), "missing.py") == []
+    with pytest.raises(ValueError, match="overlap"):
+        iter_chunks(str(tmp_path), max_tokens=50, overlap=50)
@@ -0,0 +1,145 @@
+import asyncio
+import time
+import numpy as np
+import pytest
+from src.providers import local_provider
+from src.providers.base import CodeChunk, RetrievalQuery
+from src.providers.local_provider import (BM25Index, DenseIndex, HashingEmbedding, LocalProvider,
+                                          iter_definition_chunks, open_index, tokenize_code)
+
+CHUNKS = [
+    CodeChunk("pkg/session.py", 1, 6, "class Session:\n    def __enter__(self):\n        return self\n"
+              "    def __exit__(self, *exc):\n        self.close()\n", "Session"),
+    CodeChunk("pkg/users.py", 1, 3, "def getUserName(user_id):\n    user = load_user(user_id)\n    return user.name\n",
+              "getUserName"),
+    CodeChunk("pkg/files.py", 1, 3, "def read_lines(path):\n    with open(path) as f:\n        yield from f\n",
+              "read_lines"),
+]
+
+def test_tokenize_code_splits_identifiers():
+    """Test that identifiers yield their camelCase and snake_case parts, and dunders stay whole."""
+    assert tokenize_code("getUserName") == ["getusername", "get", "user", "name"]
+    assert tokenize_code("load_user_id") == ["load_user_id", "load", "user", "id"]
+    assert tokenize_code("parseHTTPResponse") == ["parsehttpresponse", "parse", "http", "response"]
+    assert tokenize_code("def __enter__(self): x = 1") == ["def", "__enter__", "self"]
+
+def test_search_ranks_matching_chunks(tmp_path):
+    """Test that a reopened index returns the best-matching chunks with their location and score."""
+    BM25Index.build(CHUNKS, str(tmp_path / "index"))
+    index = BM25Index(str(tmp_path / "index"))
+
+    assert len(index) == 3
+    results = index.search("__enter__ __exit__", top_k=2)
+    assert [(c.file_path, c.identifier, c.line_start, c.line_end) for c in results] == [
+        ("pkg/session.py", "Session", 1, 6)]
+    assert results[0].content == CHUNKS[0].content
+    assert results[0].score > 0
+
+    assert [c.identifier for c in index.search("user name")] == ["getUserName"]
+    assert [c.identifier for c in index.search("path lines user", top_k=1)] == ["read_lines"]
+    assert index.search("nonexistent") == []
+
+def test_version_follows_indexed_content(tmp_path):
+    """Test that the index version changes with the corpus, and an empty index searches cleanly."""
+    first = BM25Index.build(CHUNKS, str(tmp_path / "a")).version
+    assert BM25Index.build(CHUNKS, str(tmp_path / "b")).version == first
+    assert BM25Index.build(CHUNKS[:2], str(tmp_path / "c")).version != first
+
+    empty = BM25Index.build([], str(tmp_path / "empty"))
+    assert len(empty) == 0
+    assert empty.search("anything") == []
+
+def test_missing_index_raises(tmp_path):
+    """Test that opening a directory without a complete index fails clearly."""
+    with pytest.raises(FileNotFoundError, match="No index found"):
+        BM25Index(str(tmp_path))
+
+def test_local_provider_indexes_definitions(tmp_path):
+    """Test that a repository is chunked per function and method and retrieved offline."""
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    (repo / "app.py").write_text(
+        "class App:\n    def route(self, rule):\n        def decorator(f):\n            return f\n"
+        "        return decorator\n\ndef make_app():\n    return App()\n"
+    )
+    chunks = list(iter_definition_chunks(str(repo)))
+    assert [(c.identifier, c.line_start, c.line_end) for c in chunks] == [("App.route", 2, 5), ("make_app", 7, 8)]
+
+    BM25Index.build(chunks, str(tmp_path / "index"))
+    results = asyncio.run(LocalProvider(str(tmp_path / "index")).retrieve(RetrievalQuery("route decorator")))
+    assert [c.identifier for c in results] == ["App.route"]
+
+def test_hashing_embedding_is_deterministic():
+    """Test that the local embedding gives the same unit vectors every time, and zeros for no terms."""
+    embedding = HashingEmbedding(dim=64)
+    vectors = embedding(["def read_lines(path): pass", "def read_lines(path): pass", "+ - *"])
+
+    assert vectors.shape == (3, 64) and vectors.dtype == np.float32
+    assert np.array_equal(vectors[0], vectors[1])
+    assert np.isclose(np.linalg.norm(vectors[0]), 1.0)
+    assert not vectors[2].any()
+    assert np.array_equal(HashingEmbedding(dim=64)(["def read_lines(path): pass"])[0], vectors[0])
+
+@pytest.mark.parametrize("dtype", ["float16", "int8"])
+def test_dense_search_matches_exact_scores(tmp_path, monkeypatch, dtype):
+    """Test that batched, block-wise search over quantized rows finds the exact float32 top k."""
+    monkeypatch.setattr(local_provider, "BLOCK_ROWS", 2)
+    chunks = CHUNKS * 3
+    embedding = HashingEmbedding(dim=128)
+    DenseIndex.build(chunks, str(tmp_path / "dense"), embedding, dtype, batch_size=4)
+    index = open_index(str(tmp_path / "dense"))
+
+    assert isinstance(index, DenseIndex) and len(index) == 9
+    queries = ["__enter__ __exit__ close", "user name", "read lines path"]
+    results = index.search_many(queries, top_k=3)
+    exact = embedding(queries) @ embedding([c.content for c in chunks]).T
+    for q, query_results in enumerate(results):
+        expected = sorted(range(len(chunks)), key=lambda i: (-exact[q, i], i))[:3]
+        assert [c.identifier for c in query_results] == [chunks[i].identifier for i in expected]
+        assert [c.score for c in query_results] == pytest.approx(sorted(exact[q, expected], reverse=True), abs=0.02)
+    assert index.search("user name", top_k=3) == results[1]
+
+def test_local_provider_opens_either_kind(tmp_path):
+    """Test that the provider serves dense indexes, and an index of the wrong kind is refused."""
+    DenseIndex.build(CHUNKS, str(tmp_path / "dense"))
+    BM25Index.build(CHUNKS, str(tmp_path / "bm25"))
+
+    provider = LocalProvider(str(tmp_path / "dense"))
+    results = provider.retrieve_many_sync([RetrievalQuery("user name", top_k=1), RetrievalQuery("read lines", top_k=2),
+                                           RetrievalQuery("__enter__", top_k=1)])
+    assert [(r.chunks[0].identifier, len(r.chunks)) for r in results] == [
+        ("getUserName", 1), ("read_lines", 2), ("Session", 1)]
+    assert all(r.ok for r in results) and provider.version == provider.index.version
+    with pytest.raises(ValueError, match="holds a bm25 index"):
+        DenseIndex(str(tmp_path / "bm25"))
+    with pytest.raises(ValueError, match="Unsupported vector type"):
+        DenseIndex.build(CHUNKS, str(tmp_path / "bad"), dtype="float64")
+
+def test_local_provider_searches_sub_batches_with_their_own_timeouts(tmp_path, monkeypatch):
+    """Test that batches are split at max_concurrency, a slow sub-batch times out alone, and streams yield early."""
+    BM25Index.build(CHUNKS, str(tmp_path / "index"))
+    provider = LocalProvider(str(tmp_path / "index"))
+    search_many = provider.index.search_many
+    calls = []
+
+    def slow_search_many(texts, top_k):
+        calls.append(list(texts))
+        if "slow" in texts:
+            time.sleep(0.3)
+        return search_many(texts, top_k)
+
+    monkeypatch.setattr(provider.index, "search_many", slow_search_many)
+    queries = [RetrievalQuery(text, top_k=1) for text in ("user name", "read lines", "slow", "__enter__", "with")]
+
+    results = provider.retrieve_many_sync(queries, max_concurrency=2, timeout=0.1)
+    assert calls == [["user name", "read lines"], ["slow", "__enter__"], ["with"]]
+    assert [r.ok for r in results] == [True, True, False, False, True]
+    assert results[2].error == "Timed out after 0.1s."
+
+    async def first_streamed():
+        async for result in provider.stream(queries, max_concurrency=2):
+            return result, len(calls)
+
+    calls.clear()
+    result, searched = asyncio.run(first_streamed())
+    assert result.query.text == "user name" and searched == 1
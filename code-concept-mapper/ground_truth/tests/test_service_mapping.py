@@ -1,8 +1,12 @@
 import pytest
+import io
 import json
 from unittest.mock import MagicMock, patch
 from src.business_logic.concept_mapping_service import ConceptMappingService, normalize_key
 from src.domain.models import ConceptMap, Metadata, Concept, Implementation
+from src.utils.code_parser import Symbol, get_source_file
+
+FOUND = [Symbol(name="ident", qualname="ident", kind="function", line_start=10, line_end=20)]
 
 @pytest.fixture
 def mock_state_manager():
@@ -102,8 +106,8 @@ def test_load_concepts_invalid_json(tmp_path, mock_state_manager, empty_state, c
 
 # CORRECTED TEST
 @patch('src.business_logic.concept_mapping_service.extract_snippet', return_value="dummy snippet")
-@patch('src.business_logic.concept_mapping_service.find_lines_by_identifier', return_value=(10, 20))
-def test_add_mapping_duplicate_detection(mock_find_lines, mock_extract_snippet, mock_state_manager, populated_state, capsys):
+@patch('src.business_logic.concept_mapping_service.resolve_identifier', return_value=FOUND)
+def test_add_mapping_duplicate_detection(mock_resolve, mock_extract_snippet, mock_state_manager, populated_state, capsys):
     """Test that adding a duplicate implementation is skipped."""
     service = ConceptMappingService(mock_state_manager)
 
@@ -143,12 +147,12 @@ def test_add_mapping_undefined_concept(mock_state_manager, capsys):
     assert "Concept 'NonExistent' not found" in captured.err
     mock_state_manager.save_state.assert_not_called()
 
-@patch('src.business_logic.concept_mapping_service.find_lines_by_identifier')
-def test_add_mapping_lines_fallback(mock_find_lines, mock_state_manager, populated_state):
+@patch('src.business_logic.concept_mapping_service.resolve_identifier')
+def test_add_mapping_lines_fallback(mock_resolve, mock_state_manager, populated_state):
     """Test that the --lines argument is used when --identifier fails."""
     service = ConceptMappingService(mock_state_manager)
     mock_state_manager.load_state.return_value = populated_state
-    mock_find_lines.return_value = (None, None)
+    mock_resolve.return_value = []
 
     with patch('src.business_logic.concept_mapping_service.extract_snippet', return_value="snippet"):
         service.add_mapping(
@@ -186,8 +190,8 @@ def test_add_mapping_no_state_file(mock_state_manager, capsys):
     assert "No state file found" in captured.err
     mock_state_manager.save_state.assert_not_called()
 
-@patch('src.business_logic.concept_mapping_service.find_lines_by_identifier', return_value=(None, None))
-def test_add_mapping_no_lines_found(mock_find_lines, mock_state_manager, populated_state, capsys):
+@patch('src.business_logic.concept_mapping_service.resolve_identifier', return_value=[])
+def test_add_mapping_no_lines_found(mock_resolve, mock_state_manager, populated_state, capsys):
     """Test add_mapping fails when neither identifier nor lines can determine a range."""
     service = ConceptMappingService(mock_state_manager)
     mock_state_manager.load_state.return_value = populated_state
@@ -201,9 +205,9 @@ def test_add_mapping_no_lines_found(mock_find_lines, mock_state_manager, populat
     assert "Could not determine lines" in captured.err
     mock_state_manager.save_state.assert_not_called()
 
-@patch('src.business_logic.concept_mapping_service.find_lines_by_identifier', return_value=(10, 20))
+@patch('src.business_logic.concept_mapping_service.resolve_identifier', return_value=FOUND)
 @patch('src.business_logic.concept_mapping_service.extract_snippet', return_value=None)
-def test_add_mapping_snippet_extraction_fails(mock_extract, mock_find_lines, mock_state_manager, populated_state, capsys):
+def test_add_mapping_snippet_extraction_fails(mock_extract, mock_resolve, mock_state_manager, populated_state, capsys):
     """Test add_mapping fails if the code snippet cannot be extracted."""
     service = ConceptMappingService(mock_state_manager)
     mock_state_manager.load_state.return_value = populated_state
@@ -217,9 +221,9 @@ def test_add_mapping_snippet_extraction_fails(mock_extract, mock_find_lines, moc
     assert "Could not read file content" in captured.err
     mock_state_manager.save_state.assert_not_called()
 
-@patch('src.business_logic.concept_mapping_service.find_lines_by_identifier', return_value=(10, 20))
+@patch('src.business_logic.concept_mapping_service.resolve_identifier', return_value=FOUND)
 @patch('src.business_logic.concept_mapping_service.extract_snippet', return_value="snippet")
-def test_add_mapping_save_fails(mock_extract, mock_find_lines, mock_state_manager, populated_state, capsys):
+def test_add_mapping_save_fails(mock_extract, mock_resolve, mock_state_manager, populated_state, capsys):
     """Test add_mapping handles a failure during state saving."""
     service = ConceptMappingService(mock_state_manager)
     mock_state_manager.load_state.return_value = populated_state
@@ -234,8 +238,8 @@ def test_add_mapping_save_fails(mock_extract, mock_find_lines, mock_state_manage
     assert "Failed to save mapping" in captured.err
 
 @pytest.mark.parametrize("invalid_lines", ["42", "42-", "abc-def"])
-@patch('src.business_logic.concept_mapping_service.find_lines_by_identifier', return_value=(None, None))
-def test_add_mapping_invalid_lines_format(mock_find_lines, invalid_lines, mock_state_manager, populated_state, capsys):
+@patch('src.business_logic.concept_mapping_service.resolve_identifier', return_value=[])
+def test_add_mapping_invalid_lines_format(mock_resolve, invalid_lines, mock_state_manager, populated_state, capsys):
     """Test that add_mapping handles invalid --lines formats."""
     service = ConceptMappingService(mock_state_manager)
     mock_state_manager.load_state.return_value = populated_state
@@ -268,3 +272,200 @@ def test_show_status_no_concepts(mock_state_manager, empty_state, capsys):
 
     captured = capsys.readouterr()
     assert "No concepts loaded yet" in captured.out
+
+def test_add_mappings_batch_single_save(tmp_path, mock_state_manager, populated_state, capsys):
+    """Test that a batch loads once, saves once, and reports a result per entry."""
+    service = ConceptMappingService(mock_state_manager)
+    mock_state_manager.load_state.return_value = populated_state
+    mock_state_manager.save_state.return_value = True
+
+    source_file = tmp_path / "source.py"
+    source_file.write_text("def first():\n    pass\n\ndef second():\n    pass\n")
+    entries = [
+        {"concept": "Decorators", "file": str(source_file), "identifier": "first", "type": "t", "evidence": "e"},
+        {"concept": "Decorators", "file": str(source_file), "identifier": "second", "type": "t", "evidence": "e"},
+        {"concept": "Decorators", "file": str(source_file), "identifier": "first", "type": "t", "evidence": "e"},
+        {"concept": "Unknown", "file": str(source_file), "lines": "1-2", "type": "t", "evidence": "e"},
+        {"concept": "Decorators", "file": str(source_file), "type": "t", "evidence": "e"},
+    ]
+
+    results = service.add_mappings_batch(entries)
+
+    assert [r["status"] for r in results] == ["added", "added", "duplicate", "error", "error"]
+    mock_state_manager.load_state.assert_called_once()
+    mock_state_manager.save_state.assert_called_once()
+    impls = populated_state.concepts["decorators"].implementations
+    assert [(i.line_start, i.line_end) for i in impls] == [(1, 2), (4, 5)]
+    assert impls[1].code_snippet == "def second():\n    pass\n"
+    assert "2 added, 1 duplicates, 2 errors" in capsys.readouterr().out
+
+def test_add_mappings_batch_reads_each_file_once(tmp_path, mock_state_manager, populated_state):
+    """Test that entries for the same file share one cached SourceFile lookup."""
+    service = ConceptMappingService(mock_state_manager)
+    mock_state_manager.load_state.return_value = populated_state
+    mock_state_manager.save_state.return_value = True
+
+    source_file = tmp_path / "source.py"
+    source_file.write_text("def a():\n    pass\ndef b():\n    pass\n")
+    entries = [
+        {"concept": "Decorators", "file": str(source_file), "identifier": name, "type": "t", "evidence": "e"}
+        for name in ("a", "b")
+    ]
+
+    with patch('src.business_logic.concept_mapping_service.get_source_file', wraps=get_source_file) as mock_source:
+        service.add_mappings_batch(entries)
+
+    mock_source.assert_called_once_with(str(source_file))
+
+def test_add_mappings_batch_nothing_to_save(mock_state_manager, populated_state):
+    """Test that a batch without successful entries does not write the state."""
+    service = ConceptMappingService(mock_state_manager)
+    mock_state_manager.load_state.return_value = populated_state
+
+    results = service.add_mappings_batch([{"concept": "Decorators", "file": "missing.py", "lines": "1-2",
+                                           "type": "t", "evidence": "e"}])
+
+    assert results[0]["status"] == "error"
+    mock_state_manager.save_state.assert_not_called()
+
+def test_add_mappings_batch_non_string_fields(tmp_path, mock_state_manager, populated_state):
+    """Test that a non-string field is an error for its entry and does not stop the batch."""
+    service = ConceptMappingService(mock_state_manager)
+    mock_state_manager.load_state.return_value = populated_state
+    mock_state_manager.save_state.return_value = True
+    source_file = tmp_path / "source.py"
+    source_file.write_text("def first():\n    pass\n")
+    valid = {"concept": "Decorators", "file": str(source_file), "identifier": "first", "type": "t", "evidence": "e"}
+
+    results = service.add_mappings_batch([
+        dict(valid, identifier=None, lines=5),
+        dict(valid, concept=5),
+        dict(valid, identifier=7),
+        valid,
+    ])
+
+    assert [r["status"] for r in results] == ["error", "error", "error", "added"]
+    assert results[0]["message"] == "Expected string value(s) for: lines (got int)"
+    mock_state_manager.save_state.assert_called_once()
+
+def test_add_mappings_from_jsonl_invalid_line(mock_state_manager, populated_state):
+    """Test that malformed JSONL lines become per-item errors."""
+    service = ConceptMappingService(mock_state_manager)
+    mock_state_manager.load_state.return_value = populated_state
+
+    results = service.add_mappings_from_jsonl(io.StringIO("{not json}\n\n[1, 2]\n"))
+
+    assert len(results) == 2
+    assert all(r["status"] == "error" for r in results)
+    assert "line 1" in results[0]["message"]
+
+@patch('src.business_logic.concept_mapping_service.resolve_identifier', return_value=[
+    Symbol(name="__init__", qualname="A.__init__", kind="function", line_start=2, line_end=3),
+    Symbol(name="__init__", qualname="B.__init__", kind="function", line_start=6, line_end=7),
+])
+def test_add_mapping_ambiguous_identifier(mock_resolve, mock_state_manager, populated_state, capsys):
+    """Test that an ambiguous identifier is reported and not silently resolved."""
+    service = ConceptMappingService(mock_state_manager)
+    mock_state_manager.load_state.return_value = populated_state
+
+    service.add_mapping(
+        concept_name="Decorators", file_path="file.py", identifier="__init__",
+        lines=None, confidence="high", pattern_type="...", evidence="..."
+    )
+
+    captured = capsys.readouterr()
+    assert "ambiguous (2 definitions)" in captured.out
+    assert "B.__init__ (6-7)" in captured.out
+    mock_state_manager.save_state.assert_not_called()
+
+def test_show_file_concepts(mock_state_manager, populated_state, capsys):
+    """Test listing the concepts mapped in a file."""
+    service = ConceptMappingService(mock_state_manager)
+    populated_state.add_implementation("decorators", Implementation(
+        file_path="file.py", identifier="my_decorator", line_start=10, line_end=20,
+        code_snippet="...", confidence="high", pattern_type="decorator",
+        evidence="...", added_at="..."
+    ))
+    mock_state_manager.load_state.return_value = populated_state
+
+    service.show_file_concepts("file.py")
+    out = capsys.readouterr().out
+    assert "Decorators" in out
+    assert "my_decorator (10-20)" in out
+
+    service.show_file_concepts("other.py")
+    assert "No concepts are mapped in other.py" in capsys.readouterr().out
+
+def _map_source(tmp_path, mock_state_manager, populated_state):
+    source_file = tmp_path / "source.py"
+    source_file.write_text("def first():\n    pass\n\ndef second():\n    pass\n\ndef third():\n    pass\n\nX = 1\n")
+    mock_state_manager.load_state.return_value = populated_state
+    mock_state_manager.save_state.return_value = True
+    service = ConceptMappingService(mock_state_manager)
+    service.add_mappings_batch([
+        {"concept": "Decorators", "file": str(source_file), "identifier": name, "type": "t", "evidence": "e"}
+        for name in ("first", "second", "third")
+    ] + [{"concept": "Decorators", "file": str(source_file), "lines": "10-10", "type": "t", "evidence": "e"}])
+    mock_state_manager.reset_mock()
+    return service, source_file
+
+def test_refresh_mappings_reanchors_drifted_code(tmp_path, mock_state_manager, populated_state, capsys):
+    """Test that moved and edited code is re-anchored, gone code is flagged, and the map is saved once."""
+    service, source_file = _map_source(tmp_path, mock_state_manager, populated_state)
+    source_file.write_text("import os\n\ndef first():\n    pass\n\ndef second():\n    return 2\n\nX = 1\n")
+
+    results = service.refresh_mappings(workers=1)
+
+    assert [(r["identifier"], r["status"]) for r in results] == [
+        ("first", "moved"), ("second", "changed"), ("third", "missing"), (None, "moved")]
+    mock_state_manager.save_state.assert_called_once()
+    assert populated_state.is_modified
+    impls = populated_state.concepts["decorators"].implementations
+    assert [(i.line_start, i.line_end) for i in impls] == [(3, 4), (6, 7), (7, 8), (9, 9)]
+    assert impls[1].code_snippet == "def second():\n    return 2\n"
+    assert populated_state.find_implementation("decorators", str(source_file), 3) is impls[0]
+    assert "0 unchanged, 3 updated, 1 flagged" in capsys.readouterr().out
+
+def test_refresh_mappings_check_only(tmp_path, mock_state_manager, populated_state, capsys):
+    """Test that --check reports drift without changing or saving the map."""
+    service, source_file = _map_source(tmp_path, mock_state_manager, populated_state)
+    source_file.write_text("\n" + source_file.read_text())
+
+    results = service.refresh_mappings(workers=1, check_only=True)
+
+    assert {r["status"] for r in results} == {"moved"}
+    mock_state_manager.save_state.assert_not_called()
+    assert populated_state.concepts["decorators"].implementations[0].line_start == 1
+    assert "0 unchanged, 4 drifted, 0 flagged" in capsys.readouterr().out
+
+def test_refresh_follows_lines_of_unresolvable_identifiers(tmp_path, mock_state_manager, populated_state, capsys):
+    """Test that a mapping whose identifier never resolved is checked, and re-anchored, by its stored code."""
+    source_file = tmp_path / "source.py"
+    source_file.write_text("X = 1\nY = 2\n")
+    mock_state_manager.load_state.return_value = populated_state
+    mock_state_manager.save_state.return_value = True
+    service = ConceptMappingService(mock_state_manager)
+    service.add_mapping("Decorators", str(source_file), "CONFIG", "2-2", "high", "t", "e")
+    impl = populated_state.concepts["decorators"].implementations[0]
+    assert impl.identifier == "CONFIG"
+
+    assert service.refresh_mappings(workers=1) == []
+    assert "1 unchanged, 0 updated, 0 flagged" in capsys.readouterr().out
+
+    source_file.write_text("import os\nX = 1\nY = 2\n")
+    results = service.refresh_mappings(workers=1)
+    assert [(r["status"], r["new_line_start"]) for r in results] == [("moved", 3)]
+    assert (impl.line_start, impl.line_end) == (3, 3)
+
+def test_refresh_check_files_in_parallel(tmp_path):
+    """Test that the process pool returns the same results as checking inline."""
+    from src.business_logic import refresh
+    by_file = {}
+    for i in range(4):
+        path = tmp_path / f"mod_{i}.py"
+        path.write_text(f"\ndef f{i}():\n    pass\n")
+        by_file[str(path)] = [(f"f{i}", 1, 2, refresh.snippet_hash(f"def f{i}():\n    pass\n"), None)]
+
+    parallel = refresh.check_files(by_file, workers=2, chunk_size=1)
+    assert parallel == refresh.check_files(by_file, workers=1)
+    assert [results[0][:3] for results in parallel.values()] == [("moved", 2, 3)] * 4
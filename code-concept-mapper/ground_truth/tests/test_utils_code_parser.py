@@ -1,4 +1,7 @@
-from src.utils.code_parser import find_lines_by_identifier, extract_snippet
+import os
+import pytest
+from unittest.mock import patch
+from src.utils.code_parser import ParseCache, SourceFile, find_lines_by_identifier, extract_snippet, resolve_identifier
 
 def test_find_lines_class(tmp_path):
     """Test finding lines for a simple class."""
@@ -48,4 +51,128 @@ def test_find_lines_syntax_error(tmp_path, capsys):
     
     captured = capsys.readouterr()
     assert "Syntax Error" in captured.err
- 
\ No newline at end of file
+ 
+def test_source_file_multiple_lookups(tmp_path):
+    """Test that one SourceFile serves several lookups and snippets."""
+    source_file = tmp_path / "source.py"
+    source_file.write_text("def a():\n    pass\n\nclass B:\n    pass\n")
+
+    source = SourceFile(str(source_file))
+    assert source.find_lines("a") == (1, 2)
+    assert source.find_lines("B") == (4, 5)
+    assert source.find_lines("missing") == (None, None)
+    assert source.snippet(4, 5) == "class B:\n    pass\n"
+
+def test_symbol_table_keeps_every_definition(tmp_path):
+    """Test that the symbol table records all definitions of a repeated name."""
+    source_file = tmp_path / "source.py"
+    source_file.write_text(
+        "class A:\n    def __init__(self):\n        pass\n\n"
+        "class B:\n    def __init__(self):\n        pass\n"
+    )
+
+    symbols = SourceFile(str(source_file)).symbols
+    assert [(s.line_start, s.line_end) for s in symbols.lookup("__init__")] == [(2, 3), (6, 7)]
+    assert symbols.lookup("B")[0].kind == "class"
+    assert symbols.lookup("missing") == []
+
+def test_symbol_table_finds_definitions_in_nested_blocks(tmp_path):
+    """Test that definitions inside if/try/with blocks are found, in source order."""
+    source_file = tmp_path / "source.py"
+    source_file.write_text(
+        "if True:\n    def a(): pass\nelse:\n    def b(): pass\n"
+        "try:\n    def c(): pass\nexcept ImportError:\n    def d(): pass\nfinally:\n    def e(): pass\n"
+        "with open('x') as f:\n    class F:\n        def g(self): pass\n"
+    )
+
+    symbols = SourceFile(str(source_file)).symbols
+    assert [s.qualname for s in symbols.symbols] == ["a", "b", "c", "d", "e", "F", "F.g"]
+
+def test_parse_cache_reuses_and_revalidates(tmp_path):
+    """Test that repeated lookups hit the cache and an edited file is re-read."""
+    source_file = tmp_path / "source.py"
+    source_file.write_text("def a():\n    pass\n")
+    cache = ParseCache(maxsize=4)
+
+    first = cache.get(str(source_file))
+    assert cache.get(str(source_file)) is first
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    source_file.write_text("\n\ndef a():\n    pass\n")
+    os.utime(source_file, ns=(1, 1))
+    refreshed = cache.get(str(source_file))
+    assert refreshed is not first
+    assert refreshed.find_lines("a") == (3, 4)
+
+def test_parse_cache_lru_eviction(tmp_path):
+    """Test that the least recently used file is evicted past maxsize."""
+    paths = []
+    for name in ("a", "b", "c"):
+        path = tmp_path / f"{name}.py"
+        path.write_text(f"def {name}():\n    pass\n")
+        paths.append(str(path))
+    cache = ParseCache(maxsize=2)
+
+    first = cache.get(paths[0])
+    cache.get(paths[1])
+    cache.get(paths[0])
+    cache.get(paths[2])
+
+    assert len(cache) == 2
+    assert cache.get(paths[0]) is first
+    assert cache.misses == 3
+    cache.get(paths[1])
+    assert cache.misses == 4
+
+def test_resolve_qualified_names(tmp_path):
+    """Test resolving methods and nested functions by qualified name."""
+    source_file = tmp_path / "source.py"
+    source_file.write_text(
+        "class A:\n    def __init__(self):\n        pass\n\n"
+        "class B:\n    def __init__(self):\n        pass\n\n"
+        "def outer():\n    def inner():\n        pass\n    return inner\n"
+    )
+
+    assert find_lines_by_identifier(str(source_file), "B.__init__") == (6, 7)
+    assert find_lines_by_identifier(str(source_file), "outer.<locals>.inner") == (10, 11)
+    assert find_lines_by_identifier(str(source_file), "inner") == (10, 11)
+    assert find_lines_by_identifier(str(source_file), "source:A.__init__") == (2, 3)
+    assert resolve_identifier(str(source_file), "other_module:A.__init__") == []
+
+def test_find_lines_ambiguous_identifier(tmp_path, capsys):
+    """Test that an ambiguous bare name is reported instead of guessed."""
+    source_file = tmp_path / "source.py"
+    source_file.write_text(
+        "class A:\n    def __enter__(self):\n        pass\n\n"
+        "class B:\n    def __enter__(self):\n        pass\n"
+    )
+
+    assert len(resolve_identifier(str(source_file), "__enter__")) == 2
+    assert find_lines_by_identifier(str(source_file), "__enter__") == (None, None)
+    captured = capsys.readouterr()
+    assert "ambiguous" in captured.err
+    assert "A.__enter__ (2-3)" in captured.err
+
+def test_extract_snippet_reuses_cached_source(tmp_path):
+    """Test that a file already in the parse cache is not read again."""
+    source_file = tmp_path / "source.py"
+    source_file.write_text("def a():\n    pass\n\ndef b():\n    return 1\n")
+    find_lines_by_identifier(str(source_file), "b")
+
+    with patch("builtins.open", side_effect=AssertionError("file was re-read")):
+        assert extract_snippet(str(source_file), 4, 5) == "def b():\n    return 1\n"
+
+@pytest.mark.parametrize("content,start,end,expected", [
+    ("line1\nline2\nline3", 2, 3, "line2\nline3"),
+    ("line1\nline2\n", 2, 10, "line2\n"),
+    ("line1\nline2\n", 5, 6, ""),
+    ("line1\r\nline2\r\nline3\r\n", 2, 2, "line2\n"),
+    ("", 1, 1, ""),
+])
+def test_extract_snippet_matches_readlines(tmp_path, content, start, end, expected):
+    """Test that uncached extraction returns the same text as readlines slicing."""
+    source_file = tmp_path / "source.py"
+    source_file.write_bytes(content.encode("utf-8"))
+
+    assert extract_snippet(str(source_file), start, end) == expected
+    assert SourceFile(str(source_file)).snippet(start, end) == expected
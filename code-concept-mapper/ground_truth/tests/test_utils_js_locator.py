@@ -0,0 +1,97 @@
+from src.utils import code_parser
+from src.utils.js_locator import locate, tokenize
+from src.utils.symbol_index import RepositoryIndexer, SymbolIndex
+
+SERVER = """\
+const express = require('express');
+const app = express();
+const users = express.Router();
+
+export async function loadUser(id: string): Promise<User> {
+  return db.get(`select * from users where id = ${id}`);
+}
+
+export const handler: RequestHandler = async (req, res) => {
+  res.send(req.params.id / 2);
+};
+
+const double = x =>
+  x * 2;
+
+exports.legacy = function (req, res) {
+  return res.json({ ok: true });
+};
+
+export default class UserController extends BaseController {
+  constructor(private readonly service: UserService) {
+    super();
+  }
+
+  @Get(':id')
+  async find(id: string) {
+    function helper() { return id; }
+    return helper();
+  }
+
+  static create = () => new UserController(null);
+
+  abstract render(): string;
+}
+
+app.get('/users/:id', auth, async (req, res) => {
+  res.send(`user ${req.params.id}`);
+});
+users.use(express.json());
+app.get('env');
+"""
+
+def test_locate_finds_definitions_with_qualified_names_and_spans():
+    """Test that declarations, arrow assignments, classes and methods are found with their line spans."""
+    found = {s.qualname: (s.kind, s.line_start, s.line_end) for s in locate(SERVER)}
+
+    assert found["loadUser"] == ("async_function", 5, 7)
+    assert found["handler"] == ("async_function", 9, 11)
+    assert found["double"] == ("function", 13, 14)
+    assert found["legacy"] == ("function", 16, 18)
+    assert found["UserController"] == ("class", 20, 34)
+    assert found["UserController.constructor"] == ("function", 21, 23)
+    assert found["UserController.find"] == ("async_function", 26, 29)
+    assert found["UserController.find.<locals>.helper"] == ("function", 27, 27)
+    assert found["UserController.create"] == ("function", 31, 31)
+    assert "UserController.render" not in found  # an abstract signature has no body
+
+def test_locate_finds_route_registrations():
+    """Test that routes are named after receiver, method and path, and settings reads are not routes."""
+    routes = [(s.qualname, s.line_start, s.line_end) for s in locate(SERVER) if s.kind == "route"]
+
+    assert routes == [("app.get /users/:id", 36, 38), ("users.use", 39, 39)]
+
+def test_tokenize_skips_braces_in_strings_comments_regexes_and_templates():
+    """Test that brackets inside literals and comments are not tokens, but substitutions are."""
+    tokens, _ = tokenize("a = '{'; // }\nb = /[{]/g; c = x / 2 /* } */; d = `}${ {k: 1} }{`;")
+
+    assert tokens.count("{") == tokens.count("}") == 1
+    assert "/[{]/g" in tokens and "'{'" in tokens
+
+def test_identifier_lookup_and_symbol_index_cover_javascript(tmp_path):
+    """Test that --identifier lookups resolve in JS files, parsed or from the persistent index."""
+    root = tmp_path / "repo"
+    (root / "routes").mkdir(parents=True)
+    (root / "routes" / "users.ts").write_text(SERVER)
+    (root / "node_modules").mkdir()
+    (root / "node_modules" / "dep.js").write_text("function dep() {}\n")
+    path = str(root / "routes" / "users.ts")
+
+    assert code_parser.find_lines_by_identifier(path, "UserController.find") == (26, 29)
+    assert code_parser.find_lines_by_identifier(path, "app.get /users/:id") == (36, 38)
+
+    index = SymbolIndex(str(tmp_path / "index.sqlite3"))
+    try:
+        stats = RepositoryIndexer(str(root), index, workers=1).build()
+        assert stats["files"] == 1
+        assert [rel_path for rel_path, _ in index.lookup("handler")] == ["routes/users.ts"]
+        code_parser.set_symbol_index(index)
+        assert code_parser.find_lines_by_identifier(path, "app.get /users/:id") == (36, 38)
+    finally:
+        code_parser.set_symbol_index(None)
+        index.close()
@@ -0,0 +1,97 @@
+import sqlite3
+from src.domain.models import ConceptMap, Metadata, Concept, Implementation
+from src.utils.sqlite_state_manager import SQLiteStateManager, copy_state
+from src.utils.state_manager import StateManager
+
+def _impl(file_path, line_start, confidence="high"):
+    return Implementation(
+        file_path=file_path, identifier="ident", line_start=line_start, line_end=line_start + 2,
+        code_snippet="def ident():\n    pass\n", confidence=confidence, pattern_type="t",
+        evidence="e", added_at="2025-12-05T10:00:00",
+    )
+
+def _populated_map():
+    concept_map = ConceptMap(metadata=Metadata(project="test-project", version="1.1"))
+    concept_map.add_concept("decorators", Concept(
+        display_name="Decorators", definition="...", keywords=["@"], languages=["python"], category="lang"))
+    concept_map.add_implementation("decorators", _impl("a.py", 1))
+    concept_map.add_implementation("decorators", _impl("b.py", 4, confidence="low"))
+    return concept_map
+
+def test_load_state_non_existent(tmp_path):
+    """Test that loading a missing database returns None."""
+    manager = SQLiteStateManager(state_file_path=str(tmp_path / "concepts_map.sqlite3"))
+    assert manager.load_state() is None
+
+def test_save_and_load_cycle(tmp_path):
+    """Test that a saved map loads back with identical concepts."""
+    manager = SQLiteStateManager(state_file_path=str(tmp_path / "concepts_map.sqlite3"))
+    concept_map = _populated_map()
+
+    assert manager.save_state(concept_map) is True
+    loaded = manager.load_state()
+    assert loaded.metadata == concept_map.metadata
+    assert loaded.concepts == concept_map.concepts
+
+def test_incremental_insert(tmp_path, mocker):
+    """Test that adding one implementation to a loaded map only inserts that row."""
+    manager = SQLiteStateManager(state_file_path=str(tmp_path / "concepts_map.sqlite3"))
+    manager.save_state(_populated_map())
+    state = manager.load_state()
+    state.add_implementation("decorators", _impl("c.py", 9))
+
+    insert_concept = mocker.spy(manager, "_insert_concept")
+    assert manager.save_state(state) is True
+    insert_concept.assert_not_called()
+
+    assert [i.file_path for i in manager.load_state().concepts["decorators"].implementations] == ["a.py", "b.py", "c.py"]
+
+def test_untracked_edit_rewrites_tables(tmp_path):
+    """Test that in-place edits are persisted by a full rewrite."""
+    manager = SQLiteStateManager(state_file_path=str(tmp_path / "concepts_map.sqlite3"))
+    manager.save_state(_populated_map())
+    state = manager.load_state()
+    state.concepts["decorators"].implementations[0].line_end = 99
+    state.mark_modified()
+
+    manager.save_state(state)
+    assert manager.load_state().concepts["decorators"].implementations[0].line_end == 99
+
+def test_query_implementations_uses_indexes(tmp_path):
+    """Test filtered queries and that the declared indexes exist."""
+    manager = SQLiteStateManager(state_file_path=str(tmp_path / "concepts_map.sqlite3"))
+    manager.save_state(_populated_map())
+
+    assert [impl.file_path for _, impl in manager.query_implementations(file_path="b.py")] == ["b.py"]
+    assert [impl.file_path for _, impl in manager.query_implementations(confidence="high")] == ["a.py"]
+    assert len(manager.query_implementations(concept_key="decorators")) == 2
+
+    with sqlite3.connect(manager.state_file) as conn:
+        plan = conn.execute("EXPLAIN QUERY PLAN SELECT * FROM implementations WHERE file_path = 'b.py'").fetchall()
+    assert "idx_implementations_file" in str(plan)
+
+def test_json_round_trip(tmp_path):
+    """Test importing a JSON map into SQLite and exporting it back."""
+    json_manager = StateManager(state_file_path=str(tmp_path / "in.json"))
+    json_manager.save_state(_populated_map())
+    sqlite_manager = SQLiteStateManager(state_file_path=str(tmp_path / "concepts_map.sqlite3"))
+
+    assert copy_state(json_manager, sqlite_manager) is True
+    exported = StateManager(state_file_path=str(tmp_path / "out.json"), keep_backups=False)
+    assert copy_state(sqlite_manager, exported) is True
+
+    assert exported.load_state().concepts == json_manager.load_state().concepts
+    # The export shares in.json's directory but must not add restore points.
+    assert len(json_manager.backups.list_points()) == 1
+
+def test_restore_refuses_json_backups(tmp_path, capsys):
+    """Test that restore points of a JSON map in the same directory are neither listed nor restored."""
+    json_manager = StateManager(state_file_path=str(tmp_path / "concepts_map.json"))
+    json_manager.save_state(_populated_map())
+    manager = SQLiteStateManager(state_file_path=str(tmp_path / "concepts_map.sqlite3"))
+    manager.save_state(_populated_map())
+
+    assert manager.list_backups() is None
+    assert manager.restore_backup(1) is False
+    assert "only kept for the JSON backend" in capsys.readouterr().err
+    assert len(json_manager.list_backups()) == 1
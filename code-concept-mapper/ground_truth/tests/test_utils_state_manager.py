@@ -3,7 +3,8 @@ import os
 import pytest
 import sys
 from src.utils.state_manager import StateManager
-from datetime import datetime, timedelta
+from src.domain.models import Concept, Implementation
+from src.utils.backup_store import BackupStore
 
 def test_load_state_non_existent(tmp_path):
     """Test that loading a non-existent state file returns None."""
@@ -26,36 +27,75 @@ def test_save_and_load_cycle(tmp_path, empty_concept_map):
     assert loaded_state.metadata.project == "test-project"
     assert loaded_state.concepts == {}
 
-def test_backup_rotation(tmp_path, empty_concept_map, mocker):
-    """Test that old backups are removed by mocking datetime with a generator."""
+def test_backups_are_deduplicated(tmp_path, empty_concept_map):
+    """Test that every save becomes a restore point and identical content is stored once."""
     state_file = tmp_path / "concepts_map.json"
     manager = StateManager(state_file_path=str(state_file))
-    backup_dir = tmp_path / ".mapper_backups"
 
-    start_time = datetime(2025, 12, 5, 12, 0, 0)
+    manager.save_state(empty_concept_map)
+    first_version = state_file.read_bytes()
+    # Only last_updated changes: no new restore point.
+    manager.save_state(empty_concept_map)
+    assert state_file.read_bytes() != first_version
+    assert len(manager.backups.list_points()) == 1
+    empty_concept_map.add_concept("decorators", Concept(display_name="Decorators", definition="..."))
+    manager.save_state(empty_concept_map)
+    # Writing the first version back yields content that is already stored.
+    manager.backups.add(first_version)
 
-    # This generator will yield a new, incremented time on each call.
-    def time_generator(start):
-        current = start
-        while True:
-            yield current
-            current += timedelta(seconds=1)
+    points = manager.backups.list_points()
+    assert len(points) == 3
+    assert points[0]["digest"] == points[2]["digest"]
+    assert len(list((tmp_path / ".mapper_backups" / "concepts_map" / "objects").glob("*.gz"))) == 2
+    assert manager.backups.get(points[0]["id"]) == first_version
 
-    # Patch datetime.now to use our generator
-    mock_datetime = mocker.patch('src.utils.state_manager.datetime')
-    mock_datetime.now.side_effect = time_generator(start_time)
+def test_backups_are_kept_per_state_file(tmp_path, empty_concept_map):
+    """Test that two state files in one directory have separate restore points."""
+    first = StateManager(state_file_path=str(tmp_path / "first.json"))
+    second = StateManager(state_file_path=str(tmp_path / "second.json"))
+    first.save_state(empty_concept_map)
 
-    # Create 6 backups
-    for i in range(6):
-        manager.save_state(empty_concept_map)
+    assert len(first.backups.list_points()) == 1
+    assert second.backups.list_points() == []
+    assert second.restore_backup(first.backups.list_points()[0]["id"]) is False
 
-    backups = list(backup_dir.glob("*.json"))
-    assert len(backups) == 5  # Should have pruned the oldest one
+def test_backup_retention(tmp_path):
+    """Test that the oldest restore points and their objects are pruned."""
+    store = BackupStore(tmp_path / "backups", max_points=3)
+    for i in range(5):
+        store.add(f"version {i}".encode())
 
-    # Verify the oldest backup is gone (the one from 12:00:00)
-    backup_filenames = [b.name for b in backups]
-    first_backup_timestamp = start_time.strftime('%Y%m%d_%H%M%S')
-    assert f"concepts_map_{first_backup_timestamp}.json" not in backup_filenames
+    points = store.list_points()
+    assert [p["id"] for p in points] == [3, 4, 5]
+    assert store.get(1) is None
+    assert store.get(5) == b"version 4"
+    assert len(list((tmp_path / "backups" / "objects").glob("*.gz"))) == 3
+
+def test_restore_backup(tmp_path, empty_concept_map):
+    """Test restoring an earlier version, including journaled changes made since."""
+    state_file = tmp_path / "concepts_map.json"
+    manager = StateManager(state_file_path=str(state_file), storage_mode="journal")
+    manager.save_state(empty_concept_map)
+    first_point = manager.backups.list_points()[-1]["id"]
+
+    state = manager.load_state()
+    state.add_concept("decorators", Concept(display_name="Decorators", definition="..."))
+    manager.save_state(state)
+
+    assert manager.restore_backup(first_point) is True
+    assert not manager.journal_file.exists()
+    assert manager.load_state().concepts == {}
+    # The journaled change was compacted and backed up before the restore.
+    points = manager.backups.list_points()
+    assert points[-1]["label"] == f"restore of #{first_point}"
+    assert manager.restore_backup(points[-2]["id"]) is True
+    assert "decorators" in manager.load_state().concepts
+
+def test_restore_backup_missing(tmp_path, capsys):
+    """Test restoring a restore point that does not exist."""
+    manager = StateManager(state_file_path=str(tmp_path / "concepts_map.json"))
+    assert manager.restore_backup(42) is False
+    assert "Backup #42 not found" in capsys.readouterr().err
 
 def test_load_state_corrupted_json(tmp_path, capsys):
     """Test loading a file with invalid JSON exits gracefully."""
@@ -100,4 +140,153 @@ def test_save_state_fails(tmp_path, empty_concept_map, mocker, capsys):
     # Temp file should be cleaned up
     assert not manager.temp_file.exists()
     captured = capsys.readouterr()
-    assert "Save failed: Disk full" in captured.err
\ No newline at end of file
+    assert "Save failed: Disk full" in captured.err
+
+def _impl(line):
+    return Implementation(
+        file_path="file.py", identifier=None, line_start=line, line_end=line,
+        code_snippet="x\n", confidence="high", pattern_type="t", evidence="e", added_at="now",
+    )
+
+def test_journal_mode_appends_instead_of_rewriting(tmp_path, empty_concept_map):
+    """Test that journaled saves leave the snapshot untouched and replay on load."""
+    state_file = tmp_path / "concepts_map.json"
+    manager = StateManager(state_file_path=str(state_file), storage_mode="journal")
+    manager.save_state(empty_concept_map)
+    snapshot = state_file.read_text()
+
+    state = manager.load_state()
+    state.add_concept("decorators", Concept(display_name="Decorators", definition="..."))
+    assert manager.save_state(state) is True
+    state.add_implementation("decorators", _impl(1))
+    state.add_implementation("decorators", _impl(5))
+    assert manager.save_state(state) is True
+
+    assert state_file.read_text() == snapshot
+    assert manager.journal_file.exists()
+    reloaded = StateManager(state_file_path=str(state_file)).load_state()
+    assert [i.line_start for i in reloaded.concepts["decorators"].implementations] == [1, 5]
+    assert reloaded.metadata.last_updated == state.metadata.last_updated
+
+def test_journal_compaction_past_threshold(tmp_path, empty_concept_map):
+    """Test that the journal is folded into the snapshot once it is too large."""
+    state_file = tmp_path / "concepts_map.json"
+    manager = StateManager(state_file_path=str(state_file), storage_mode="journal", journal_threshold=300)
+    manager.save_state(empty_concept_map)
+    state = manager.load_state()
+    state.add_concept("decorators", Concept(display_name="Decorators", definition="..."))
+    manager.save_state(state)
+
+    for line in range(1, 4):
+        state.add_implementation("decorators", _impl(line))
+        manager.save_state(state)
+
+    assert not manager.journal_file.exists()
+    with open(state_file) as f:
+        data = json.load(f)
+    assert len(data["concepts"]["decorators"]["implementations"]) == 3
+
+def test_journal_ignores_torn_and_stale_entries(tmp_path, empty_concept_map):
+    """Test crash recovery: a torn last line and a journal from an old snapshot are ignored."""
+    state_file = tmp_path / "concepts_map.json"
+    manager = StateManager(state_file_path=str(state_file), storage_mode="journal")
+    manager.save_state(empty_concept_map)
+    state = manager.load_state()
+    state.add_concept("decorators", Concept(display_name="Decorators", definition="..."))
+    manager.save_state(state)
+
+    with open(manager.journal_file, "a") as f:
+        f.write('{"last_updated": "later", "changes": [["concept", "torn"')
+    reloaded = StateManager(state_file_path=str(state_file)).load_state()
+    assert list(reloaded.concepts) == ["decorators"]
+
+    # Simulate a crash after the snapshot was replaced but before the journal was removed.
+    stale_journal = manager.journal_file.read_text()
+    assert manager.compact() is True
+    manager.journal_file.write_text(stale_journal)
+    reloaded = StateManager(state_file_path=str(state_file)).load_state()
+    assert list(reloaded.concepts) == ["decorators"]
+
+def test_journal_append_after_torn_line(tmp_path, empty_concept_map):
+    """Test that appends after a torn last line truncate it instead of sharing its line."""
+    state_file = tmp_path / "concepts_map.json"
+    manager = StateManager(state_file_path=str(state_file), storage_mode="journal")
+    manager.save_state(empty_concept_map)
+    state = manager.load_state()
+    state.add_concept("decorators", Concept(display_name="Decorators", definition="..."))
+    state.add_implementation("decorators", _impl(1))
+    manager.save_state(state)
+
+    with open(manager.journal_file, "a") as f:
+        f.write('{"last_updated": "later", "changes": [["concept", "torn"')
+    for line in (2, 3):
+        state.add_implementation("decorators", _impl(line))
+        assert manager.save_state(state) is True
+
+    assert manager.journal_file.read_text().count("torn") == 0
+    reloaded = StateManager(state_file_path=str(state_file)).load_state()
+    assert [i.line_start for i in reloaded.concepts["decorators"].implementations] == [1, 2, 3]
+
+def test_journal_falls_back_to_snapshot_for_untracked_edits(tmp_path, empty_concept_map):
+    """Test that edits outside the change log force a full snapshot rewrite."""
+    state_file = tmp_path / "concepts_map.json"
+    manager = StateManager(state_file_path=str(state_file), storage_mode="journal")
+    manager.save_state(empty_concept_map)
+    state = manager.load_state()
+
+    state.concepts["decorators"] = Concept(display_name="Decorators", definition="...")
+    manager.save_state(state)
+
+    assert not manager.journal_file.exists()
+    with open(state_file) as f:
+        assert "decorators" in json.load(f)["concepts"]
+
+def test_serialize_round_trip_is_lossless(tmp_path, empty_concept_map):
+    """Test that every implementation field survives a save and load unchanged."""
+    state_file = tmp_path / "concepts_map.json"
+    manager = StateManager(state_file_path=str(state_file))
+    empty_concept_map.add_concept("decorators", Concept(
+        display_name="Decorators", definition="...", keywords=["@"], languages=["python"], category="lang"))
+    impl = Implementation(
+        file_path="src/app.py", identifier="App.route", line_start=3, line_end=9,
+        code_snippet="def route(self):\n    pass  # é\n", confidence="medium",
+        pattern_type="decorator_factory", evidence="Used as @app.route", added_at="2025-12-05T10:00:00.123456",
+    )
+    empty_concept_map.add_implementation("decorators", impl)
+    manager.save_state(empty_concept_map)
+
+    loaded = manager.load_state()
+    assert loaded.concepts == empty_concept_map.concepts
+    assert manager._serialize(loaded) == manager._serialize(empty_concept_map)
+
+@pytest.mark.parametrize("serializer", ["pretty", "compact", "fast"])
+@pytest.mark.parametrize("compress", [False, True])
+def test_serializers_round_trip(tmp_path, empty_concept_map, serializer, compress):
+    """Test that every serializer, compressed or not, is read back by any manager."""
+    state_file = tmp_path / "concepts_map.json"
+    manager = StateManager(state_file_path=str(state_file), serializer=serializer, compress=compress)
+    empty_concept_map.add_concept("decorators", Concept(display_name="Decorators", definition="é"))
+    manager.save_state(empty_concept_map)
+
+    assert (state_file.read_bytes()[:2] == b"\x1f\x8b") is compress
+    loaded = StateManager(state_file_path=str(state_file)).load_state()
+    assert loaded.concepts == empty_concept_map.concepts
+
+def test_fast_serializer_falls_back_without_orjson(tmp_path, empty_concept_map, monkeypatch):
+    """Test that the stdlib codec is used when orjson is not installed."""
+    from src.utils import serializers
+    monkeypatch.setattr(serializers, "orjson", None)
+    manager = StateManager(state_file_path=str(tmp_path / "concepts_map.json"), serializer="fast")
+    assert manager.serializer.name == "compact"
+    manager.save_state(empty_concept_map)
+    assert manager.load_state().metadata.project == "test-project"
+
+def test_incomplete_serializer_fails_on_creation():
+    """Test that a serializer without dump cannot be created, rather than failing mid-save."""
+    from src.utils.serializers import Serializer
+
+    class NoDump(Serializer):
+        name = "broken"
+
+    with pytest.raises(TypeError):
+        NoDump()
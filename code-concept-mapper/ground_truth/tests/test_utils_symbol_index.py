@@ -0,0 +1,78 @@
+import os
+import pytest
+from unittest.mock import patch
+from src.utils import code_parser
+from src.utils.symbol_index import RepositoryIndexer, SymbolIndex
+
+@pytest.fixture
+def repo(tmp_path):
+    root = tmp_path / "repo"
+    (root / "pkg").mkdir(parents=True)
+    (root / "pkg" / "app.py").write_text(
+        "class App:\n    def route(self):\n        def decorator(f):\n            return f\n        return decorator\n"
+    )
+    (root / "pkg" / "util.py").write_text("def route():\n    pass\n")
+    (root / "pkg" / "broken.py").write_text("def broken(:\n")
+    (root / ".venv").mkdir()
+    (root / ".venv" / "hidden.py").write_text("def hidden():\n    pass\n")
+    return root
+
+@pytest.fixture
+def index(tmp_path):
+    index = SymbolIndex(str(tmp_path / "index.sqlite3"))
+    yield index
+    index.close()
+    code_parser.set_symbol_index(None)
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_build_indexes_every_definition(repo, index, workers):
+    """Test that a build records qualified names, line spans and parse errors."""
+    stats = RepositoryIndexer(str(repo), index, workers=workers, chunk_size=1).build()
+
+    assert stats["files"] == 3
+    assert stats["symbols"] == 4
+    assert [(path, s.qualname, s.line_start, s.line_end) for path, s in index.lookup("route")] == [
+        ("pkg/app.py", "App.route", 2, 5), ("pkg/util.py", "route", 1, 2)]
+    assert index.lookup("App.route.<locals>.decorator")[0][1].line_start == 3
+    assert index.lookup("hidden") == []
+    assert [path for path, _ in RepositoryIndexer(str(repo), index).errors()] == ["pkg/broken.py"]
+
+def test_rebuild_replaces_previous_index(repo, index):
+    """Test that building again does not duplicate symbols."""
+    RepositoryIndexer(str(repo), index, workers=1).build()
+    (repo / "pkg" / "util.py").unlink()
+    stats = RepositoryIndexer(str(repo), index, workers=1).build()
+
+    assert stats["symbols"] == 3
+    assert [path for path, _ in index.lookup("route")] == ["pkg/app.py"]
+
+def test_code_parser_uses_index_until_file_changes(repo, index):
+    """Test that lookups come from the index, and a changed file is parsed again."""
+    RepositoryIndexer(str(repo), index, workers=1).build()
+    code_parser.set_symbol_index(index)
+    app = str(repo / "pkg" / "app.py")
+
+    with patch("src.utils.code_parser.ast.parse", side_effect=AssertionError("parsed")):
+        assert code_parser.find_lines_by_identifier(app, "App.route") == (2, 5)
+
+    (repo / "pkg" / "app.py").write_text("\n\nclass App:\n    def route(self):\n        pass\n")
+    assert code_parser.find_lines_by_identifier(app, "App.route") == (4, 5)
+
+def test_update_reindexes_only_changed_files(repo, index):
+    """Test that an update parses added and changed files, skips touched ones and evicts removed ones."""
+    indexer = RepositoryIndexer(str(repo), index, workers=1)
+    indexer.build()
+    stats = indexer.update()
+    assert (stats["added"], stats["changed"], stats["removed"], stats["unchanged"]) == (0, 0, 0, 3)
+
+    (repo / "pkg" / "util.py").unlink()
+    (repo / "pkg" / "app.py").write_text("class App:\n    pass\n")
+    (repo / "pkg" / "new.py").write_text("def route():\n    pass\n")
+    os.utime(repo / "pkg" / "broken.py", ns=(1, 1))
+    stats = indexer.update()
+
+    assert (stats["added"], stats["changed"], stats["touched"], stats["removed"], stats["unchanged"]) == (1, 1, 1, 1, 0)
+    assert [path for path, _ in index.lookup("route")] == ["pkg/new.py"]
+    assert index.lookup("App")[0][1].line_end == 2
+    assert stats["symbols"] == 2
+    assert indexer.update()["unchanged"] == 3
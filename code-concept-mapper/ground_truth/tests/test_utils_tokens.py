@@ -0,0 +1,8 @@
+from src.utils.tokens import count_tokens, keyword_tokens, tokenize
+
+def test_tokens_are_words_or_single_punctuation():
+    """Test that code splits into words and punctuation, and keywords into the runs they match."""
+    assert tokenize("app.use(logger)") == ["app", ".", "use", "(", "logger", ")"]
+    assert count_tokens("with open(path) as f:") == 8
+    assert keyword_tokens("function(req,  res)") == ("function", "(", "req", ",", "res", ")")
+    assert keyword_tokens("   ") == ()
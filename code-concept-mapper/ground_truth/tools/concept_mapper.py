@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 import argparse
+import json
 import os
 import sys
 
@@ -9,12 +10,27 @@ if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
 from src.business_logic.concept_mapping_service import ConceptMappingService
-from src.utils.state_manager import StateManager
+from src.business_logic.coverage import COVERAGE_FORMATS
+from src.utils.sqlite_state_manager import SQLiteStateManager, copy_state
+from src.utils.code_parser import set_symbol_index
+from src.utils.serializers import SERIALIZERS
+from src.utils.state_manager import STORAGE_MODES, StateManager
+from src.utils.symbol_index import SymbolIndex
+
+BACKENDS = ("json", "sqlite")
 
 def main():
     parser = argparse.ArgumentParser(
         description="A CLI tool to map programming concepts to code implementations."
     )
+    parser.add_argument("--backend", default="json", choices=BACKENDS,
+                        help="Store the concept map as a JSON file (default) or a SQLite database.")
+    parser.add_argument("--storage", default="snapshot", choices=STORAGE_MODES,
+                        help="'journal' appends each change to a write-ahead journal instead of rewriting the state file (JSON backend).")
+    parser.add_argument("--format", default="pretty", choices=SERIALIZERS,
+                        help="How JSON state files are written: indented (default), compact, or compact via orjson if installed.")
+    parser.add_argument("--compress", action="store_true",
+                        help="Gzip JSON state files when saving. Compressed files are detected on load.")
     subparsers = parser.add_subparsers(dest="command", required=True)
 
     p_init = subparsers.add_parser("init", help="Initialize a new concepts_map.json file.")
@@ -36,13 +52,67 @@ def main():
     p_add.add_argument("--type", required=True, help="Type of implementation (e.g., 'class_definition').")
     p_add.add_argument("--evidence", required=True, help="Specific reason for the mapping.")
 
+    p_batch = subparsers.add_parser("add-batch", help="Apply many mappings from a JSONL file in one save.")
+    p_batch.add_argument("input", nargs="?", default="-",
+                         help="JSONL file with one mapping per line (default: read from stdin).")
+    p_batch.add_argument("--report", help="Write per-item results to this JSONL file.")
+
     subparsers.add_parser("status", help="Show a summary of the current concept map.")
 
+    p_file = subparsers.add_parser("file", help="List the concepts mapped in a source file.")
+    p_file.add_argument("path", help="Path of the source file, as used with 'add --file'.")
+    subparsers.add_parser("compact", help="Fold the change journal into the state file.")
+
+    p_refresh = subparsers.add_parser("refresh", help="Re-anchor every mapping to the current source code.")
+    p_refresh.add_argument("--check", action="store_true", help="Only report drifted mappings; do not save.")
+    p_refresh.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per core).")
+    p_refresh.add_argument("--report", help="Write one JSON result per drifted or flagged mapping to this file.")
+
+    p_coverage = subparsers.add_parser("coverage", help="Report which files and directories cover each loaded concept.")
+    p_coverage.add_argument("--index", default=os.path.join(project_root, 'ground_truth', 'data', 'local_index'),
+                            help="Local index built by scripts/local_index.py (default: %(default)s).")
+    p_coverage.add_argument("--output", default="-", help="File to stream rows to (default: stdout).")
+    p_coverage.add_argument("--output-format", default=None, choices=COVERAGE_FORMATS,
+                            help="Row format (default: from the --output extension, else jsonl).")
+    p_coverage.add_argument("--top-k", type=int, default=20, help="Chunks retrieved per concept (default: %(default)s).")
+    p_coverage.add_argument("--min-score", type=float, default=0.0, help="Ignore chunks scoring below this.")
+    p_coverage.add_argument("--concurrency", type=int, default=None, help="Queries in flight at once.")
+    p_coverage.add_argument("--timeout", type=float, default=None, help="Seconds before a query is abandoned.")
+    p_coverage.add_argument("--no-cache", action="store_true", help="Do not read or write the retrieval cache.")
+
+    p_export = subparsers.add_parser("export", help="Write the concept map to a JSON file.")
+    p_export.add_argument("output", help="Path of the JSON file to write.")
+
+    p_import = subparsers.add_parser("import", help="Replace the concept map with the contents of a JSON file.")
+    p_import.add_argument("input", help="Path of a concepts_map.json file.")
+
+    p_restore = subparsers.add_parser("restore", help="List restore points or restore the state file from one.")
+    p_restore.add_argument("point", nargs="?", type=int, help="ID of the restore point to restore.")
+    p_restore.add_argument("--list", action="store_true", help="List the available restore points.")
+
     args = parser.parse_args()
+    if args.backend == "sqlite":
+        # --format and --compress still shape the JSON file written by 'export'.
+        ignored = [option for option, used in (("--storage", args.storage != "snapshot"),
+                                               ("--format", args.format != "pretty" and args.command != "export"),
+                                               ("--compress", args.compress and args.command != "export"))
+                   if used]
+        if ignored:
+            parser.error(f"{', '.join(ignored)}: JSON backend only"
+                         " (--format and --compress also apply to 'export').")
 
     # The state file is managed relative to the project root for consistency.
-    state_file_path = os.path.join(project_root, 'ground_truth', 'data', 'concepts_map.json')
-    state_manager = StateManager(state_file_path=state_file_path)
+    data_dir = os.path.join(project_root, 'ground_truth', 'data')
+    if args.backend == "sqlite":
+        state_manager = SQLiteStateManager(state_file_path=os.path.join(data_dir, 'concepts_map.sqlite3'))
+    else:
+        state_manager = StateManager(state_file_path=os.path.join(data_dir, 'concepts_map.json'),
+                                     storage_mode=args.storage, serializer=args.format,
+                                     compress=args.compress)
+    # Identifier lookups use the index built by scripts/index_repository.py when there is one.
+    symbol_index_path = os.path.join(data_dir, 'symbol_index.sqlite3')
+    if os.path.exists(symbol_index_path):
+        set_symbol_index(SymbolIndex(symbol_index_path))
     service = ConceptMappingService(state_manager)
 
     if args.command == "init":
@@ -54,8 +124,69 @@ def main():
             args.concept, args.file, args.identifier, args.lines,
             args.confidence, args.type, args.evidence
         )
+    elif args.command == "add-batch":
+        if args.input == "-":
+            results = service.add_mappings_from_jsonl(sys.stdin)
+        else:
+            with open(args.input, "r", encoding="utf-8") as f:
+                results = service.add_mappings_from_jsonl(f)
+        if args.report:
+            with open(args.report, "w", encoding="utf-8") as f:
+                for result in results:
+                    f.write(json.dumps(result) + "\n")
+    elif args.command == "refresh":
+        results = service.refresh_mappings(workers=args.workers, check_only=args.check)
+        if args.report:
+            with open(args.report, "w", encoding="utf-8") as f:
+                for result in results:
+                    f.write(json.dumps(result) + "\n")
+    elif args.command == "coverage":
+        # Imported here so other commands do not pay for loading numpy.
+        from src.providers.cache import CachedProvider, RetrievalCache
+        from src.providers.local_provider import LocalProvider
+        try:
+            provider = LocalProvider(args.index)
+        except (FileNotFoundError, ValueError) as e:
+            print(f"❌ {e} Build one with scripts/local_index.py.", file=sys.stderr)
+            sys.exit(1)
+        if not args.no_cache:
+            os.makedirs(data_dir, exist_ok=True)
+            provider = CachedProvider(provider, RetrievalCache(os.path.join(data_dir, 'retrieval_cache.sqlite3')))
+        output_format = args.output_format or ("csv" if args.output.endswith(".csv") else "jsonl")
+        if args.output == "-":
+            service.report_coverage(provider, sys.stdout, output_format, args.top_k, args.min_score,
+                                    args.concurrency, args.timeout)
+        else:
+            with open(args.output, "w", encoding="utf-8", newline="") as f:
+                service.report_coverage(provider, f, output_format, args.top_k, args.min_score,
+                                        args.concurrency, args.timeout)
     elif args.command == "status":
         service.show_status()
+    elif args.command == "file":
+        service.show_file_concepts(args.path)
+    elif args.command == "compact":
+        if state_manager.compact():
+            print(f"✅ Compacted journal into {state_manager.state_file}")
+        else:
+            print("❌ No state file found. Run 'init' first.", file=sys.stderr)
+    elif args.command == "export":
+        target = StateManager(args.output, keep_backups=False, serializer=args.format, compress=args.compress)
+        if copy_state(state_manager, target):
+            print(f"✅ Exported concept map to {args.output}")
+    elif args.command == "import":
+        if copy_state(StateManager(args.input, keep_backups=False), state_manager):
+            print(f"✅ Imported {args.input} into {state_manager.state_file}")
+    elif args.command == "restore":
+        if args.list or args.point is None:
+            points = state_manager.list_backups()
+            if points is None:
+                sys.exit(1)
+            if not points:
+                print("   No restore points yet.")
+            for point in points:
+                print(f"   #{point['id']:<5} {point['created_at']}  {point['size']:>10} bytes  {point['label']}")
+        elif state_manager.restore_backup(args.point):
+            print(f"✅ Restored {state_manager.state_file} from backup #{args.point}")
     else:
         parser.print_help()
 
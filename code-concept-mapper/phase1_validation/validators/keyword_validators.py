@@ -1,7 +1,163 @@
 """
 keyword_validators.py
 
-Created: 2025-12-05
-TODO: Implement
+Checks code chunks against the `keywords` of every concept in a taxonomy
+in a single pass.
+
+All keywords of all concepts are compiled into one Aho-Corasick automaton.
+It runs over code tokens rather than characters, so `with` does not match
+inside `without`, and `function(req, res, next)` matches however the
+arguments are spaced. One pass over a chunk reports the hits of every
+concept at once, instead of one `in` check per concept and keyword.
 """
+import json
+import os
+import sys
+from typing import Dict, Hashable, Iterable, Iterator, List, Sequence, Tuple
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.business_logic.concept_mapping_service import normalize_key
+from src.utils.tokens import keyword_tokens, tokenize
+
+Hits = Dict[str, Dict[str, int]]  # concept key → keyword → occurrences
+
+class KeywordAutomaton:
+    """An Aho-Corasick automaton over token sequences."""
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Hashable]] = [[]]
+        self.vocabulary = set()  # every token that appears in some pattern
+        self._built = False
+
+    def add(self, tokens: Sequence[str], value: Hashable):
+        """Adds a pattern; `value` is reported whenever it matches."""
+        if not tokens:
+            raise ValueError("Cannot add an empty pattern.")
+        state = 0
+        for token in tokens:
+            next_state = self._goto[state].get(token)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][token] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = next_state
+        self._out[state].append(value)
+        self.vocabulary.update(tokens)
+        self._built = False
+
+    def build(self):
+        """Computes failure links breadth-first and merges outputs along them."""
+        queue = list(self._goto[0].values())
+        for state in queue:
+            self._fail[state] = 0
+        for state in queue:  # the list grows while it is walked: a BFS
+            for token, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(token, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+        self._built = True
+
+    def iter_matches(self, tokens: Iterable[str]) -> Iterator[Tuple[int, Hashable]]:
+        """Yields (index of the last token, value) for every pattern occurrence."""
+        if not self._built:
+            self.build()
+        goto, fail, out = self._goto, self._fail, self._out
+        root = goto[0]
+        state = 0
+        for i, token in enumerate(tokens):
+            if state == 0:
+                state = root.get(token, 0)
+            else:
+                while state and token not in goto[state]:
+                    state = fail[state]
+                state = goto[state].get(token, 0)
+            if out[state]:
+                for value in out[state]:
+                    yield i, value
+
+class KeywordValidator:
+    """
+    Validates code chunks against the keywords of many concepts at once.
+
+    `concepts` maps a concept key to its keywords. Keywords are matched as
+    whole token sequences and are case-sensitive, like the code they
+    describe.
+    """
+    def __init__(self, concepts: Dict[str, List[str]]):
+        self.concepts = concepts
+        self.automaton = KeywordAutomaton()
+        for key, keywords in concepts.items():
+            for keyword in keywords:
+                tokens = keyword_tokens(keyword)
+                if tokens:
+                    self.automaton.add(tokens, (key, keyword))
+        self.automaton.build()
+
+    @classmethod
+    def from_taxonomy(cls, taxonomy_path: str) -> "KeywordValidator":
+        """Builds a validator from a taxonomy file such as config/taxonomies/python_core.json."""
+        with open(taxonomy_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls({normalize_key(c["name"]): c.get("keywords", []) for c in data["concepts"]})
+
+    @classmethod
+    def from_concept_map(cls, concept_map) -> "KeywordValidator":
+        """Builds a validator from the concepts loaded into a ConceptMap."""
+        return cls({key: concept.keywords for key, concept in concept_map.concepts.items()})
+
+    def _hits(self, tokens: List[str]) -> Hits:
+        hits: Hits = {}
+        for _, (key, keyword) in self.automaton.iter_matches(tokens):
+            counts = hits.setdefault(key, {})
+            counts[keyword] = counts.get(keyword, 0) + 1
+        return hits
+
+    def validate(self, text: str) -> Hits:
+        """Returns the keyword hits of every concept found in `text`."""
+        return self._hits(tokenize(text))
+
+    def validate_many(self, chunks: Iterable[str]) -> List[Hits]:
+        """
+        Validates many chunks, returning one result per chunk in order.
+
+        Chunks sharing no token with any keyword are rejected by a set
+        check before the automaton runs.
+        """
+        vocabulary = self.automaton.vocabulary
+        results = []
+        for chunk in chunks:
+            tokens = tokenize(chunk)
+            results.append(self._hits(tokens) if not vocabulary.isdisjoint(tokens) else {})
+        return results
+
+    def matching_concepts(self, chunks: Iterable[str], min_keywords: int = 1) -> List[List[str]]:
+        """For each chunk, the concepts with at least `min_keywords` distinct keywords present."""
+        return [[key for key, counts in hits.items() if len(counts) >= min_keywords]
+                for hits in self.validate_many(chunks)]
+
+def main():
+    """Reports which concepts' keywords appear in each given file."""
+    if len(sys.argv) < 3:
+        print("Usage: keyword_validators.py <taxonomy.json> <file> [<file> ...]", file=sys.stderr)
+        sys.exit(1)
+    validator = KeywordValidator.from_taxonomy(sys.argv[1])
+    paths = sys.argv[2:]
+    contents = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            contents.append(f.read())
+    for path, hits in zip(paths, validator.validate_many(contents)):
+        found = ", ".join(f"{key} ({', '.join(sorted(counts))})" for key, counts in sorted(hits.items()))
+        print(f"{'✅' if hits else '  '} {path}: {found or 'no keywords'}")
 
+if __name__ == "__main__":
+    main()
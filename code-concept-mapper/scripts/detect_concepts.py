@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Scans a repository for structural implementations of concepts and writes
+candidate mappings as JSONL, ready for `concept_mapper add-batch`.
+
+Every file is parsed once and all detectors (context managers, decorators,
+generators) are evaluated in that single pass. Files are spread over a
+process pool.
+
+    python scripts/detect_concepts.py corpus/flask --output candidates.jsonl
+    python scripts/detect_concepts.py corpus/flask --taxonomy config/taxonomies/python_core.json \\
+        | python ground_truth/tools/concept_mapper.py add-batch
+"""
+import argparse
+import json
+import os
+import sys
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.business_logic.detectors import DETECTORS, detect_files
+from src.utils.symbol_index import walk_source_files
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("root", help="Root directory of the repository to scan.")
+    parser.add_argument("--taxonomy", help="Only run detectors for the concepts of this taxonomy file.")
+    parser.add_argument("--output", default="-", help="JSONL file to write (default: stdout).")
+    parser.add_argument("--workers", type=int, default=None, help="Parser processes (default: one per core).")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.root):
+        print(f"❌ Not a directory: {args.root}", file=sys.stderr)
+        sys.exit(1)
+    concepts = None
+    if args.taxonomy:
+        with open(args.taxonomy, "r", encoding="utf-8") as f:
+            concepts = [c["name"] for c in json.load(f)["concepts"]]
+        unsupported = set(concepts) - {d.concept for d in DETECTORS}
+        if unsupported:
+            print(f"⚠️  No detector for: {', '.join(sorted(unsupported))}", file=sys.stderr)
+
+    paths = [os.path.join(args.root, rel_path) for rel_path in walk_source_files(args.root)]
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    counts, errors = {}, 0
+    try:
+        for path, detections, error in detect_files(paths, concepts, workers=args.workers):
+            if error:
+                errors += 1
+                print(f"⚠️  Skipped {path}: {error}", file=sys.stderr)
+            for detection in detections:
+                out.write(json.dumps(detection.to_batch_entry(path)) + "\n")
+                counts[detection.concept] = counts.get(detection.concept, 0) + 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    found = ", ".join(f"{concept}: {count}" for concept, count in sorted(counts.items())) or "nothing"
+    print(f"🧭 Scanned {len(paths)} files ({errors} skipped). Candidates: {found}.", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,165 @@
+#!/usr/bin/env python3
 """
-evaluate_accuracy.py
+Evaluates retrieval against the ground truth: every concept of the concept
+map goes through a provider, and the chunks it returns are scored against
+the implementations mapped for that concept.
 
-Created: 2025-12-05
-TODO: Implement
+A retrieved chunk is relevant when it overlaps the lines of a mapped
+implementation in the same file. Reported per concept and as means over
+all concepts with mappings: P@k, recall@k, MRR and nDCG@k. Latency is
+reported as p50/p95/p99 per query, with queries per second over the run.
+
+Results are written as JSON, to compare runs with --baseline or to gate on
+a minimum precision with --min-precision.
+
+    python scripts/local_index.py build corpus/flask
+    python scripts/evaluate_accuracy.py --k 5
+    python scripts/evaluate_accuracy.py --rerank --candidates 50 \\
+        --baseline phase1_validation/results/phase1a_results.json --output /tmp/reranked.json
 """
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.business_logic.concept_mapping_service import normalize_key
+from src.business_logic.evaluation import compare_metrics, evaluate_query, latency_summary, summarize
+from src.business_logic.rankers import MultiSignalRanker
+from src.business_logic.taxonomy import concept_queries
+from src.providers.local_provider import LocalProvider
+from src.utils.sqlite_state_manager import SQLiteStateManager
+from src.utils.state_manager import StateManager
+
+DATA_DIR = os.path.join(project_root, 'ground_truth', 'data')
+DEFAULT_STATE = os.path.join(DATA_DIR, 'concepts_map.json')
+DEFAULT_INDEX = os.path.join(DATA_DIR, 'local_index')
+DEFAULT_OUTPUT = os.path.join(project_root, 'phase1_validation', 'results', 'phase1a_results.json')
+
+def load_concept_map(state_path: str):
+    if state_path.endswith(".sqlite3"):
+        manager = SQLiteStateManager(state_file_path=state_path)
+    else:
+        manager = StateManager(state_file_path=state_path, keep_backups=False)
+    return manager.load_state()
+
+def display_path(path: str) -> str:
+    """Paths inside the project are recorded relative to it, so results compare across checkouts."""
+    path = os.path.abspath(path)
+    return os.path.relpath(path, project_root) if path.startswith(project_root + os.sep) else path
+
+def taxonomy_keys(taxonomy_path: str) -> set:
+    with open(taxonomy_path, "r", encoding="utf-8") as f:
+        return {normalize_key(c["name"]) for c in json.load(f)["concepts"]}
+
+def print_report(report: dict, deltas: dict):
+    metrics, latency = report["metrics"], report["latency"]
+    k = metrics["k"]
+    change = lambda name: f" ({deltas[name]:+.4f})" if name in deltas else ""
+    print(f"📊 {metrics['judged']} concepts with mappings ({metrics['unjudged']} without, "
+          f"{metrics['errors']} failed), k = {k}", file=sys.stderr)
+    for name in (f"precision_at_{k}", f"recall_at_{k}", "mrr", f"ndcg_at_{k}", "hit_rate"):
+        print(f"   {name:<16} {metrics[name]:.4f}{change(name)}", file=sys.stderr)
+    print(f"⏱️  p50 {latency['p50_ms']:.1f} ms, p95 {latency['p95_ms']:.1f} ms, p99 {latency['p99_ms']:.1f} ms, "
+          f"{latency['qps']:.1f} queries/s", file=sys.stderr)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--state", default=DEFAULT_STATE,
+                        help="Ground truth: a concepts_map.json or .sqlite3 state file (default: %(default)s).")
+    parser.add_argument("--taxonomy", help="Only evaluate the concepts of this taxonomy file.")
+    parser.add_argument("--index", default=DEFAULT_INDEX, help="Local index directory (default: %(default)s).")
+    parser.add_argument("--k", type=int, default=5, help="Cut-off of every metric (default: %(default)s).")
+    parser.add_argument("--candidates", type=int, default=None,
+                        help="Chunks retrieved per concept (default: k, or 50 with --rerank).")
+    parser.add_argument("--rerank", action="store_true",
+                        help="Rerank the candidates with the multi-signal ranker before scoring.")
+    parser.add_argument("--batch", action="store_true",
+                        help="Send all queries as one batch. Faster, but latency is then per batch, not per query.")
+    parser.add_argument("--concurrency", type=int, default=None, help="Queries in flight at once.")
+    parser.add_argument("--timeout", type=float, default=None, help="Seconds before a query is abandoned.")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="JSON results file (default: %(default)s).")
+    parser.add_argument("--baseline", help="A previous results file to report changes against.")
+    parser.add_argument("--min-precision", type=float, default=None,
+                        help="Exit with status 1 if P@k falls below this value.")
+    args = parser.parse_args()
+
+    concept_map = load_concept_map(args.state)
+    if not concept_map or not concept_map.concepts:
+        print(f"❌ No concepts found in {args.state}. Run 'init' and 'load-concepts' first.", file=sys.stderr)
+        sys.exit(1)
+    try:
+        provider = LocalProvider(args.index)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"❌ {e} Build one with scripts/local_index.py.", file=sys.stderr)
+        sys.exit(1)
+
+    candidates = args.candidates or (50 if args.rerank else args.k)
+    queries = concept_queries(concept_map, max(candidates, args.k))
+    if args.taxonomy:
+        wanted = taxonomy_keys(args.taxonomy)
+        queries = [q for q in queries if q.concept in wanted]
+    print(f"🔎 Evaluating {len(queries)} concepts against {len(provider.index)} chunks...", file=sys.stderr)
+
+    retrieve = provider.retrieve_many if args.batch else provider.retrieve_each
+    start = time.perf_counter()
+    results = asyncio.run(retrieve(queries, args.concurrency, args.timeout))
+    wall_seconds = time.perf_counter() - start
+    rerank_seconds = 0.0
+    ranked = [r.chunks for r in results]
+    if args.rerank:
+        start = time.perf_counter()
+        ranker = MultiSignalRanker.from_concept_map(concept_map)
+        ranked = [[r.chunk for r in chunks] for chunks in ranker.rank_results(results, args.k)]
+        rerank_seconds = time.perf_counter() - start
+
+    evaluations = [evaluate_query(r.query.concept, chunks, concept_map.concepts[r.query.concept].implementations,
+                                  args.k, r.seconds, r.error) for r, chunks in zip(results, ranked)]
+    report = {
+        "run": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "state": display_path(args.state),
+            "taxonomy": display_path(args.taxonomy) if args.taxonomy else None,
+            "provider": provider.name,
+            "index": display_path(args.index),
+            "index_kind": provider.index.kind,
+            "index_version": provider.version,
+            "chunks": len(provider.index),
+            "k": args.k,
+            "candidates": candidates,
+            "rerank": args.rerank,
+            "mode": "batch" if args.batch else "per_query",
+        },
+        "metrics": summarize(evaluations, args.k),
+        "latency": dict(latency_summary([r.seconds for r in results], wall_seconds),
+                        rerank_seconds=round(rerank_seconds, 4)),
+        "concepts": [e.to_dict() for e in evaluations],
+    }
+    deltas = {}
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        deltas = compare_metrics(report["metrics"], baseline.get("metrics", {}))
+        report["baseline"] = {"path": args.baseline, "timestamp": baseline.get("run", {}).get("timestamp"),
+                              "changes": deltas}
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+    print_report(report, deltas)
+    print(f"✅ Results written to {args.output}", file=sys.stderr)
+
+    precision = report["metrics"][f"precision_at_{args.k}"]
+    if args.min_precision is not None and precision < args.min_precision:
+        print(f"❌ P@{args.k} {precision:.4f} is below the required {args.min_precision:.4f}", file=sys.stderr)
+        sys.exit(1)
 
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Builds and searches the local indexes used by the offline retrieval
+provider (src/providers/local_provider.py).
+
+Chunks follow the code's structure: every class or function that fits in
+the token budget (--max-tokens, 250 by default) is one chunk, and larger
+ones are split at statement boundaries, consecutive parts sharing up to
+--overlap tokens. Files are chunked across a worker pool as the index is
+written. `--chunker definitions` indexes one chunk per function and method
+instead, whatever its size. A `bm25`
+index matches queries against code-aware terms: identifiers are split into
+their camelCase and snake_case parts, and dunder names are kept whole. A
+`dense` index stores one embedding per chunk as float16 or int8, from the
+deterministic `hashing` embedding unless another one is registered.
+
+    python scripts/local_index.py build corpus/flask
+    python scripts/local_index.py --index /tmp/flask_dense build corpus/flask --kind dense --dtype int8
+    python scripts/local_index.py search "context manager __enter__ __exit__" --top-k 10
+"""
+import argparse
+import os
+import sys
+import time
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.providers.chunker import DEFAULT_MAX_TOKENS, DEFAULT_OVERLAP, iter_chunks
+from src.providers.local_provider import (EMBEDDINGS, INDEX_KINDS, VECTOR_DTYPES, BM25Index, DenseIndex,
+                                          get_embedding, iter_definition_chunks, open_index)
+
+DEFAULT_INDEX = os.path.join(project_root, 'ground_truth', 'data', 'local_index')
+
+def build(args):
+    if not os.path.isdir(args.root):
+        print(f"❌ Not a directory: {args.root}", file=sys.stderr)
+        sys.exit(1)
+    print(f"🔎 Indexing {args.root}...")
+    start = time.perf_counter()
+    if args.chunker == "definitions":
+        chunks = iter_definition_chunks(args.root)
+    else:
+        try:
+            chunks = iter_chunks(args.root, args.max_tokens, args.overlap, args.workers)
+        except ValueError as e:
+            print(f"❌ {e}", file=sys.stderr)
+            sys.exit(1)
+    if args.kind == "dense":
+        index = DenseIndex.build(chunks, args.index, get_embedding(args.embedding, args.dim), args.dtype)
+        details = f"{args.dim} x {args.dtype}"
+    else:
+        index = BM25Index.build(chunks, args.index)
+        details = f"{index.meta['terms']} terms"
+    elapsed = time.perf_counter() - start
+    print(f"✅ Indexed {len(index)} chunks ({details}) in {elapsed:.2f}s into {args.index}")
+
+def search(args):
+    try:
+        index = open_index(args.index)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(1)
+    start = time.perf_counter()
+    results = index.search(args.query, args.top_k)
+    elapsed = (time.perf_counter() - start) * 1000
+    for rank, chunk in enumerate(results, 1):
+        print(f"{rank:>3}. {chunk.score:7.3f}  {chunk.file_path}:{chunk.line_start}-{chunk.line_end}  {chunk.identifier}")
+    print(f"🔎 {len(results)} result(s) from {len(index)} chunks in {elapsed:.1f} ms", file=sys.stderr)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--index", default=DEFAULT_INDEX, help="Index directory (default: %(default)s).")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help="Index every function and method of a repository.")
+    build_parser.add_argument("root", help="Root directory of the repository to index.")
+    build_parser.add_argument("--kind", choices=list(INDEX_KINDS), default="bm25")
+    build_parser.add_argument("--dtype", choices=list(VECTOR_DTYPES), default="float16",
+                              help="Storage of dense vectors (default: %(default)s).")
+    build_parser.add_argument("--embedding", choices=list(EMBEDDINGS), default="hashing")
+    build_parser.add_argument("--dim", type=int, default=256, help="Dense vector dimensions (default: %(default)s).")
+    build_parser.add_argument("--chunker", choices=["ast", "definitions"], default="ast")
+    build_parser.add_argument("--max-tokens", type=int, default=DEFAULT_MAX_TOKENS,
+                              help="Token budget of an ast chunk (default: %(default)s).")
+    build_parser.add_argument("--overlap", type=int, default=DEFAULT_OVERLAP,
+                              help="Tokens shared by consecutive parts of a split definition (default: %(default)s).")
+    build_parser.add_argument("--workers", type=int, default=None, help="Chunker processes (default: one per core).")
+    build_parser.set_defaults(func=build)
+
+    search_parser = subparsers.add_parser("search", help="Print the best-matching chunks for a query.")
+    search_parser.add_argument("query")
+    search_parser.add_argument("--top-k", type=int, default=5)
+    search_parser.set_defaults(func=search)
+
+    args = parser.parse_args()
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,31 @@
+import asyncio
 import sys
 import json
 from pathlib import Path
 from datetime import datetime
-from typing import Optional
+from typing import Dict, Iterable, List, Optional, TextIO, Tuple
 
 from src.domain.models import Concept, Implementation
 from src.utils.state_manager import StateManager
-from src.utils.code_parser import find_lines_by_identifier, extract_snippet
+from src.utils.code_parser import get_source_file, resolve_identifier, format_candidates, extract_snippet
+from src.business_logic import refresh
+from src.business_logic.coverage import CoverageWriter, stream_coverage
+from src.business_logic.taxonomy import concept_queries
+
+CONFIDENCE_LEVELS = ("high", "medium", "low")
+BATCH_REQUIRED_FIELDS = ("concept", "file", "type", "evidence")
+BATCH_STRING_FIELDS = ("concept", "file", "identifier", "lines", "confidence", "type", "evidence")
 
 def normalize_key(name: str) -> str:
     """Creates a consistent key from a display name."""
     return name.lower().strip().replace(" ", "_").replace("-", "_")
 
+def parse_line_range(lines: str) -> Tuple[int, int]:
+    """Parses a 'start-end' string. Raises ValueError on a malformed range."""
+    parts = lines.split("-")
+    if len(parts) != 2: raise ValueError("Expected format: start-end")
+    return int(parts[0]), int(parts[1])
+
 class ConceptMappingService:
     def __init__(self, state_manager: StateManager):
         self.state_manager = state_manager
@@ -64,7 +78,7 @@ class ConceptMappingService:
                         languages=concept_data.get('languages', []),
                         category=concept_data.get('category')
                     )
-                    state.concepts[key] = new_concept
+                    state.add_concept(key, new_concept)
                     loaded_count += 1
                 else:
                     skipped_count += 1
@@ -108,10 +122,9 @@ class ConceptMappingService:
             print(f"❌ Could not read file content at {file_path}:{final_start}-{final_end}", file=sys.stderr)
             return
 
-        for impl in state.concepts[key].implementations:
-            if impl.file_path == file_path and impl.line_start == final_start:
-                print(f"⚠️  Duplicate detected at {file_path}:{final_start}. Skipping.")
-                return
+        if state.find_implementation(key, file_path, final_start):
+            print(f"⚠️  Duplicate detected at {file_path}:{final_start}. Skipping.")
+            return
 
         new_impl = Implementation(
             file_path=file_path, identifier=identifier, line_start=final_start,
@@ -119,26 +132,163 @@ class ConceptMappingService:
             pattern_type=pattern_type, evidence=evidence, added_at=datetime.now().isoformat(),
         )
 
-        state.concepts[key].implementations.append(new_impl)
+        state.add_implementation(key, new_impl)
         if self.state_manager.save_state(state):
             print(f"✅ Mapped '{concept_name}' → {file_path} ({final_start}-{final_end})")
         else:
             print(f"❌ Failed to save mapping", file=sys.stderr)
 
+    def add_mappings_from_jsonl(self, stream: TextIO) -> List[Dict]:
+        """Reads one mapping per JSONL line and applies them as a single batch."""
+        entries: List[Dict] = []
+        for line_no, raw in enumerate(stream, start=1):
+            if not raw.strip():
+                continue
+            try:
+                entry = json.loads(raw)
+                if not isinstance(entry, dict):
+                    raise ValueError("expected a JSON object")
+            except ValueError as e:
+                entry = {"_error": f"Invalid JSON on line {line_no}: {e}"}
+            entries.append(entry)
+        return self.add_mappings_batch(entries)
+
+    def add_mappings_batch(self, entries: Iterable[Dict]) -> List[Dict]:
+        """
+        Applies many mappings with one state load and one atomic save.
+
+        Entries use the same field names as the `add` flags (concept, file,
+        identifier, lines, confidence, type, evidence). They are grouped by
+        source file so every file is read and parsed at most once. Returns
+        one result dict per entry, in input order.
+        """
+        entries = list(entries)
+        results: List[Dict] = [{"index": i, "status": "pending"} for i in range(len(entries))]
+
+        state = self.state_manager.load_state()
+        if not state:
+            print("❌ No state file found. Run 'init' first.", file=sys.stderr)
+            return []
+
+        added_at = datetime.now().isoformat()  # one timestamp for the whole batch
+        by_file: Dict[str, List[int]] = {}
+        for i, entry in enumerate(entries):
+            error = self._validate_batch_entry(entry)
+            if error:
+                results[i].update(status="error", message=error)
+                continue
+            if normalize_key(entry["concept"]) not in state.concepts:
+                results[i].update(status="error", message=f"Concept '{entry['concept']}' not found.")
+                continue
+            by_file.setdefault(entry["file"], []).append(i)
+
+        added = 0
+        for file_path, indices in by_file.items():
+            try:
+                source = get_source_file(file_path)
+            except Exception as e:
+                for i in indices:
+                    results[i].update(status="error", message=f"Failed to read {file_path}: {e}")
+                continue
+
+            for i in indices:
+                entry = entries[i]
+                key = normalize_key(entry["concept"])
+                identifier = entry.get("identifier")
+
+                start = end = None
+                matches = source.resolve(identifier) if identifier else []
+                if len(matches) == 1:
+                    start, end = matches[0].line_start, matches[0].line_end
+                elif len(matches) > 1 and not entry.get("lines"):
+                    results[i].update(status="error", message=f"Identifier '{identifier}' is ambiguous: {format_candidates(matches)}")
+                    continue
+                if not (start and end) and entry.get("lines"):
+                    try:
+                        start, end = parse_line_range(entry["lines"])
+                    except ValueError as e:
+                        results[i].update(status="error", message=f"Invalid line format: {e}")
+                        continue
+                if not start:
+                    results[i].update(status="error", message="Could not determine lines.")
+                    continue
+
+                snippet = source.snippet(start, end)
+                if not snippet:
+                    results[i].update(status="error", message=f"Could not read file content at {file_path}:{start}-{end}")
+                    continue
+
+                if state.find_implementation(key, file_path, start):
+                    results[i].update(status="duplicate", message=f"Duplicate detected at {file_path}:{start}.")
+                    continue
+
+                state.add_implementation(key, Implementation(
+                    file_path=file_path, identifier=identifier, line_start=start,
+                    line_end=end, code_snippet=snippet, confidence=entry.get("confidence", "high"),
+                    pattern_type=entry["type"], evidence=entry["evidence"], added_at=added_at,
+                ))
+                results[i].update(status="added", concept=entry["concept"], file=file_path, line_start=start, line_end=end)
+                added += 1
+
+        if added and not self.state_manager.save_state(state):
+            print("❌ Failed to save batch; no mappings were written.", file=sys.stderr)
+            for result in results:
+                if result["status"] == "added":
+                    result.update(status="error", message="Save failed.")
+
+        self._print_batch_results(results)
+        return results
+
+    @staticmethod
+    def _validate_batch_entry(entry: Dict) -> Optional[str]:
+        if "_error" in entry:
+            return entry["_error"]
+        not_strings = [name for name in BATCH_STRING_FIELDS
+                       if entry.get(name) is not None and not isinstance(entry[name], str)]
+        if not_strings:
+            return "Expected string value(s) for: " + ", ".join(
+                f"{name} (got {type(entry[name]).__name__})" for name in not_strings)
+        missing = [name for name in BATCH_REQUIRED_FIELDS if not entry.get(name)]
+        if missing:
+            return f"Missing required field(s): {', '.join(missing)}"
+        if not entry.get("identifier") and not entry.get("lines"):
+            return "Provide an 'identifier' or 'lines'."
+        if entry.get("confidence", "high") not in CONFIDENCE_LEVELS:
+            return f"Invalid confidence '{entry['confidence']}'."
+        return None
+
+    @staticmethod
+    def _print_batch_results(results: List[Dict]):
+        counts: Dict[str, int] = {}
+        for result in results:
+            status = result["status"]
+            counts[status] = counts.get(status, 0) + 1
+            if status == "added":
+                print(f"✅ [{result['index']}] Mapped '{result['concept']}' → {result['file']} ({result['line_start']}-{result['line_end']})")
+            elif status == "duplicate":
+                print(f"⚠️  [{result['index']}] {result['message']} Skipping.")
+            else:
+                print(f"❌ [{result['index']}] {result['message']}", file=sys.stderr)
+        print(f"📦 Batch complete: {counts.get('added', 0)} added, "
+              f"{counts.get('duplicate', 0)} duplicates, {counts.get('error', 0)} errors.")
+
     def _determine_lines(self, file_path, identifier, lines):
         if identifier:
             print(f"🔎 Scanning {file_path} for identifier '{identifier}'...")
-            start, end = find_lines_by_identifier(file_path, identifier)
-            if start and end:
-                print(f"   ✓ Found at lines {start}-{end}")
+            matches = resolve_identifier(file_path, identifier)
+            if len(matches) == 1 and matches[0].line_end:
+                start, end = matches[0].line_start, matches[0].line_end
+                print(f"   ✓ Found {matches[0].qualname} at lines {start}-{end}")
                 return start, end
-            print(f"   ⚠️  Identifier '{identifier}' not found in AST. Falling back to --lines if provided.")
+            if len(matches) > 1:
+                print(f"   ⚠️  Identifier '{identifier}' is ambiguous ({len(matches)} definitions): {format_candidates(matches)}")
+                print("      Use a qualified name (e.g. 'Class.method'). Falling back to --lines if provided.")
+            else:
+                print(f"   ⚠️  Identifier '{identifier}' not found in the file. Falling back to --lines if provided.")
 
         if lines:
             try:
-                parts = lines.split("-")
-                if len(parts) != 2: raise ValueError("Expected format: start-end")
-                start, end = int(parts[0]), int(parts[1])
+                start, end = parse_line_range(lines)
                 print(f"   Using manual line range: {start}-{end}")
                 return start, end
             except ValueError as e:
@@ -148,6 +298,112 @@ class ConceptMappingService:
         print("❌ Could not determine lines. Provide a valid --identifier or --lines.", file=sys.stderr)
         return None, None
 
+    def refresh_mappings(self, workers: Optional[int] = None, check_only: bool = False) -> List[Dict]:
+        """
+        Re-anchors every mapping to the current source code.
+
+        Each identifier is resolved again and the code at its lines is
+        compared with the stored snippet by hash. Moved or edited code gets
+        its lines and snippet updated; mappings whose code is gone or
+        ambiguous are reported and left as they are. With `check_only`,
+        drift is reported but nothing is saved.
+        Files are checked in parallel and the map is saved once. Returns
+        one result per mapping that is not unchanged.
+        """
+        state = self.state_manager.load_state()
+        if not state:
+            print("❌ No state file found. Run 'init' first.", file=sys.stderr)
+            return []
+
+        mapped = {file_path: state.implementations_for_file(file_path) for file_path in state.mapped_files()}
+        by_file = {
+            file_path: [(impl.identifier, impl.line_start, impl.line_end, refresh.snippet_hash(impl.code_snippet),
+                         impl.code_snippet) for _, impl in pairs]
+            for file_path, pairs in mapped.items()
+        }
+        checked = refresh.check_files(by_file, workers=workers)
+
+        results: List[Dict] = []
+        unchanged = 0
+        for file_path, pairs in mapped.items():
+            for (key, impl), (status, start, end, snippet, message) in zip(pairs, checked[file_path]):
+                if status == refresh.UNCHANGED:
+                    unchanged += 1
+                    continue
+                results.append({"concept": key, "file": file_path, "identifier": impl.identifier,
+                                "status": status, "line_start": impl.line_start, "line_end": impl.line_end,
+                                "new_line_start": start, "new_line_end": end, "message": message})
+                if status in refresh.UPDATED_STATUSES and not check_only:
+                    impl.line_start, impl.line_end = start, end
+                    if snippet is not None:
+                        impl.code_snippet = state.snippets.intern(snippet)
+
+        updated = sum(1 for r in results if r["status"] in refresh.UPDATED_STATUSES)
+        for r in results:
+            where = f"{r['file']}:{r['line_start']}-{r['line_end']}"
+            if r["status"] in refresh.UPDATED_STATUSES:
+                print(f"🔄 [{r['status']}] {r['concept']} {where} → {r['new_line_start']}-{r['new_line_end']}")
+            else:
+                print(f"⚠️  [{r['status']}] {r['concept']} {where}: {r['message']}", file=sys.stderr)
+
+        if updated and not check_only:
+            state.mark_modified()
+            if not self.state_manager.save_state(state):
+                print("❌ Failed to save refreshed mappings.", file=sys.stderr)
+                return results
+        flagged = len(results) - updated
+        print(f"🔁 Refresh complete: {unchanged} unchanged, {updated} {'drifted' if check_only else 'updated'}, "
+              f"{flagged} flagged.")
+        return results
+
+    def report_coverage(self, provider, output: TextIO, output_format: str = "jsonl", top_k: int = 20,
+                        min_score: float = 0.0, max_concurrency: Optional[int] = None,
+                        timeout: Optional[float] = None) -> Optional[Dict]:
+        """
+        Runs every loaded concept through a retrieval provider and streams
+        per-file and per-directory coverage rows to `output` as each
+        concept's results arrive. Progress and the summary go to stderr, so
+        the rows can be written to stdout. Returns the summary.
+        """
+        state = self.state_manager.load_state()
+        if not state:
+            print("❌ No state file found. Run 'init' first.", file=sys.stderr)
+            return None
+        if not state.concepts:
+            print("❌ No concepts loaded yet. Use 'load-concepts' to add a taxonomy.", file=sys.stderr)
+            return None
+
+        queries = concept_queries(state, top_k)
+        writer = CoverageWriter(output, output_format)
+        print(f"🧭 Retrieving {len(queries)} concepts through '{provider.name}'...", file=sys.stderr)
+        summary = asyncio.run(stream_coverage(provider, queries, writer, min_score, max_concurrency, timeout))
+        for error in summary["errors"]:
+            print(f"⚠️  {error['concept']}: {error['error']}", file=sys.stderr)
+        print(f"✅ Coverage: {summary['covered']}/{summary['concepts']} concepts found, "
+              f"{len(summary['errors'])} failed, {summary['cached']} from cache, {summary['rows']} rows written.",
+              file=sys.stderr)
+        if summary["uncovered"]:
+            print(f"   Not found: {', '.join(summary['uncovered'])}", file=sys.stderr)
+        return summary
+
+    def show_file_concepts(self, file_path: str):
+        """Lists the concepts mapped in a file, using the file → concepts index."""
+        state = self.state_manager.load_state()
+        if not state:
+            print("❌ No state file found. Run 'init' first.", file=sys.stderr)
+            return
+
+        mapped = state.implementations_for_file(file_path)
+        if not mapped:
+            print(f"   No concepts are mapped in {file_path}.")
+            return
+        print(f"\n📄 {file_path}")
+        print("-" * 40)
+        for key, impl in sorted(mapped, key=lambda item: item[1].line_start):
+            name = impl.identifier or "(lines)"
+            print(f"   • {state.concepts[key].display_name:<20} {name} ({impl.line_start}-{impl.line_end})")
+        print("-" * 40)
+
     def show_status(self):
         state = self.state_manager.load_state()
         if not state:
@@ -0,0 +1,89 @@
+import csv
+import json
+import posixpath
+from typing import Dict, Iterable, List, Optional, TextIO
+
+from src.providers.base import CodeChunk, RetrievalProvider, RetrievalQuery
+
+COVERAGE_FORMATS = ("jsonl", "csv")
+FIELDS = ("level", "path", "concept", "chunks", "best_score", "identifiers")
+
+def parent_dirs(file_path: str) -> List[str]:
+    """Every directory containing a file, innermost first, ending with the root `.`."""
+    dirs = []
+    directory = posixpath.dirname(file_path.replace("\\", "/"))
+    while directory:
+        dirs.append(directory)
+        directory = posixpath.dirname(directory)
+    dirs.append(".")
+    return dirs
+
+def _row(level: str, path: str, concept: str, chunks: List[CodeChunk]) -> dict:
+    identifiers = [c.identifier or f"{c.file_path}:{c.line_start}-{c.line_end}" for c in chunks]
+    return {"level": level, "path": path, "concept": concept, "chunks": len(chunks),
+            "best_score": round(max(c.score for c in chunks), 4), "identifiers": list(dict.fromkeys(identifiers))}
+
+def coverage_rows(concept: str, chunks: Iterable[CodeChunk], min_score: float = 0.0) -> List[dict]:
+    """
+    The coverage of one concept: a row per file holding a retrieved chunk,
+    then a row per directory above those files, up to the repository root.
+    Chunks scoring below `min_score` do not count.
+    """
+    files: Dict[str, List[CodeChunk]] = {}
+    for chunk in chunks:
+        if chunk.score >= min_score:
+            files.setdefault(chunk.file_path, []).append(chunk)
+    dirs: Dict[str, List[CodeChunk]] = {}
+    rows = []
+    for file_path, found in files.items():
+        rows.append(_row("file", file_path, concept, found))
+        for directory in parent_dirs(file_path):
+            dirs.setdefault(directory, []).extend(found)
+    rows.extend(_row("directory", directory, concept, found) for directory, found in dirs.items())
+    return rows
+
+class CoverageWriter:
+    """Writes coverage rows as JSONL or CSV, flushing after every concept so partial output is usable."""
+    def __init__(self, stream: TextIO, output_format: str = "jsonl"):
+        if output_format not in COVERAGE_FORMATS:
+            raise ValueError(f"Unknown coverage format '{output_format}'. Choose from: {', '.join(COVERAGE_FORMATS)}")
+        self.stream = stream
+        self.output_format = output_format
+        self.rows = 0
+        self._csv = None
+        if output_format == "csv":
+            self._csv = csv.DictWriter(stream, FIELDS)
+            self._csv.writeheader()
+
+    def write(self, rows: List[dict]):
+        for row in rows:
+            if self._csv is not None:
+                self._csv.writerow(dict(row, identifiers=" ".join(row["identifiers"])))
+            else:
+                self.stream.write(json.dumps(row) + "\n")
+        self.rows += len(rows)
+        self.stream.flush()
+
+async def stream_coverage(provider: RetrievalProvider, queries: List[RetrievalQuery], writer: CoverageWriter,
+                          min_score: float = 0.0, max_concurrency: Optional[int] = None,
+                          timeout: Optional[float] = None) -> dict:
+    """
+    Retrieves every concept query concurrently and writes its coverage rows
+    as soon as its results arrive. Only the summary is kept in memory.
+    """
+    summary = {"concepts": len(queries), "covered": 0, "cached": 0, "rows": 0,
+               "uncovered": [], "errors": []}
+    async for result in provider.stream(queries, max_concurrency, timeout):
+        concept = result.query.concept or result.query.text
+        if not result.ok:
+            summary["errors"].append({"concept": concept, "error": result.error})
+            continue
+        rows = coverage_rows(concept, result.chunks, min_score)
+        writer.write(rows)
+        summary["rows"] += len(rows)
+        summary["cached"] += result.cached
+        if rows:
+            summary["covered"] += 1
+        else:
+            summary["uncovered"].append(concept)
+    return summary
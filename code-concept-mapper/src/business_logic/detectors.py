@@ -0,0 +1,262 @@
+import ast
+import os
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+from src.utils.code_parser import qualified_name
+
+@dataclass
+class Definition:
+    """What one pass over a class or function body learned about it."""
+    node: ast.AST
+    qualname: str
+    kind: str
+    decorators: List[str]
+    parameters: List[str] = field(default_factory=list)
+    methods: Set[str] = field(default_factory=set)               # classes
+    yields: int = 0                                               # functions, own body only
+    yield_froms: int = 0
+    returned_names: List[str] = field(default_factory=list)
+    called_names: Set[str] = field(default_factory=set)
+    nested: Dict[str, "Definition"] = field(default_factory=dict)  # functions defined directly inside
+
+@dataclass
+class Detection:
+    """A candidate mapping: a definition that looks like an implementation of a concept."""
+    concept: str
+    qualname: str
+    line_start: int
+    line_end: Optional[int]
+    pattern_type: str
+    confidence: str
+    evidence: str
+
+    def to_batch_entry(self, file_path: str) -> dict:
+        """The mapping as an `add-batch` JSONL entry."""
+        return {"concept": self.concept, "file": file_path, "identifier": self.qualname,
+                "lines": f"{self.line_start}-{self.line_end}", "confidence": self.confidence,
+                "type": self.pattern_type, "evidence": self.evidence}
+
+class ConceptDetector(ABC):
+    """
+    Recognizes one concept from the facts collected about each definition.
+
+    `check` is called once per class or function, after its body has been
+    visited, and returns a Detection or None.
+    """
+    concept = ""
+
+    @abstractmethod
+    def check(self, definition: Definition) -> Optional[Detection]:
+        pass
+
+    def detection(self, definition: Definition, pattern_type: str, confidence: str, evidence: str) -> Detection:
+        node = definition.node
+        return Detection(self.concept, definition.qualname, node.lineno, getattr(node, "end_lineno", None),
+                         pattern_type, confidence, evidence)
+
+def _short(name: str) -> str:
+    return name.rsplit(".", 1)[-1]
+
+class ContextManagerDetector(ConceptDetector):
+    concept = "Context Managers"
+
+    def check(self, definition: Definition) -> Optional[Detection]:
+        if definition.kind == "class":
+            if {"__enter__", "__exit__"} <= definition.methods:
+                return self.detection(definition, "context_manager_class", "high",
+                                      "Defines __enter__ and __exit__ methods.")
+            if {"__aenter__", "__aexit__"} <= definition.methods:
+                return self.detection(definition, "async_context_manager_class", "high",
+                                      "Defines __aenter__ and __aexit__ methods.")
+            return None
+        for decorator in definition.decorators:
+            if _short(decorator) in ("contextmanager", "asynccontextmanager"):
+                return self.detection(definition, "context_manager_function", "high",
+                                      f"Generator decorated with @{decorator}.")
+        return None
+
+class DecoratorDetector(ConceptDetector):
+    concept = "Decorators"
+
+    def check(self, definition: Definition) -> Optional[Detection]:
+        # Functions defined inside functions are the wrappers and inner
+        # decorators of the outer one, which is what gets mapped.
+        if definition.kind == "class" or not definition.parameters or "<locals>" in definition.qualname:
+            return None
+        inner = next((definition.nested[name] for name in definition.returned_names
+                      if name in definition.nested), None)
+        if inner is None:
+            return None
+        innermost = next((inner.nested[name] for name in inner.returned_names if name in inner.nested), None)
+        if innermost is not None and inner.parameters:
+            wrapper, pattern_type = innermost, "decorator_factory"
+            evidence = f"Returns '{_short(inner.qualname)}', which returns the wrapper '{_short(innermost.qualname)}'."
+            wrapped = inner.parameters[0]
+        else:
+            wrapper, pattern_type = inner, "function_decorator"
+            evidence = f"Returns the inner function '{_short(inner.qualname)}'."
+            wrapped = definition.parameters[0]
+        uses_wraps = any(_short(d) == "wraps" for d in wrapper.decorators)
+        calls_wrapped = wrapped in wrapper.called_names
+        if uses_wraps:
+            evidence += " The wrapper uses functools.wraps."
+        elif calls_wrapped:
+            evidence += f" The wrapper calls '{wrapped}'."
+        return self.detection(definition, pattern_type, "high" if uses_wraps or calls_wrapped else "low", evidence)
+
+class GeneratorDetector(ConceptDetector):
+    concept = "Generators"
+
+    def check(self, definition: Definition) -> Optional[Detection]:
+        if definition.kind == "class" or not (definition.yields or definition.yield_froms):
+            return None
+        pattern_type = "async_generator" if definition.kind == "async_function" else "generator_function"
+        parts = []
+        if definition.yields:
+            parts.append(f"{definition.yields} yield expression(s)")
+        if definition.yield_froms:
+            parts.append(f"{definition.yield_froms} yield from delegation(s)")
+        return self.detection(definition, pattern_type, "high", f"Contains {' and '.join(parts)}.")
+
+DETECTORS: List[ConceptDetector] = [ContextManagerDetector(), DecoratorDetector(), GeneratorDetector()]
+
+def register_detector(detector: ConceptDetector):
+    """Adds a detector to the defaults. Its class must be importable for the detector to reach worker processes."""
+    DETECTORS.append(detector)
+
+def _dotted(node: ast.AST) -> str:
+    if isinstance(node, ast.Call):
+        return _dotted(node.func)
+    if isinstance(node, ast.Attribute):
+        base = _dotted(node.value)
+        return f"{base}.{node.attr}" if base else node.attr
+    if isinstance(node, ast.Name):
+        return node.id
+    return ""
+
+class ConceptVisitor(ast.NodeVisitor):
+    """
+    One pass over a module that evaluates every detector on every class and
+    function. Facts are attributed to the innermost enclosing definition;
+    lambdas get a frame of their own so their bodies do not count.
+    """
+    def __init__(self, detectors: List[ConceptDetector]):
+        self.detectors = detectors
+        self.detections: List[Detection] = []
+        self._stack: List[Optional[Definition]] = []
+
+    def _current_function(self) -> Optional[Definition]:
+        top = self._stack[-1] if self._stack else None
+        return top if top is not None and top.kind != "class" else None
+
+    def _visit_definition(self, node):
+        for decorator in node.decorator_list:  # evaluated in the enclosing scope
+            self.visit(decorator)
+        parent = self._stack[-1] if self._stack else None
+        kind = ("class" if isinstance(node, ast.ClassDef)
+                else "async_function" if isinstance(node, ast.AsyncFunctionDef) else "function")
+        definition = Definition(
+            node=node, kind=kind, decorators=[_dotted(d) for d in node.decorator_list],
+            qualname=qualified_name((parent.qualname, parent.kind) if parent else None, node.name),
+        )
+        if kind != "class":
+            args = node.args
+            definition.parameters = [a.arg for a in args.posonlyargs + args.args + args.kwonlyargs]
+            if parent is not None and parent.kind == "class" and definition.parameters:
+                del definition.parameters[0]  # self or cls
+        if parent is not None:
+            if parent.kind == "class":
+                parent.methods.add(node.name)
+            elif kind != "class":
+                parent.nested[node.name] = definition
+
+        self._stack.append(definition)
+        for statement in node.body:
+            self.visit(statement)
+        self._stack.pop()
+        for detector in self.detectors:
+            detection = detector.check(definition)
+            if detection is not None:
+                self.detections.append(detection)
+
+    visit_ClassDef = _visit_definition
+    visit_FunctionDef = _visit_definition
+    visit_AsyncFunctionDef = _visit_definition
+
+    def visit_Lambda(self, node):
+        self._stack.append(None)
+        self.generic_visit(node)
+        self._stack.pop()
+
+    def visit_Yield(self, node):
+        function = self._current_function()
+        if function is not None:
+            function.yields += 1
+        self.generic_visit(node)
+
+    def visit_YieldFrom(self, node):
+        function = self._current_function()
+        if function is not None:
+            function.yield_froms += 1
+        self.generic_visit(node)
+
+    def visit_Return(self, node):
+        function = self._current_function()
+        if function is not None and isinstance(node.value, ast.Name):
+            function.returned_names.append(node.value.id)
+        self.generic_visit(node)
+
+    def visit_Call(self, node):
+        function = self._current_function()
+        if function is not None and isinstance(node.func, ast.Name):
+            function.called_names.add(node.func.id)
+        self.generic_visit(node)
+
+def select_detectors(concepts: Optional[Iterable[str]] = None) -> List[ConceptDetector]:
+    """The registered detectors, restricted to the given concept names if any."""
+    if concepts is None:
+        return list(DETECTORS)
+    wanted = {c.lower() for c in concepts}
+    return [d for d in DETECTORS if d.concept.lower() in wanted]
+
+def detect_source(source: Union[str, bytes], file_path: str = "<string>",
+                  detectors: Optional[List[ConceptDetector]] = None) -> List[Detection]:
+    """Runs every detector over one module in a single pass. Detections come in source order."""
+    visitor = ConceptVisitor(DETECTORS if detectors is None else detectors)
+    visitor.visit(ast.parse(source, filename=file_path))
+    return sorted(visitor.detections, key=lambda d: (d.line_start, d.concept))
+
+def _detect_chunk(paths: List[str], detectors: List[ConceptDetector]) -> List[Tuple[str, List[Detection], Optional[str]]]:
+    results = []
+    for path in paths:
+        try:
+            with open(path, "rb") as f:
+                results.append((path, detect_source(f.read(), path, detectors), None))
+        except (OSError, SyntaxError, ValueError, RecursionError) as e:
+            results.append((path, [], f"{type(e).__name__}: {e}"))
+    return results
+
+def detect_files(paths: List[str], concepts: Optional[List[str]] = None, workers: Optional[int] = None,
+                 chunk_size: int = 32) -> Iterator[Tuple[str, List[Detection], Optional[str]]]:
+    """
+    Yields (path, detections, error) for every file, in input order, parsing
+    files across a process pool.
+
+    The detectors are selected here and sent to the workers with each task,
+    so detectors added with `register_detector` run in them whatever the
+    start method: a spawned worker re-imports this module and would only
+    know the built-in ones.
+    """
+    detectors = select_detectors(concepts)
+    chunks = [paths[i:i + chunk_size] for i in range(0, len(paths), chunk_size)]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(chunks) <= 1:
+        for chunk in chunks:
+            yield from _detect_chunk(chunk, detectors)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for results in pool.map(_detect_chunk, chunks, [detectors] * len(chunks)):
+            yield from results
@@ -0,0 +1,113 @@
+import math
+import posixpath
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from src.domain.models import Implementation
+from src.providers.base import CodeChunk
+
+def _normalize_path(path: str) -> str:
+    return posixpath.normpath(path.replace("\\", "/"))
+
+def same_file(a: str, b: str) -> bool:
+    """
+    Whether two paths name the same file. Index paths are relative to the
+    indexed root and mapped paths often include the corpus directory, so a
+    path also matches any path it is a suffix of.
+    """
+    a, b = _normalize_path(a), _normalize_path(b)
+    return a == b or a.endswith("/" + b) or b.endswith("/" + a)
+
+def matching_implementation(chunk: CodeChunk, implementations: Sequence[Implementation]) -> Optional[int]:
+    """The index of the first implementation whose lines overlap the chunk's, in the same file."""
+    for i, impl in enumerate(implementations):
+        if (chunk.line_start <= impl.line_end and impl.line_start <= chunk.line_end
+                and same_file(chunk.file_path, impl.file_path)):
+            return i
+    return None
+
+@dataclass
+class QueryEvaluation:
+    """How well one concept's retrieved chunks match its mapped implementations."""
+    concept: str
+    implementations: int
+    retrieved: int
+    relevant_ranks: List[int] = field(default_factory=list)  # 1-based ranks of chunks overlapping an implementation
+    precision: float = 0.0
+    recall: float = 0.0
+    reciprocal_rank: float = 0.0
+    ndcg: float = 0.0
+    seconds: float = 0.0
+    error: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+def evaluate_query(concept: str, chunks: Sequence[CodeChunk], implementations: Sequence[Implementation],
+                   k: int = 5, seconds: float = 0.0, error: Optional[str] = None) -> QueryEvaluation:
+    """
+    Scores the top `k` chunks against the ground truth, with binary relevance:
+
+    - precision: the share of the k slots holding a chunk that overlaps any
+      implementation;
+    - recall: the share of implementations overlapped by some chunk;
+    - reciprocal rank: 1 / the rank of the first relevant chunk;
+    - nDCG: only the first chunk to find each implementation gains, so
+      several chunks of one function do not count as several hits.
+    """
+    evaluation = QueryEvaluation(concept, len(implementations), min(len(chunks), k), seconds=seconds, error=error)
+    found = set()
+    dcg = 0.0
+    for rank, chunk in enumerate(chunks[:k], 1):
+        match = matching_implementation(chunk, implementations)
+        if match is None:
+            continue
+        evaluation.relevant_ranks.append(rank)
+        if match not in found:
+            found.add(match)
+            dcg += 1.0 / math.log2(rank + 1)
+    if implementations:
+        ideal = sum(1.0 / math.log2(rank + 1) for rank in range(1, min(k, len(implementations)) + 1))
+        evaluation.precision = len(evaluation.relevant_ranks) / k
+        evaluation.recall = len(found) / len(implementations)
+        evaluation.reciprocal_rank = 1.0 / evaluation.relevant_ranks[0] if evaluation.relevant_ranks else 0.0
+        evaluation.ndcg = dcg / ideal
+    return evaluation
+
+def latency_summary(seconds: Sequence[float], wall_seconds: float) -> Dict[str, float]:
+    """Per-query latency percentiles in milliseconds, and queries per second over the whole run."""
+    if not seconds:
+        return {"queries": 0, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "mean_ms": 0.0, "max_ms": 0.0,
+                "wall_seconds": round(wall_seconds, 4), "qps": 0.0}
+    ms = np.asarray(seconds, dtype=np.float64) * 1000
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {"queries": len(ms), "p50_ms": round(float(p50), 3), "p95_ms": round(float(p95), 3),
+            "p99_ms": round(float(p99), 3), "mean_ms": round(float(ms.mean()), 3), "max_ms": round(float(ms.max()), 3),
+            "wall_seconds": round(wall_seconds, 4), "qps": round(len(ms) / wall_seconds, 2) if wall_seconds > 0 else 0.0}
+
+def summarize(evaluations: Sequence[QueryEvaluation], k: int) -> Dict[str, float]:
+    """
+    Mean metrics over the concepts that have mapped implementations. Failed
+    queries count as retrieving nothing; concepts without ground truth are
+    only counted.
+    """
+    judged = [e for e in evaluations if e.implementations]
+    mean = lambda values: round(sum(values) / len(values), 4) if values else 0.0
+    return {
+        "k": k,
+        f"precision_at_{k}": mean([e.precision for e in judged]),
+        f"recall_at_{k}": mean([e.recall for e in judged]),
+        "mrr": mean([e.reciprocal_rank for e in judged]),
+        f"ndcg_at_{k}": mean([e.ndcg for e in judged]),
+        "hit_rate": mean([1.0 if e.relevant_ranks else 0.0 for e in judged]),
+        "judged": len(judged),
+        "unjudged": len(evaluations) - len(judged),
+        "errors": sum(e.error is not None for e in evaluations),
+    }
+
+def compare_metrics(current: Dict[str, float], baseline: Dict[str, float]) -> Dict[str, float]:
+    """The change of every numeric metric present in both runs."""
+    return {name: round(value - baseline[name], 4) for name, value in current.items()
+            if isinstance(value, (int, float)) and isinstance(baseline.get(name), (int, float)) and name != "k"}
@@ -1,7 +1,231 @@
-"""
-rankers.py
+import fnmatch
+import heapq
+import re
+from collections import Counter
+from dataclasses import dataclass, fields
+from typing import Dict, List, Optional, Sequence, Tuple
 
-Created: 2025-12-05
-TODO: Implement
-"""
+import numpy as np
 
+from src.domain.models import ConceptMap
+from src.providers.base import CodeChunk, RetrievalResult
+from src.utils.tokens import keyword_tokens, tokenize
+
+SIGNALS = ("retrieval", "keywords", "alignment", "path")
+
+DEFINITION_START = re.compile(r"\s*(?:@|(?:async\s+)?def\s|class\s|(?:export\s+)?(?:async\s+)?function\b)")
+
+# Glob patterns over file paths and the prior each adds; matching priors sum, clipped to [-1, 1].
+DEFAULT_PATH_PRIORS: Tuple[Tuple[str, float], ...] = (
+    ("test_*", -1.0), ("*/test_*", -1.0), ("*_test.py", -1.0), ("tests/*", -1.0), ("*/tests/*", -1.0),
+    ("*/examples/*", -0.5), ("examples/*", -0.5), ("docs/*", -0.5), ("*/docs/*", -0.5),
+    ("*/vendor/*", -1.0), ("*/site-packages/*", -1.0), ("*/node_modules/*", -1.0),
+)
+
+def _joined(tokens: Sequence[str]) -> str:
+    """Tokens joined by NUL, which no token contains, so substring search matches whole token runs."""
+    return "\0" + "\0".join(tokens) + "\0"
+
+@dataclass
+class RankingWeights:
+    """How much each signal counts towards a candidate's ranking score."""
+    retrieval: float = 1.0
+    keywords: float = 0.6
+    alignment: float = 0.3
+    path: float = 0.4
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RankingWeights":
+        unknown = set(data) - set(SIGNALS)
+        if unknown:
+            raise ValueError(f"Unknown ranking signals: {', '.join(sorted(unknown))}. Choose from: {', '.join(SIGNALS)}")
+        return cls(**{k: float(v) for k, v in data.items()})
+
+    def as_array(self) -> np.ndarray:
+        return np.array([getattr(self, f.name) for f in fields(self)], dtype=np.float64)
+
+@dataclass
+class RankedChunk:
+    """A candidate chunk with its combined score and the signals it was computed from."""
+    chunk: CodeChunk
+    score: float
+    signals: Dict[str, float]
+
+class MultiSignalRanker:
+    """
+    Reranks retrieved chunks by combining several signals:
+
+    - retrieval: the provider's score, scaled to [0, 1] within each query;
+    - keywords: the share of the concept's taxonomy keywords present in the
+      chunk, saturating at `keyword_saturation` distinct keywords;
+    - alignment: whether the chunk is a whole definition, i.e. it has an
+      identifier and starts with a def, class, decorator or function;
+    - path: priors from glob patterns over the file path, such as a
+      penalty for tests and vendored code.
+
+    All candidates of a batch are scored together as arrays. Each distinct
+    chunk is tokenized once, however many queries retrieved it, and each
+    distinct file path is matched against the priors once. Both are
+    remembered for later batches, up to `cache_size` entries each.
+    """
+    def __init__(self, keywords: Dict[str, List[str]], weights: Optional[RankingWeights] = None,
+                 path_priors: Sequence[Tuple[str, float]] = DEFAULT_PATH_PRIORS, keyword_saturation: int = 3,
+                 cache_size: int = 100_000):
+        self.weights = weights or RankingWeights()
+        self.path_priors = list(path_priors)
+        self._prior_patterns = [(re.compile(fnmatch.translate(pattern)), w) for pattern, w in self.path_priors]
+        self._any_prior = re.compile("|".join(fnmatch.translate(pattern) for pattern, _ in self.path_priors) or "(?!)")
+        self.keyword_saturation = keyword_saturation
+        self.cache_size = cache_size
+        self._chunk_cache: Dict[str, Tuple[List[int], bool]] = {}  # content → chunk_facts, across batches
+        self._path_cache: Dict[str, float] = {}
+        self.concept_ids: Dict[str, int] = {key: i for i, key in enumerate(keywords)}
+        self.keyword_ids: Dict[Tuple[str, ...], int] = {}
+        by_concept = []
+        for concept_keywords in keywords.values():
+            ids = set()
+            for keyword in concept_keywords:
+                tokens = keyword_tokens(keyword)
+                if tokens:
+                    ids.add(self.keyword_ids.setdefault(tokens, len(self.keyword_ids)))
+            by_concept.append(ids)
+        # concepts x keywords membership; the last row is for unknown concepts and stays empty
+        self.membership = np.zeros((len(by_concept) + 1, max(1, len(self.keyword_ids))), dtype=np.float64)
+        for row, ids in enumerate(by_concept):
+            self.membership[row, list(ids)] = 1.0
+        self.keyword_counts = self.membership.sum(axis=1)
+        # Single-token keywords are found by one set intersection per chunk. A
+        # longer keyword is only searched for in chunks holding its anchor, its
+        # token shared with the fewest other keywords.
+        self._single: Dict[str, int] = {}
+        self._multi: Dict[str, List[Tuple[str, int]]] = {}
+        sharing = Counter(token for tokens in self.keyword_ids if len(tokens) > 1 for token in set(tokens))
+        for tokens, keyword_id in self.keyword_ids.items():
+            if len(tokens) == 1:
+                self._single[tokens[0]] = keyword_id
+            else:
+                anchor = min(tokens, key=lambda token: (sharing[token], -len(token)))
+                self._multi.setdefault(anchor, []).append((_joined(tokens), keyword_id))
+        self._single_tokens = frozenset(self._single)
+        self._anchors = frozenset(self._multi)
+
+    @classmethod
+    def from_concept_map(cls, concept_map: ConceptMap, **kwargs) -> "MultiSignalRanker":
+        """A ranker for the concepts loaded into a ConceptMap, using their taxonomy keywords."""
+        return cls({key: concept.keywords for key, concept in concept_map.concepts.items()}, **kwargs)
+
+    def chunk_keywords(self, content: str) -> List[int]:
+        """The ids of the distinct keywords present in a chunk, matched as whole token sequences."""
+        tokens = tokenize(content)
+        present = set(tokens)
+        found = {self._single[token] for token in present & self._single_tokens}
+        anchors = present & self._anchors
+        if anchors:
+            text = _joined(tokens)
+            for anchor in anchors:
+                found.update(keyword_id for pattern, keyword_id in self._multi[anchor] if pattern in text)
+        return list(found)
+
+    def chunk_facts(self, content: str) -> Tuple[List[int], bool]:
+        """The keywords in a chunk and whether a definition starts it, remembered for later batches."""
+        facts = self._chunk_cache.get(content)
+        if facts is None:
+            if len(self._chunk_cache) >= self.cache_size:
+                self._chunk_cache.clear()
+            facts = self._chunk_cache[content] = (self.chunk_keywords(content), bool(DEFINITION_START.match(content)))
+        return facts
+
+    def path_prior(self, file_path: str) -> float:
+        path = file_path.replace("\\", "/")
+        if not self._any_prior.match(path):
+            return 0.0
+        return min(1.0, max(-1.0, sum(w for pattern, w in self._prior_patterns if pattern.match(path))))
+
+    def signals(self, concepts: Sequence[Optional[str]], candidates: Sequence[List[CodeChunk]]) -> np.ndarray:
+        """
+        The signal matrix of a batch: one row per candidate, queries one
+        after another, one column per entry of SIGNALS.
+        """
+        sizes = np.fromiter((len(c) for c in candidates), dtype=np.int64, count=len(candidates))
+        total = int(sizes.sum())
+        out = np.zeros((total, len(SIGNALS)), dtype=np.float64)
+        if not total:
+            return out
+        query_of = np.repeat(np.arange(len(candidates)), sizes)
+        flat = [chunk for chunks in candidates for chunk in chunks]
+
+        # retrieval: scores scaled by the best score of their query
+        scores = np.fromiter((c.score for c in flat), dtype=np.float64, count=total)
+        starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+        nonempty = sizes > 0
+        best = np.zeros(len(candidates))
+        best[nonempty] = np.maximum.reduceat(scores, starts[nonempty])
+        scale = best[query_of]
+        out[:, 0] = np.divide(scores, scale, out=np.zeros(total), where=scale > 0).clip(0.0, 1.0)
+
+        # Keywords and whether a definition starts the chunk depend only on the
+        # content, priors only on the path: each is worked out once per value.
+        content_ids: Dict[str, int] = {}
+        present: List[List[int]] = []
+        starts_definition: List[bool] = []
+        path_priors = self._path_cache
+        chunk_of, prior_of, identified = [], [], []
+        for chunk in flat:
+            content_id = content_ids.get(chunk.content)
+            if content_id is None:
+                content_id = content_ids[chunk.content] = len(present)
+                found, is_definition = self.chunk_facts(chunk.content)
+                present.append(found)
+                starts_definition.append(is_definition)
+            chunk_of.append(content_id)
+            prior = path_priors.get(chunk.file_path)
+            if prior is None:
+                if len(path_priors) >= self.cache_size:
+                    path_priors.clear()
+                prior = path_priors[chunk.file_path] = self.path_prior(chunk.file_path)
+            prior_of.append(prior)
+            identified.append(chunk.identifier is not None)
+        per_candidate = np.array(chunk_of, dtype=np.int64)
+
+        # Keyword hits of every candidate for its own concept, as one gather over
+        # (candidate, keyword present in its chunk) pairs.
+        lengths = np.fromiter(map(len, present), dtype=np.int64, count=len(present))
+        keyword_flat = np.fromiter((k for found in present for k in found), dtype=np.int64, count=int(lengths.sum()))
+        keyword_starts = np.concatenate(([0], np.cumsum(lengths)))
+        unknown = len(self.concept_ids)
+        concept_rows = np.fromiter((self.concept_ids.get(c, unknown) for c in concepts), dtype=np.int64,
+                                   count=len(concepts))[query_of]
+        pair_counts = lengths[per_candidate]
+        pair_candidate = np.repeat(np.arange(total), pair_counts)
+        offsets = np.arange(int(pair_counts.sum())) - np.repeat(np.cumsum(pair_counts) - pair_counts, pair_counts)
+        pair_keyword = keyword_flat[keyword_starts[per_candidate][pair_candidate] + offsets]
+        hits = np.bincount(pair_candidate, weights=self.membership[concept_rows[pair_candidate], pair_keyword],
+                           minlength=total)
+        wanted = np.minimum(self.keyword_counts[concept_rows], self.keyword_saturation)
+        out[:, 1] = np.divide(hits, wanted, out=np.zeros(total), where=wanted > 0).clip(0.0, 1.0)
+
+        out[:, 2] = 0.5 * np.array(identified, dtype=np.float64) + 0.5 * np.array(starts_definition)[per_candidate]
+        out[:, 3] = prior_of
+        return out
+
+    def rank(self, concepts: Sequence[Optional[str]], candidates: Sequence[List[CodeChunk]],
+             top_k: int = 5) -> List[List[RankedChunk]]:
+        """
+        Ranks the candidates of every query in the batch and returns the best
+        `top_k` of each, best first. Ties keep the retrieval order.
+        """
+        signals = self.signals(concepts, candidates)
+        combined = (signals @ self.weights.as_array()).tolist()
+        ranked = []
+        start = 0
+        for chunks in candidates:
+            end = start + len(chunks)
+            best = heapq.nlargest(top_k, range(start, end), key=combined.__getitem__)
+            ranked.append([RankedChunk(chunks[i - start], combined[i], dict(zip(SIGNALS, signals[i].tolist())))
+                           for i in best])
+            start = end
+        return ranked
+
+    def rank_results(self, results: Sequence[RetrievalResult], top_k: int = 5) -> List[List[RankedChunk]]:
+        """`rank` over provider results, using each query's concept; failed results rank nothing."""
+        return self.rank([r.query.concept for r in results], [r.chunks for r in results], top_k)
@@ -0,0 +1,110 @@
+import bisect
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from src.utils import code_parser
+
+# Outcomes of re-checking one mapping against the current source.
+UNCHANGED = "unchanged"
+MOVED = "moved"        # same code, different lines
+CHANGED = "changed"    # the identifier still resolves, but its code was edited
+MISSING = "missing"    # file, identifier or code no longer found
+AMBIGUOUS = "ambiguous"
+UPDATED_STATUSES = (MOVED, CHANGED)
+
+# What the parent sends per mapping: (identifier, line_start, line_end,
+# snippet hash, snippet text). The text is searched for in the file when the
+# mapping has no identifier, or its identifier does not resolve.
+CheckEntry = Tuple[Optional[str], int, Optional[int], str, Optional[str]]
+# What comes back: (status, line_start, line_end, new snippet or None, message)
+CheckResult = Tuple[str, Optional[int], Optional[int], Optional[str], str]
+
+def snippet_hash(snippet: Optional[str]) -> str:
+    return hashlib.sha256((snippet or "").encode("utf-8")).hexdigest()
+
+def _relocate(source: code_parser.SourceFile, snippet: str) -> Optional[Tuple[int, int]]:
+    """Finds where a snippet now starts, if it still occurs verbatim at the start of a line."""
+    offsets = source.line_offsets
+    pos = source.content.find(snippet)
+    while pos != -1:
+        line_index = bisect.bisect_right(offsets, pos) - 1
+        if offsets[line_index] == pos:
+            return line_index + 1, line_index + snippet.count("\n") + (0 if snippet.endswith("\n") else 1)
+        pos = source.content.find(snippet, pos + 1)
+    return None
+
+def check_entry(source: code_parser.SourceFile, entry: CheckEntry) -> CheckResult:
+    identifier, line_start, line_end, old_hash, old_snippet = entry
+    matches = source.resolve(identifier) if identifier else []
+    if matches:
+        if len(matches) > 1:
+            # Prefer the candidate that still holds the mapped code, then the one at the mapped lines.
+            same = [s for s in matches if snippet_hash(source.snippet(s.line_start, s.line_end)) == old_hash]
+            same = same or [s for s in matches if s.line_start == line_start]
+            if len(same) != 1:
+                return (AMBIGUOUS, None, None, None,
+                        f"Identifier '{identifier}' is ambiguous: {code_parser.format_candidates(matches)}")
+            matches = same
+        symbol = matches[0]
+        snippet = source.snippet(symbol.line_start, symbol.line_end)
+        if snippet_hash(snippet) != old_hash:
+            return CHANGED, symbol.line_start, symbol.line_end, snippet, "Code changed."
+        if (symbol.line_start, symbol.line_end) != (line_start, line_end):
+            return MOVED, symbol.line_start, symbol.line_end, None, "Code moved."
+        return UNCHANGED, line_start, line_end, None, ""
+
+    # No identifier, or one that does not resolve (e.g. mapped with --lines
+    # after its lookup failed): follow the stored code instead.
+    if snippet_hash(source.snippet(line_start, line_end)) == old_hash:
+        return UNCHANGED, line_start, line_end, None, ""
+    location = _relocate(source, old_snippet) if old_snippet else None
+    if location is None:
+        if identifier:
+            return MISSING, None, None, None, f"Identifier '{identifier}' and its code no longer found."
+        return MISSING, None, None, None, "Code at the mapped lines changed and was not found elsewhere in the file."
+    return MOVED, location[0], location[1], None, "Code moved."
+
+def check_file(file_path: str, entries: List[CheckEntry]) -> List[CheckResult]:
+    """Re-checks every mapping of one file against a single read of it."""
+    try:
+        source = code_parser.get_source_file(file_path)
+    except (OSError, UnicodeDecodeError) as e:
+        return [(MISSING, None, None, None, f"Failed to read {file_path}: {e}")] * len(entries)
+    return [check_entry(source, entry) for entry in entries]
+
+def _check_files(tasks: List[Tuple[str, List[CheckEntry]]]) -> List[List[CheckResult]]:
+    return [check_file(file_path, entries) for file_path, entries in tasks]
+
+def _init_worker(symbol_index_path: Optional[str]):
+    # Each worker opens its own connection; SQLite connections must not cross a fork.
+    if symbol_index_path:
+        from src.utils.symbol_index import SymbolIndex
+        code_parser.set_symbol_index(SymbolIndex(symbol_index_path))
+    else:
+        code_parser.set_symbol_index(None)
+
+def check_files(by_file: Dict[str, List[CheckEntry]], workers: Optional[int] = None,
+                chunk_size: int = 32) -> Dict[str, List[CheckResult]]:
+    """
+    Re-checks mappings grouped by file, across a process pool.
+
+    Workers use the same persistent symbol index as this process, if one is
+    set, so unchanged files are not parsed again.
+    """
+    tasks = list(by_file.items())
+    chunks = [tasks[i:i + chunk_size] for i in range(0, len(tasks), chunk_size)]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(chunks) <= 1:
+        results = [_check_files(chunk) for chunk in chunks]
+    else:
+        index = code_parser.get_symbol_index()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(index.index_path if index else None,)) as pool:
+            results = list(pool.map(_check_files, chunks))
+    checked: Dict[str, List[CheckResult]] = {}
+    for chunk, chunk_results in zip(chunks, results):
+        for (file_path, _), file_results in zip(chunk, chunk_results):
+            checked[file_path] = file_results
+    return checked
@@ -1,7 +1,14 @@
-"""
-taxonomy.py
+from typing import List
 
-Created: 2025-12-05
-TODO: Implement
-"""
+from src.domain.models import Concept, ConceptMap
+from src.providers.base import RetrievalQuery
 
+def concept_query_text(concept: Concept) -> str:
+    """The search text for a concept: its name followed by its taxonomy keywords."""
+    words = [concept.display_name]
+    words.extend(keyword for keyword in concept.keywords if keyword not in words)
+    return " ".join(words)
+
+def concept_queries(concept_map: ConceptMap, top_k: int = 5) -> List[RetrievalQuery]:
+    """One retrieval query per loaded concept, in taxonomy order, tagged with the concept key."""
+    return [RetrievalQuery(concept_query_text(concept), top_k, key) for key, concept in concept_map.concepts.items()]
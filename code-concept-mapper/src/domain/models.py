@@ -1,17 +1,65 @@
+import sys
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple, Union
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if type(value) is str else value
 
-@dataclass
 class Implementation:
-    file_path: str
-    identifier: Optional[str]
-    line_start: int
-    line_end: int
-    code_snippet: str
-    confidence: str
-    pattern_type: str
-    evidence: str
-    added_at: str
+    """
+    One mapped code location.
+
+    Large maps hold hundreds of thousands of these, so the class is slotted
+    and its repetitive strings (paths, identifiers, confidence, pattern
+    type, timestamps) are interned, so equal values share one object.
+    """
+    FIELDS = ("file_path", "identifier", "line_start", "line_end", "code_snippet",
+              "confidence", "pattern_type", "evidence", "added_at")
+    __slots__ = FIELDS
+
+    def __init__(self, file_path: str, identifier: Optional[str], line_start: int, line_end: int,
+                 code_snippet: str, confidence: str, pattern_type: str, evidence: str, added_at: str):
+        self.file_path = _intern(file_path)
+        self.identifier = _intern(identifier)
+        self.line_start = line_start
+        self.line_end = line_end
+        self.code_snippet = code_snippet
+        self.confidence = _intern(confidence)
+        self.pattern_type = _intern(pattern_type)
+        self.evidence = evidence
+        self.added_at = _intern(added_at)
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.FIELDS)
+
+    __hash__ = None  # mutable, like the dataclass it replaces
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.FIELDS)
+        return f"Implementation({fields})"
+
+class SnippetTable:
+    """
+    Deduplicates code snippets within one ConceptMap.
+
+    The same code is often mapped to several concepts; every implementation
+    with identical snippet text then shares a single string.
+    """
+    __slots__ = ("_texts",)
+
+    def __init__(self):
+        self._texts: Dict[str, str] = {}
+
+    def intern(self, text: str) -> str:
+        return self._texts.setdefault(text, text)
+
+    def __len__(self) -> int:
+        return len(self._texts)
 
 @dataclass
 class Concept:
@@ -24,6 +72,11 @@ class Concept:
     category: Optional[str] = None
     # --- NEW FIELDS END ---
 
+    def __post_init__(self):
+        self.keywords = [_intern(k) for k in self.keywords]
+        self.languages = [_intern(lang) for lang in self.languages]
+        self.category = _intern(self.category)
+
 @dataclass
 class Metadata:
     project: str
@@ -31,7 +84,126 @@ class Metadata:
     created_at: Optional[str] = None
     last_updated: Optional[str] = None
 
+Location = Tuple[str, int]  # (file_path, line_start)
+
 @dataclass
 class ConceptMap:
     metadata: Metadata
     concepts: Dict[str, Concept] = field(default_factory=dict)
+    # Mutations made through the methods below, kept until the next save so
+    # storage backends can persist them incrementally.
+    _changes: List[Tuple[str, str, Union[Concept, Implementation]]] = field(
+        default_factory=list, init=False, repr=False, compare=False)
+    _modified: bool = field(default=False, init=False, repr=False, compare=False)
+    # Hash indexes: (file_path, line_start) per concept, and file_path → every
+    # (concept key, implementation) in that file. `_indexed` stamps each
+    # concept's implementation list so edits that bypass the methods below
+    # are detected and re-indexed.
+    _by_location: Dict[str, Dict[Location, Implementation]] = field(
+        default_factory=dict, init=False, repr=False, compare=False)
+    _by_file: Dict[str, List[Tuple[str, Implementation]]] = field(
+        default_factory=dict, init=False, repr=False, compare=False)
+    _indexed: Dict[str, Tuple[int, int]] = field(
+        default_factory=dict, init=False, repr=False, compare=False)
+    snippets: SnippetTable = field(default_factory=SnippetTable, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        for concept in self.concepts.values():
+            for impl in concept.implementations:
+                impl.code_snippet = self.snippets.intern(impl.code_snippet)
+        self.rebuild_indexes()
+
+    def rebuild_indexes(self):
+        self._by_location = {}
+        self._by_file = {}
+        self._indexed = {}
+        for key, concept in self.concepts.items():
+            self._index_concept(key, concept)
+
+    def _index_concept(self, key: str, concept: Concept):
+        locations: Dict[Location, Implementation] = {}
+        for impl in concept.implementations:
+            locations.setdefault((impl.file_path, impl.line_start), impl)
+            self._by_file.setdefault(impl.file_path, []).append((key, impl))
+        self._by_location[key] = locations
+        self._indexed[key] = (id(concept.implementations), len(concept.implementations))
+
+    def _is_stale(self, key: str) -> bool:
+        concept = self.concepts[key]
+        return self._indexed.get(key) != (id(concept.implementations), len(concept.implementations))
+
+    def _ensure_indexed(self, key: Optional[str] = None):
+        keys = [key] if key is not None else list(self.concepts)
+        if len(self._indexed) != len(self.concepts) or any(self._is_stale(k) for k in keys):
+            self.rebuild_indexes()
+
+    def _unindex_concept(self, key: str):
+        for file_path in {impl.file_path for impl in self.concepts[key].implementations}:
+            remaining = [entry for entry in self._by_file.get(file_path, []) if entry[0] != key]
+            if remaining:
+                self._by_file[file_path] = remaining
+            else:
+                self._by_file.pop(file_path, None)
+        self._by_location.pop(key, None)
+        self._indexed.pop(key, None)
+
+    def add_concept(self, key: str, concept: Concept):
+        """Adds a concept, or replaces the one under `key` along with its implementations."""
+        stale = False
+        if key in self.concepts:
+            # The old implementations' entries go first; if they were edited
+            # behind the index's back, only a rebuild knows where they are.
+            stale = self._is_stale(key)
+            if not stale:
+                self._unindex_concept(key)
+        self.concepts[key] = concept
+        if stale:
+            self.rebuild_indexes()
+        else:
+            self._index_concept(key, concept)
+        self._changes.append(("concept", key, concept))
+
+    def add_implementation(self, key: str, impl: Implementation):
+        self._ensure_indexed(key)
+        impl.code_snippet = self.snippets.intern(impl.code_snippet)
+        implementations = self.concepts[key].implementations
+        implementations.append(impl)
+        self._by_location[key].setdefault((impl.file_path, impl.line_start), impl)
+        self._by_file.setdefault(impl.file_path, []).append((key, impl))
+        self._indexed[key] = (id(implementations), len(implementations))
+        self._changes.append(("implementation", key, impl))
+
+    def find_implementation(self, key: str, file_path: str, line_start: int) -> Optional[Implementation]:
+        """Returns the implementation of a concept at a location, if already mapped."""
+        self._ensure_indexed(key)
+        return self._by_location[key].get((file_path, line_start))
+
+    def implementations_for_file(self, file_path: str) -> List[Tuple[str, Implementation]]:
+        """Returns every (concept key, implementation) mapped in a file."""
+        self._ensure_indexed()
+        return list(self._by_file.get(file_path, []))
+
+    def concepts_for_file(self, file_path: str) -> List[str]:
+        """Returns the keys of the concepts with an implementation in a file."""
+        return list(dict.fromkeys(key for key, _ in self.implementations_for_file(file_path)))
+
+    def mapped_files(self) -> List[str]:
+        self._ensure_indexed()
+        return list(self._by_file)
+
+    def mark_modified(self):
+        """Flags edits made in place, which can only be persisted by a full rewrite."""
+        self._modified = True
+        self.rebuild_indexes()
+
+    @property
+    def pending_changes(self) -> List[Tuple[str, str, Union[Concept, Implementation]]]:
+        return self._changes
+
+    @property
+    def is_modified(self) -> bool:
+        return self._modified
+
+    def clear_changes(self):
+        self._changes = []
+        self._modified = False
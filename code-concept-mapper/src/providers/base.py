@@ -1,7 +1,112 @@
-"""
-base.py
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Iterable, List, Optional
 
-Created: 2025-12-05
-TODO: Implement
-"""
+@dataclass
+class CodeChunk:
+    """A span of source code returned by a retrieval provider, with its relevance score."""
+    file_path: str
+    line_start: int
+    line_end: int
+    content: str
+    identifier: Optional[str] = None
+    score: float = 0.0
 
+    def to_dict(self) -> dict:
+        return {"file_path": self.file_path, "line_start": self.line_start, "line_end": self.line_end,
+                "content": self.content, "identifier": self.identifier, "score": self.score}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "CodeChunk":
+        return cls(data["file_path"], data["line_start"], data["line_end"], data["content"],
+                   data.get("identifier"), data.get("score", 0.0))
+
+@dataclass(frozen=True)
+class RetrievalQuery:
+    """One search: the query text, how many chunks to return, and the concept it is asked for."""
+    text: str
+    top_k: int = 5
+    concept: Optional[str] = None
+
+@dataclass
+class RetrievalResult:
+    """The outcome of one query: its chunks, or the error that stopped it."""
+    query: RetrievalQuery
+    chunks: List[CodeChunk] = field(default_factory=list)
+    error: Optional[str] = None
+    seconds: float = 0.0
+    cached: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+class RetrievalProvider(ABC):
+    """
+    A source of code chunks for concept queries.
+
+    Providers implement `retrieve` for a single query. `retrieve_many` runs
+    a batch of queries concurrently, at most `max_concurrency` at a time,
+    each cancelled if it takes longer than `timeout` seconds. A failed or
+    timed-out query is reported in its result and does not stop the batch.
+    Cancelling the batch cancels every query still running.
+    """
+    name = "provider"
+    max_concurrency = 8
+    timeout: Optional[float] = 30.0
+
+    @abstractmethod
+    async def retrieve(self, query: RetrievalQuery) -> List[CodeChunk]:
+        """Returns the best-matching chunks for one query, best first."""
+
+    async def _retrieve_one(self, query: RetrievalQuery, semaphore: asyncio.Semaphore,
+                            timeout: Optional[float]) -> RetrievalResult:
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                chunks = await asyncio.wait_for(self.retrieve(query), timeout)
+                return RetrievalResult(query, chunks, None, time.perf_counter() - start)
+            except asyncio.TimeoutError:
+                error = f"Timed out after {timeout}s."
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+            return RetrievalResult(query, [], error, time.perf_counter() - start)
+
+    async def retrieve_many(self, queries: Iterable[RetrievalQuery], max_concurrency: Optional[int] = None,
+                            timeout: Optional[float] = None) -> List[RetrievalResult]:
+        """Runs every query concurrently and returns one result per query, in input order."""
+        return await self.retrieve_each(queries, max_concurrency, timeout)
+
+    async def retrieve_each(self, queries: Iterable[RetrievalQuery], max_concurrency: Optional[int] = None,
+                            timeout: Optional[float] = None) -> List[RetrievalResult]:
+        """
+        `retrieve_many` one query at a time through `retrieve`, even for
+        providers that batch, so each result's `seconds` is that query's own
+        latency.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency or self.max_concurrency)
+        timeout = self.timeout if timeout is None else timeout
+        return list(await asyncio.gather(*(self._retrieve_one(q, semaphore, timeout) for q in queries)))
+
+    async def stream(self, queries: Iterable[RetrievalQuery], max_concurrency: Optional[int] = None,
+                     timeout: Optional[float] = None) -> AsyncIterator[RetrievalResult]:
+        """
+        Like `retrieve_many`, but yields each result as soon as it is ready,
+        in completion order. Closing the iterator early cancels the queries
+        still running.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency or self.max_concurrency)
+        timeout = self.timeout if timeout is None else timeout
+        tasks = [asyncio.ensure_future(self._retrieve_one(q, semaphore, timeout)) for q in queries]
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                yield await next_result
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def retrieve_many_sync(self, queries: Iterable[RetrievalQuery], **kwargs) -> List[RetrievalResult]:
+        """`retrieve_many` for callers without an event loop, such as the command-line scripts."""
+        return asyncio.run(self.retrieve_many(queries, **kwargs))
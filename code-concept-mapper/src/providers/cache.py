@@ -0,0 +1,250 @@
+import hashlib
+import json
+import sqlite3
+import time
+import zlib
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from src.providers.base import CodeChunk, RetrievalProvider, RetrievalQuery, RetrievalResult
+from src.utils.serializers import loads
+
+DEFAULT_MAX_ENTRIES = 100_000
+DEFAULT_MAX_BYTES = 512 * 2 ** 20
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS versions (
+    provider TEXT PRIMARY KEY,
+    version TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    provider TEXT NOT NULL,
+    top_k INTEGER NOT NULL,
+    payload BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_by_provider ON entries(provider);
+-- Covers the size totals and the eviction scan, which then never read payloads.
+CREATE INDEX IF NOT EXISTS entries_by_access ON entries(accessed_at, size, key);
+"""
+
+def normalize_query(text: str) -> str:
+    """Queries differing only in case or whitespace share a cache entry."""
+    return " ".join(text.lower().split())
+
+def _encode(chunks: List[CodeChunk]) -> bytes:
+    return zlib.compress(json.dumps([c.to_dict() for c in chunks], separators=(",", ":")).encode("utf-8"), 1)
+
+def _decode(payload: bytes) -> List[CodeChunk]:
+    return [CodeChunk.from_dict(d) for d in loads(zlib.decompress(payload))]
+
+class RetrievalCache:
+    """
+    A persistent cache of retrieval results, shared by all providers.
+
+    Entries are keyed by provider, corpus version, normalized query and any
+    extra retrieval parameters. The top k is not part of the key: a result
+    cached for the top 10 also answers a request for the top 5.
+
+    When a provider reports a new corpus version, all of its entries are
+    dropped. Beyond `max_entries` or `max_bytes`, the least recently used
+    entries are evicted. With `ttl`, entries older than that many seconds
+    are misses.
+    """
+    def __init__(self, cache_path: str, max_entries: int = DEFAULT_MAX_ENTRIES, max_bytes: int = DEFAULT_MAX_BYTES,
+                 ttl: Optional[float] = None, clock: Callable[[], float] = time.time):
+        self.cache_path = cache_path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._conn: Optional[sqlite3.Connection] = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.cache_path)
+            self._conn.executescript(SCHEMA)
+        return self._conn
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    @staticmethod
+    def key(provider: str, version: str, query: str, params: Optional[dict] = None) -> str:
+        material = json.dumps([provider, version, normalize_query(query), params or {}], sort_keys=True)
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def use_version(self, provider: str, version: str) -> bool:
+        """Records a provider's corpus version, dropping its entries if it changed. True if it did."""
+        row = self.conn.execute("SELECT version FROM versions WHERE provider = ?", (provider,)).fetchone()
+        if row is not None and row[0] == version:
+            return False
+        with self.conn:
+            if row is not None:
+                self.invalidations += self.conn.execute(
+                    "DELETE FROM entries WHERE provider = ?", (provider,)).rowcount
+            self.conn.execute("INSERT OR REPLACE INTO versions (provider, version) VALUES (?, ?)", (provider, version))
+        return row is not None
+
+    def get_many(self, keys: Sequence[str], top_ks: Sequence[int]) -> List[Optional[List[CodeChunk]]]:
+        """The cached chunks for each key, or None for a miss. Hits become the most recently used."""
+        now = self.clock()
+        found: Dict[str, tuple] = {}
+        unique = list(dict.fromkeys(keys))
+        for i in range(0, len(unique), 500):  # SQLite's limit on bound parameters
+            batch = unique[i:i + 500]
+            rows = self.conn.execute(
+                f"SELECT key, top_k, payload, created_at FROM entries WHERE key IN ({','.join('?' * len(batch))})",
+                batch)
+            found.update((row[0], row[1:]) for row in rows)
+
+        results: List[Optional[List[CodeChunk]]] = []
+        used, expired = [], []
+        for key, top_k in zip(keys, top_ks):
+            entry = found.get(key)
+            if entry is not None and self.ttl is not None and now - entry[2] > self.ttl:
+                expired.append((key,))
+                entry = None
+            if entry is None or entry[0] < top_k:
+                self.misses += 1
+                results.append(None)
+                continue
+            self.hits += 1
+            used.append((now, key))
+            results.append(_decode(entry[1])[:top_k])
+        with self.conn:
+            self.conn.executemany("UPDATE entries SET accessed_at = ? WHERE key = ?", used)
+            self.conn.executemany("DELETE FROM entries WHERE key = ?", expired)
+        return results
+
+    def put_many(self, provider: str, entries: Iterable[tuple]):
+        """Stores (key, top_k, chunks) entries, then evicts down to the size limits."""
+        now = self.clock()
+        rows = []
+        for key, top_k, chunks in entries:
+            payload = _encode(chunks)
+            rows.append((key, provider, top_k, payload, len(payload), now, now, top_k))
+        with self.conn:
+            # Never replace an entry with one for fewer results.
+            self.conn.executemany(
+                "INSERT INTO entries (key, provider, top_k, payload, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET top_k = excluded.top_k, payload = excluded.payload, "
+                "size = excluded.size, created_at = excluded.created_at, accessed_at = excluded.accessed_at "
+                "WHERE entries.top_k <= ?", rows)
+        self.evict()
+
+    def evict(self) -> int:
+        """Drops least recently used entries until both size limits hold. Returns how many went."""
+        count, total = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return 0
+        doomed = []
+        for key, size in self.conn.execute("SELECT key, size FROM entries ORDER BY accessed_at"):
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            doomed.append((key,))
+            count -= 1
+            total -= size
+        with self.conn:
+            self.conn.executemany("DELETE FROM entries WHERE key = ?", doomed)
+        self.evictions += len(doomed)
+        return len(doomed)
+
+    def clear(self):
+        with self.conn:
+            self.conn.execute("DELETE FROM entries")
+            self.conn.execute("DELETE FROM versions")
+
+    def stats(self) -> dict:
+        count, total = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions, "invalidations": self.invalidations, "entries": count, "bytes": total}
+
+class CachedProvider(RetrievalProvider):
+    """
+    Wraps any provider with a RetrievalCache.
+
+    A batch is answered from the cache where possible; only the misses are
+    sent to the wrapped provider, as one batch, and successful results are
+    stored. The wrapped provider's `version`, if it has one, is the corpus
+    version: when it changes, the provider's cached results are dropped.
+    Its `identity`, if it has one (e.g. the index path), tells apart
+    providers of the same name, so each keeps its own entries and version.
+    `params` are any further settings that change results (a model name,
+    filters) and become part of every key.
+    """
+    def __init__(self, provider: RetrievalProvider, cache: RetrievalCache, params: Optional[dict] = None):
+        self.provider = provider
+        self.cache = cache
+        self.params = params
+        self.name = provider.name
+        identity = getattr(provider, "identity", None)
+        self.cache_name = f"{provider.name}:{identity}" if identity else provider.name
+        self.max_concurrency = provider.max_concurrency
+        self.timeout = provider.timeout
+
+    @property
+    def version(self) -> str:
+        return str(getattr(self.provider, "version", "") or "")
+
+    async def retrieve(self, query: RetrievalQuery) -> List[CodeChunk]:
+        result, = await self.retrieve_many([query])
+        if result.error is not None:
+            raise RuntimeError(result.error)
+        return result.chunks
+
+    def _lookup(self, queries: List[RetrievalQuery]) -> Tuple[List[str], List[Optional[RetrievalResult]]]:
+        version = self.version
+        self.cache.use_version(self.cache_name, version)
+        keys = [self.cache.key(self.cache_name, version, q.text, self.params) for q in queries]
+        start = time.perf_counter()
+        cached = self.cache.get_many(keys, [q.top_k for q in queries])
+        seconds = (time.perf_counter() - start) / max(1, len(queries))
+        return keys, [None if chunks is None else RetrievalResult(q, chunks, None, seconds, cached=True)
+                      for q, chunks in zip(queries, cached)]
+
+    async def retrieve_many(self, queries: Iterable[RetrievalQuery], max_concurrency: Optional[int] = None,
+                            timeout: Optional[float] = None) -> List[RetrievalResult]:
+        queries = list(queries)
+        keys, results = self._lookup(queries)
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            fetched = await self.provider.retrieve_many([queries[i] for i in missing], max_concurrency, timeout)
+            for i, result in zip(missing, fetched):
+                results[i] = result
+            self.cache.put_many(self.cache_name, ((keys[i], queries[i].top_k, result.chunks)
+                                            for i, result in zip(missing, fetched) if result.ok))
+        return results
+
+    async def stream(self, queries: Iterable[RetrievalQuery], max_concurrency: Optional[int] = None,
+                     timeout: Optional[float] = None) -> AsyncIterator[RetrievalResult]:
+        """
+        Yields every cached result first, then the misses as the wrapped
+        provider returns them. A query missed at several positions is
+        fetched once and yielded once per position.
+        """
+        queries = list(queries)
+        keys, results = self._lookup(queries)
+        missing: Dict[RetrievalQuery, List[int]] = {}
+        for position, result in enumerate(results):
+            if result is None:
+                missing.setdefault(queries[position], []).append(position)
+            else:
+                yield result
+        async for result in self.provider.stream(list(missing), max_concurrency, timeout):
+            positions = missing[result.query]
+            if result.ok:
+                self.cache.put_many(self.cache_name, [(keys[positions[0]], result.query.top_k, result.chunks)])
+            for _ in positions:
+                yield result
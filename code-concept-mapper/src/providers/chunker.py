@@ -0,0 +1,228 @@
+import ast
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from src.providers.base import CodeChunk
+from src.utils.code_parser import SourceFile, qualified_name
+from src.utils.symbol_index import walk_source_files
+from src.utils.tokens import count_tokens
+
+DEFAULT_MAX_TOKENS = 250
+DEFAULT_OVERLAP = 50
+
+_DEFINITIONS = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+# Fields holding nested statements, in source order, as in code_parser.
+_BODY_FIELDS = ("body", "handlers", "orelse", "finalbody", "cases")
+
+Span = Tuple[int, int]  # first and last line, 1-based and inclusive
+
+def _span(node: ast.AST) -> Span:
+    """A statement's lines, including the decorators of a definition."""
+    start = min([node.lineno] + [d.lineno for d in getattr(node, "decorator_list", [])])
+    return start, node.end_lineno
+
+def _children(node: ast.AST) -> List[ast.stmt]:
+    """The statements nested directly in a compound statement, in source order."""
+    children = []
+    for name in _BODY_FIELDS:
+        for child in getattr(node, name, None) or []:
+            if isinstance(child, ast.stmt):
+                children.append(child)
+            else:  # except handlers and match cases hold their own statements
+                children.extend(_children(child))
+    return children
+
+def _check_budget(max_tokens: int, overlap: int):
+    if max_tokens <= 0 or not 0 <= overlap < max_tokens:
+        raise ValueError(f"Expected max_tokens > 0 and 0 <= overlap < max_tokens, got {max_tokens} and {overlap}.")
+
+class FileChunker:
+    """
+    Splits one source file into chunks aligned with its definitions.
+
+    A class or function that fits in `max_tokens` is one chunk. A class
+    that does not is split into its methods, chunked the same way, and
+    windows over the rest of its body. A function that does not fit is
+    split into windows of whole statements; a statement too large on its
+    own is split into the statements nested in it, and one without nested
+    statements into runs of lines. Statements between definitions at
+    module level are windowed too.
+
+    Consecutive windows of one body share up to `overlap` tokens of whole
+    statements. All windows of a definition carry its qualified name as
+    identifier. Token counts come from a prefix sum over lines, so any
+    span is counted in constant time.
+    """
+    def __init__(self, rel_path: str, content: str, max_tokens: int = DEFAULT_MAX_TOKENS,
+                 overlap: int = DEFAULT_OVERLAP, source: Optional[SourceFile] = None):
+        _check_budget(max_tokens, overlap)
+        self.rel_path = rel_path
+        self.content = content
+        self.max_tokens = max_tokens
+        self.overlap = overlap
+        self.source = source
+        lines = content.split("\n")
+        self._prefix = [0]
+        total = 0
+        for line in lines:
+            total += count_tokens(line)
+            self._prefix.append(total)
+        self.line_count = len(lines) - (1 if content.endswith("\n") else 0)
+        self._lines = lines
+
+    def tokens(self, start: int, end: int) -> int:
+        return self._prefix[end] - self._prefix[start - 1]
+
+    def _chunk(self, start: int, end: int, identifier: Optional[str]) -> CodeChunk:
+        if self.source is not None:
+            text = self.source.snippet(start, end)
+        else:
+            text = "\n".join(self._lines[start - 1:end]) + "\n"
+        return CodeChunk(self.rel_path, start, end, text, identifier)
+
+    def chunks(self) -> Iterator[CodeChunk]:
+        """Every chunk of the file, in source order. A file that does not parse is windowed by lines."""
+        try:
+            tree = ast.parse(self.content, filename=self.rel_path)
+        except (SyntaxError, ValueError, RecursionError):
+            yield from self._windows(self._line_runs(1, self.line_count), None)
+            return
+        yield from self._body(tree.body, None, None)
+
+    def _body(self, statements: List[ast.stmt], scope: Optional[Tuple[str, str]],
+              header: Optional[Span]) -> Iterator[CodeChunk]:
+        """A module or class body: definitions on their own, the statements between them windowed."""
+        identifier = scope[0] if scope else None
+        pending: List[Span] = []
+        for statement in statements:
+            if isinstance(statement, _DEFINITIONS):
+                if header is not None:  # a class header not followed by other statements
+                    yield self._chunk(header[0], header[1], identifier)
+                    header = None
+                yield from self._windows(pending, identifier)
+                pending = []
+                yield from self._definition(statement, scope)
+                continue
+            units = self._units([statement])
+            if header is not None:
+                units[0] = (header[0], units[0][1])
+                header = None
+            pending.extend(units)
+        if header is not None:
+            yield self._chunk(header[0], header[1], identifier)
+        yield from self._windows(pending, identifier)
+
+    def _definition(self, node: ast.AST, scope: Optional[Tuple[str, str]]) -> Iterator[CodeChunk]:
+        qualname = qualified_name(scope, node.name)
+        start, end = _span(node)
+        if self.tokens(start, end) <= self.max_tokens:
+            yield self._chunk(start, end, qualname)
+        elif isinstance(node, ast.ClassDef):
+            # The class line, decorators and bases join the first statement of the body.
+            yield from self._body(node.body, (qualname, "class"), (start, max(start, _span(node.body[0])[0] - 1)))
+        else:
+            units = self._units(node.body)
+            units[0] = (start, units[0][1])  # the signature joins the first statement
+            yield from self._windows(units, qualname)
+
+    def _units(self, statements: List[ast.stmt]) -> List[Span]:
+        """Spans within the budget covering the statements, splitting the ones that are not."""
+        units = []
+        for statement in statements:
+            start, end = _span(statement)
+            if self.tokens(start, end) <= self.max_tokens:
+                units.append((start, end))
+                continue
+            children = _children(statement)
+            nested = self._units(children) if children else self._line_runs(start, end)
+            nested[0] = (start, nested[0][1])  # the statement's header joins its first part
+            nested[-1] = (nested[-1][0], max(end, nested[-1][1]))
+            units.extend(nested)
+        return units
+
+    def _line_runs(self, start: int, end: int) -> List[Span]:
+        """Lines grouped into runs within the budget; a single longer line is a run of its own."""
+        runs = []
+        run_start = start
+        for line in range(start, end + 1):
+            if line > run_start and self.tokens(run_start, line) > self.max_tokens:
+                runs.append((run_start, line - 1))
+                run_start = line
+        if run_start <= end:
+            runs.append((run_start, end))
+        return runs
+
+    def _windows(self, units: List[Span], identifier: Optional[str]) -> Iterator[CodeChunk]:
+        """
+        Greedy windows of consecutive units within the budget. Each window
+        after the first starts with the last units of the one before, up to
+        `overlap` tokens, as long as that leaves room for a new unit.
+        """
+        i, n = 0, len(units)
+        while i < n:
+            j = i
+            while j + 1 < n and self.tokens(units[i][0], units[j + 1][1]) <= self.max_tokens:
+                j += 1
+            yield self._chunk(units[i][0], units[j][1], identifier)
+            if j + 1 >= n:
+                return
+            k = j + 1
+            while (k - 1 > i and self.tokens(units[k - 1][0], units[j][1]) <= self.overlap
+                   and self.tokens(units[k - 1][0], units[j + 1][1]) <= self.max_tokens):
+                k -= 1
+            i = k
+
+def chunk_file(root: str, rel_path: str, max_tokens: int = DEFAULT_MAX_TOKENS,
+               overlap: int = DEFAULT_OVERLAP) -> List[CodeChunk]:
+    """The chunks of one file under `root`. Unreadable files have none."""
+    try:
+        source = SourceFile(os.path.join(root, rel_path))
+    except (OSError, UnicodeDecodeError):
+        return []
+    return list(FileChunker(rel_path, source.content, max_tokens, overlap, source).chunks())
+
+def _chunk_files(root: str, rel_paths: List[str], max_tokens: int, overlap: int) -> List[CodeChunk]:
+    return [chunk for rel_path in rel_paths for chunk in chunk_file(root, rel_path, max_tokens, overlap)]
+
+def _batches(items: Iterable[str], size: int) -> Iterator[List[str]]:
+    iterator = iter(items)
+    batch = list(islice(iterator, size))
+    while batch:
+        yield batch
+        batch = list(islice(iterator, size))
+
+def iter_chunks(root: str, max_tokens: int = DEFAULT_MAX_TOKENS, overlap: int = DEFAULT_OVERLAP,
+                workers: Optional[int] = None, files_per_task: int = 16) -> Iterator[CodeChunk]:
+    """
+    Chunks every Python file under `root`, yielding chunks in file order.
+
+    Files are chunked across a process pool, `files_per_task` per task.
+    The directory walk is lazy and at most two tasks per worker are in
+    flight, so memory stays constant however large the repository. An
+    invalid budget raises ValueError here, before any file is read.
+    """
+    _check_budget(max_tokens, overlap)
+    return _iter_chunks(root, max_tokens, overlap, workers or os.cpu_count() or 1, files_per_task)
+
+def _iter_chunks(root: str, max_tokens: int, overlap: int, workers: int, files_per_task: int) -> Iterator[CodeChunk]:
+    batches = _batches(walk_source_files(root), files_per_task)
+    if workers == 1:
+        for batch in batches:
+            yield from _chunk_files(root, batch, max_tokens, overlap)
+        return
+    pool = ProcessPoolExecutor(max_workers=workers)
+    pending = deque()
+    try:
+        for batch in batches:
+            pending.append(pool.submit(_chunk_files, root, batch, max_tokens, overlap))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+    finally:
+        for future in pending:  # shutdown(cancel_futures=True) needs Python 3.9
+            future.cancel()
+        pool.shutdown(wait=True)
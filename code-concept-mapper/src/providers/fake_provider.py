@@ -0,0 +1,40 @@
+import asyncio
+from typing import Dict, List, Optional
+
+from src.providers.base import CodeChunk, RetrievalProvider, RetrievalQuery
+
+class FakeProvider(RetrievalProvider):
+    """
+    An in-process provider for tests: canned chunks per query text, a fixed
+    latency, and failures on demand.
+
+    It records every query it receives and the highest number of queries it
+    had in flight at once, so tests can check concurrency limits.
+    """
+    name = "fake"
+
+    def __init__(self, results: Optional[Dict[str, List[CodeChunk]]] = None, latency: float = 0.0,
+                 failures: Optional[Dict[str, Exception]] = None,
+                 max_concurrency: int = RetrievalProvider.max_concurrency,
+                 timeout: Optional[float] = RetrievalProvider.timeout):
+        self.results = results or {}
+        self.latency = latency
+        self.failures = failures or {}
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.calls: List[RetrievalQuery] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def retrieve(self, query: RetrievalQuery) -> List[CodeChunk]:
+        self.calls.append(query)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            if query.text in self.failures:
+                raise self.failures[query.text]
+            return self.results.get(query.text, [])[:query.top_k]
+        finally:
+            self.in_flight -= 1
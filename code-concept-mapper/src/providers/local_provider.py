@@ -1,7 +1,525 @@
-"""
-local_provider.py
+import asyncio
+import bisect
+import hashlib
+import itertools
+import json
+import math
+import os
+import re
+import time
+import zlib
+from array import array
+from collections import Counter
+from functools import lru_cache
+from typing import AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
-Created: 2025-12-05
-TODO: Implement
-"""
+import numpy as np
 
+from src.providers.base import CodeChunk, RetrievalProvider, RetrievalQuery, RetrievalResult
+from src.utils.code_parser import SourceFile
+from src.utils.serializers import loads
+from src.utils.symbol_index import walk_source_files
+
+INDEX_FORMAT = 1
+
+# Files of an index directory. meta.json is written last, so a directory
+# without it holds an interrupted build.
+META_FILE = "meta.json"
+TERMS_FILE = "terms.bin"                  # every term, UTF-8, in byte order, concatenated
+TERM_OFFSETS_FILE = "term_offsets.u64"    # V + 1 offsets into terms.bin
+POSTING_OFFSETS_FILE = "posting_offsets.u64"  # V + 1 offsets into the posting arrays
+DOCS_FILE = "docs.u32"                    # chunk id of every posting, grouped by term
+FREQS_FILE = "freqs.u32"                  # term frequency of every posting
+LENGTHS_FILE = "lengths.u32"              # token count of every chunk
+CHUNKS_FILE = "chunks.jsonl"              # one JSON array per chunk
+CHUNK_OFFSETS_FILE = "chunk_offsets.u64"  # N + 1 offsets into chunks.jsonl
+VECTORS_FILE = "vectors.bin"              # N x dim matrix, float16 or int8, row per chunk
+SCALES_FILE = "scales.f32"                # per-row scale of an int8 matrix
+
+VECTOR_DTYPES = {"float16": np.float16, "int8": np.int8}
+BLOCK_ROWS = 16384  # matrix rows scored per matrix product
+
+_WORD = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+# Parts of an identifier: `parseHTTPResponse2` → parse, HTTP, Response, 2
+_PART = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|[0-9]+")
+
+@lru_cache(maxsize=1 << 16)
+def _word_terms(word: str) -> Tuple[str, ...]:
+    if len(word) > 4 and word.startswith("__") and word.endswith("__"):
+        return (word,)
+    parts = _PART.findall(word)
+    terms = [word.lower().strip("_")] if len(parts) > 1 else []
+    terms.extend(part.lower() for part in parts if len(part) > 1)
+    return tuple(terms)
+
+def tokenize_code(text: str) -> List[str]:
+    """
+    Splits code into lowercase search terms.
+
+    An identifier yields itself and its camelCase and snake_case parts, so
+    `getUserName` matches a query for `user name` as well as one for
+    `getUserName`. Dunder names such as `__enter__` are kept whole.
+    """
+    terms = []
+    for word in _WORD.findall(text):
+        # Code repeats its identifiers, so most words are split only once.
+        terms.extend(_word_terms(word))
+    return terms
+
+def iter_definition_chunks(root: str) -> Iterator[CodeChunk]:
+    """
+    One chunk per function and method of every Python file under `root`.
+
+    Functions nested in a function stay part of their parent's chunk.
+    Files that cannot be read or parsed are skipped.
+    """
+    for rel_path in walk_source_files(root):
+        try:
+            source = SourceFile(os.path.join(root, rel_path))
+        except (OSError, UnicodeDecodeError):
+            continue
+        symbols = source.symbols
+        if symbols is None:
+            continue
+        for symbol in symbols.symbols:
+            if symbol.kind == "class" or "<locals>" in symbol.qualname or symbol.line_end is None:
+                continue
+            yield CodeChunk(rel_path, symbol.line_start, symbol.line_end,
+                            source.snippet(symbol.line_start, symbol.line_end), symbol.qualname)
+
+def _write_array(path: str, values: array):
+    with open(path, "wb") as f:
+        values.tofile(f)
+
+def _open_array(path: str, dtype) -> np.ndarray:
+    # np.memmap refuses empty files, which an index without chunks has.
+    if os.path.getsize(path) == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r")
+
+def _write_meta(index_dir: str, meta: dict):
+    with open(os.path.join(index_dir, META_FILE), "w", encoding="utf-8") as f:
+        json.dump(dict(meta, format=INDEX_FORMAT), f, indent=2)
+
+def _read_meta(index_dir: str, kind: Optional[str] = None) -> dict:
+    meta_path = os.path.join(index_dir, META_FILE)
+    if not os.path.exists(meta_path):
+        raise FileNotFoundError(f"No index found in {index_dir} (missing {META_FILE}).")
+    with open(meta_path, "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    if meta.get("format") != INDEX_FORMAT:
+        raise ValueError(f"Unsupported index format {meta.get('format')!r} in {index_dir}.")
+    if kind is not None and meta.get("kind") != kind:
+        raise ValueError(f"{index_dir} holds a {meta.get('kind')} index, not a {kind} index.")
+    return meta
+
+def _start_build(index_dir: str):
+    os.makedirs(index_dir, exist_ok=True)
+    meta_path = os.path.join(index_dir, META_FILE)
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+
+class _ChunkWriter:
+    """Writes the chunk records of an index and hashes them into the corpus version."""
+    def __init__(self, index_dir: str):
+        self.index_dir = index_dir
+        self._file = open(os.path.join(index_dir, CHUNKS_FILE), "wb")
+        self._offsets = array("Q", [0])
+        self._version = hashlib.sha256()
+
+    def add(self, chunk: CodeChunk):
+        record = json.dumps([chunk.file_path, chunk.line_start, chunk.line_end, chunk.content,
+                             chunk.identifier], ensure_ascii=False).encode("utf-8") + b"\n"
+        self._file.write(record)
+        self._offsets.append(self._offsets[-1] + len(record))
+        self._version.update(record)
+
+    def close(self) -> str:
+        """Finishes the chunk files and returns the corpus version."""
+        self._file.close()
+        _write_array(os.path.join(self.index_dir, CHUNK_OFFSETS_FILE), self._offsets)
+        return self._version.hexdigest()
+
+class _ChunkStore:
+    """The chunk records of an index, decoded only when a result is returned."""
+    def __init__(self, index_dir: str):
+        self._records = _open_array(os.path.join(index_dir, CHUNKS_FILE), np.uint8)
+        self._offsets = _open_array(os.path.join(index_dir, CHUNK_OFFSETS_FILE), np.uint64)
+
+    def get(self, doc_id: int, score: float = 0.0) -> CodeChunk:
+        record = self._records[self._offsets[doc_id]:self._offsets[doc_id + 1]].tobytes()
+        file_path, line_start, line_end, content, identifier = loads(record)
+        return CodeChunk(file_path, line_start, line_end, content, identifier, score)
+
+class _TermTable:
+    """The sorted terms of an index, read from the mapped file only when a lookup probes them."""
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray):
+        self._blob = blob
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return max(0, len(self._offsets) - 1)
+
+    def __getitem__(self, i: int) -> bytes:
+        return self._blob[self._offsets[i]:self._offsets[i + 1]].tobytes()
+
+    def find(self, term: str) -> Optional[int]:
+        key = term.encode("utf-8")
+        i = bisect.bisect_left(self, key)
+        return i if i < len(self) and self[i] == key else None
+
+class BM25Index:
+    """
+    An on-disk inverted index over code chunks, scored with Okapi BM25.
+
+    Every part of the index is a flat array in its own file, mapped into
+    memory when the index is opened, so opening costs the same for ten
+    chunks as for ten million. Only the postings of the query terms and
+    the top-ranked chunks are ever read.
+    """
+    kind = "bm25"
+
+    def __init__(self, index_dir: str, k1: float = 1.2, b: float = 0.75):
+        self.meta = _read_meta(index_dir, self.kind)
+        self.index_dir = index_dir
+        self.k1 = k1
+        self.b = b
+
+        path = lambda name: os.path.join(index_dir, name)
+        self._terms = _TermTable(_open_array(path(TERMS_FILE), np.uint8),
+                                 _open_array(path(TERM_OFFSETS_FILE), np.uint64))
+        self._posting_offsets = _open_array(path(POSTING_OFFSETS_FILE), np.uint64)
+        self._docs = _open_array(path(DOCS_FILE), np.uint32)
+        self._freqs = _open_array(path(FREQS_FILE), np.uint32)
+        self._chunks = _ChunkStore(index_dir)
+        lengths = _open_array(path(LENGTHS_FILE), np.uint32)
+        average = self.meta["average_length"] or 1.0
+        # The length normalization of BM25's denominator, fixed per chunk.
+        self._norm = (k1 * (1 - b + b * lengths / average)).astype(np.float32)
+
+    @classmethod
+    def build(cls, chunks: Iterable[CodeChunk], index_dir: str, **kwargs) -> "BM25Index":
+        """Tokenizes the chunks, writes the index to `index_dir` and opens it."""
+        _start_build(index_dir)
+        path = lambda name: os.path.join(index_dir, name)
+
+        postings: Dict[str, Tuple[array, array]] = {}
+        lengths = array("I")
+        writer = _ChunkWriter(index_dir)
+        for doc_id, chunk in enumerate(chunks):
+            counts = Counter(tokenize_code(chunk.content))
+            lengths.append(sum(counts.values()))
+            for term, freq in counts.items():
+                entry = postings.get(term)
+                if entry is None:
+                    entry = postings[term] = (array("I"), array("I"))
+                entry[0].append(doc_id)
+                entry[1].append(freq)
+            writer.add(chunk)
+        version = writer.close()
+
+        terms = sorted((term.encode("utf-8"), term) for term in postings)
+        term_offsets, posting_offsets = array("Q", [0]), array("Q", [0])
+        docs, freqs = array("I"), array("I")
+        with open(path(TERMS_FILE), "wb") as f:
+            for encoded, term in terms:
+                f.write(encoded)
+                term_offsets.append(term_offsets[-1] + len(encoded))
+                term_docs, term_freqs = postings[term]
+                docs.extend(term_docs)
+                freqs.extend(term_freqs)
+                posting_offsets.append(len(docs))
+        for name, values in ((TERM_OFFSETS_FILE, term_offsets), (POSTING_OFFSETS_FILE, posting_offsets),
+                             (DOCS_FILE, docs), (FREQS_FILE, freqs), (LENGTHS_FILE, lengths)):
+            _write_array(path(name), values)
+
+        _write_meta(index_dir, {"kind": cls.kind, "documents": len(lengths), "terms": len(terms),
+                                "postings": len(docs), "version": version,
+                                "average_length": sum(lengths) / len(lengths) if lengths else 0.0})
+        return cls(index_dir, **kwargs)
+
+    def __len__(self) -> int:
+        return self.meta["documents"]
+
+    @property
+    def version(self) -> str:
+        """A hash of every indexed chunk; it changes whenever the indexed corpus does."""
+        return self.meta["version"]
+
+    def scores(self, query: str) -> np.ndarray:
+        """The BM25 score of every chunk for a query; chunks sharing no term with it score 0."""
+        n = len(self)
+        scores = np.zeros(n, dtype=np.float32)
+        for term in dict.fromkeys(tokenize_code(query)):
+            term_id = self._terms.find(term)
+            if term_id is None:
+                continue
+            start, end = int(self._posting_offsets[term_id]), int(self._posting_offsets[term_id + 1])
+            docs = self._docs[start:end]
+            freqs = self._freqs[start:end].astype(np.float32)
+            df = end - start
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            scores[docs] += idf * (self.k1 + 1) * freqs / (freqs + self._norm[docs])
+        return scores
+
+    def chunk(self, doc_id: int, score: float = 0.0) -> CodeChunk:
+        """Reads one chunk back from the index."""
+        return self._chunks.get(doc_id, score)
+
+    def search(self, query: str, top_k: int = 5) -> List[CodeChunk]:
+        """The `top_k` best-scoring chunks for a query, best first. Ties go to the chunk indexed first."""
+        scores = self.scores(query)
+        return [self.chunk(doc_id, float(scores[doc_id])) for doc_id in top_k_indices(scores, top_k)]
+
+    def search_many(self, queries: Iterable[str], top_k: int = 5) -> List[List[CodeChunk]]:
+        return [self.search(query, top_k) for query in queries]
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the `k` highest positive scores, best first, found with a partial sort."""
+    candidates = np.flatnonzero(scores > 0)
+    if k <= 0:
+        return candidates[:0]
+    if len(candidates) > k:
+        candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+    return candidates[np.lexsort((candidates, -scores[candidates]))]
+
+@lru_cache(maxsize=1 << 16)
+def _term_bucket(term: str, dim: int) -> Tuple[int, float]:
+    h = zlib.crc32(term.encode("utf-8"))
+    return h % dim, (1.0 if h & 0x80000000 else -1.0)
+
+class HashingEmbedding:
+    """
+    A deterministic local embedding: the code terms of a text hashed into
+    `dim` signed buckets, weighted 1 + log(count) and L2-normalized.
+
+    It needs no model and no network, and gives the same vectors on every
+    machine, so indexes built with it can be compared across runs.
+    """
+    name = "hashing"
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+
+    def __call__(self, texts: List[str]) -> np.ndarray:
+        cells, weights = array("q"), array("d")
+        for row, text in enumerate(texts):
+            base = row * self.dim
+            for term, count in Counter(tokenize_code(text)).items():
+                bucket, sign = _term_bucket(term, self.dim)
+                cells.append(base + bucket)
+                weights.append(sign * (1 + math.log(count)))
+        vectors = np.bincount(np.frombuffer(cells, dtype=np.int64), np.frombuffer(weights, dtype=np.float64),
+                              minlength=len(texts) * self.dim).astype(np.float32).reshape(len(texts), self.dim)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        return vectors / norms
+
+# An embedding is a callable from a list of texts to an (n, dim) float32
+# array, with `name` and `dim` attributes. Registered embeddings can be
+# reopened from the name stored in an index.
+Embedding = Callable[[List[str]], np.ndarray]
+EMBEDDINGS: Dict[str, Callable[..., Embedding]] = {"hashing": HashingEmbedding}
+
+def register_embedding(name: str, factory: Callable[..., Embedding]):
+    EMBEDDINGS[name] = factory
+
+def get_embedding(name: str, dim: int) -> Embedding:
+    if name not in EMBEDDINGS:
+        raise ValueError(f"Unknown embedding '{name}'. Choose from: {', '.join(EMBEDDINGS)}, or pass one explicitly.")
+    return EMBEDDINGS[name](dim=dim)
+
+def quantize(vectors: np.ndarray, dtype: str) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    Converts float32 rows for storage. int8 rows are scaled so their largest
+    component is ±127 and come with that per-row scale; float16 needs none.
+    """
+    if dtype == "float16":
+        return vectors.astype(np.float16), None
+    scales = np.abs(vectors).max(axis=1) / 127
+    scales[scales == 0] = 1
+    return np.round(vectors / scales[:, None]).astype(np.int8), scales.astype(np.float32)
+
+def top_k_columns(scores: np.ndarray, ids: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """For every column of `scores`, the `k` highest rows as (scores, ids), unordered."""
+    if len(scores) <= k:
+        return scores, ids
+    rows = np.argpartition(-scores, k - 1, axis=0)[:k]
+    return np.take_along_axis(scores, rows, axis=0), np.take_along_axis(ids, rows, axis=0)
+
+class DenseIndex:
+    """
+    An on-disk matrix of chunk embeddings, searched by inner product.
+
+    Rows are stored as float16, or as int8 with a float32 scale per row, and
+    memory-mapped when the index is opened. A batch of queries is scored as
+    one matrix product per block of rows, keeping only a running top k per
+    query, so memory stays bounded however large the index.
+    """
+    kind = "dense"
+
+    def __init__(self, index_dir: str, embedding: Optional[Embedding] = None):
+        self.meta = _read_meta(index_dir, self.kind)
+        self.index_dir = index_dir
+        self.embedding = embedding or get_embedding(self.meta["embedding"], self.meta["dim"])
+        if getattr(self.embedding, "dim", self.meta["dim"]) != self.meta["dim"]:
+            raise ValueError(f"The embedding has {self.embedding.dim} dimensions, the index {self.meta['dim']}.")
+        rows, dim = self.meta["documents"], self.meta["dim"]
+        vectors_path = os.path.join(index_dir, VECTORS_FILE)
+        dtype = VECTOR_DTYPES[self.meta["dtype"]]
+        self._vectors = (np.memmap(vectors_path, dtype=dtype, mode="r", shape=(rows, dim)) if rows
+                         else np.zeros((0, dim), dtype=dtype))
+        self._scales = (_open_array(os.path.join(index_dir, SCALES_FILE), np.float32)
+                        if self.meta["dtype"] == "int8" else None)
+        self._chunks = _ChunkStore(index_dir)
+
+    @classmethod
+    def build(cls, chunks: Iterable[CodeChunk], index_dir: str, embedding: Optional[Embedding] = None,
+              dtype: str = "float16", batch_size: int = 1024) -> "DenseIndex":
+        """Embeds the chunks in batches, writes the quantized matrix to `index_dir` and opens it."""
+        if dtype not in VECTOR_DTYPES:
+            raise ValueError(f"Unsupported vector type '{dtype}'. Choose from: {', '.join(VECTOR_DTYPES)}")
+        embedding = embedding or HashingEmbedding()
+        _start_build(index_dir)
+        writer = _ChunkWriter(index_dir)
+        rows = 0
+        with open(os.path.join(index_dir, VECTORS_FILE), "wb") as vectors_file, \
+                open(os.path.join(index_dir, SCALES_FILE), "wb") as scales_file:
+            batch: List[CodeChunk] = []
+            for chunk in itertools.chain(chunks, [None]):
+                if chunk is not None:
+                    batch.append(chunk)
+                    writer.add(chunk)
+                if batch and (chunk is None or len(batch) == batch_size):
+                    vectors, scales = quantize(embedding([c.content for c in batch]), dtype)
+                    vectors_file.write(vectors.tobytes())
+                    if scales is not None:
+                        scales_file.write(scales.tobytes())
+                    rows += len(batch)
+                    batch = []
+        version = writer.close()
+        _write_meta(index_dir, {"kind": cls.kind, "documents": rows, "dim": embedding.dim, "dtype": dtype,
+                                "embedding": embedding.name, "version": version})
+        return cls(index_dir, embedding)
+
+    def __len__(self) -> int:
+        return self.meta["documents"]
+
+    @property
+    def version(self) -> str:
+        """A hash of every indexed chunk; it changes whenever the indexed corpus does."""
+        return self.meta["version"]
+
+    def search_many(self, queries: Iterable[str], top_k: int = 5) -> List[List[CodeChunk]]:
+        """The `top_k` chunks most similar to each query, best first, scoring all queries at once."""
+        queries = list(queries)
+        if not queries or top_k <= 0:
+            return [[] for _ in queries]
+        matrix = self.embedding(queries).astype(np.float32).T  # dim x queries
+        best_scores = np.zeros((0, len(queries)), dtype=np.float32)
+        best_ids = np.zeros((0, len(queries)), dtype=np.int64)
+        for start in range(0, len(self), BLOCK_ROWS):
+            block = self._vectors[start:start + BLOCK_ROWS]
+            scores = block.astype(np.float32) @ matrix
+            if self._scales is not None:
+                scores *= self._scales[start:start + len(block), None]
+            ids = np.broadcast_to(np.arange(start, start + len(block))[:, None], scores.shape)
+            scores, ids = top_k_columns(scores, ids, top_k)
+            best_scores, best_ids = top_k_columns(np.concatenate([best_scores, scores]),
+                                                  np.concatenate([best_ids, ids]), top_k)
+        order = np.lexsort((best_ids, -best_scores), axis=0)
+        best_scores = np.take_along_axis(best_scores, order, axis=0)
+        best_ids = np.take_along_axis(best_ids, order, axis=0)
+        return [[self._chunks.get(int(doc_id), float(score)) for doc_id, score in zip(best_ids[:, q], best_scores[:, q])]
+                for q in range(len(queries))]
+
+    def search(self, query: str, top_k: int = 5) -> List[CodeChunk]:
+        return self.search_many([query], top_k)[0]
+
+INDEX_KINDS = {BM25Index.kind: BM25Index, DenseIndex.kind: DenseIndex}
+
+def open_index(index_dir: str):
+    """Opens a BM25 or dense index, whichever `index_dir` holds."""
+    kind = _read_meta(index_dir).get("kind")
+    if kind not in INDEX_KINDS:
+        raise ValueError(f"Unknown index kind {kind!r} in {index_dir}.")
+    return INDEX_KINDS[kind](index_dir)
+
+class LocalProvider(RetrievalProvider):
+    """
+    Retrieves code chunks from a local BM25 or dense index, without any
+    network call.
+
+    Searches run in a worker thread so they do not block the event loop. A
+    batch goes to the index's `search_many` in sub-batches of
+    `max_concurrency` queries, so a dense index scores each as one matrix
+    product instead of one per query; raise `max_concurrency` for fewer,
+    larger products. A sub-batch that outlives the timeout is reported as
+    timed out, but its thread runs to completion: index searches cannot be
+    interrupted.
+    """
+    name = "local"
+
+    def __init__(self, index_dir: str, timeout: Optional[float] = RetrievalProvider.timeout):
+        self.index_dir = os.path.abspath(index_dir)
+        self.index = open_index(index_dir)
+        self.timeout = timeout
+
+    @property
+    def identity(self) -> str:
+        """Which index this is, so caches keep the results of different indexes apart."""
+        return self.index_dir
+
+    @property
+    def version(self) -> str:
+        return self.index.version
+
+    async def retrieve(self, query: RetrievalQuery) -> List[CodeChunk]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.index.search, query.text, query.top_k)
+
+    async def _search_batches(self, queries: List[RetrievalQuery], max_concurrency: Optional[int],
+                              timeout: Optional[float]) -> AsyncIterator[Tuple[int, RetrievalResult]]:
+        """
+        (position, result) pairs, one sub-batch at a time. Queries sharing a
+        `top_k` are searched together, `max_concurrency` per `search_many`
+        call, and each call has its own timeout.
+        """
+        size = max_concurrency or self.max_concurrency
+        timeout = self.timeout if timeout is None else timeout
+        by_top_k: Dict[int, List[int]] = {}
+        for position, query in enumerate(queries):
+            by_top_k.setdefault(query.top_k, []).append(position)
+
+        loop = asyncio.get_running_loop()
+        for top_k, positions in by_top_k.items():
+            for i in range(0, len(positions), size):
+                batch = positions[i:i + size]
+                texts = [queries[p].text for p in batch]
+                start = time.perf_counter()
+                error = None
+                try:
+                    found = await asyncio.wait_for(
+                        loop.run_in_executor(None, self.index.search_many, texts, top_k), timeout)
+                except asyncio.TimeoutError:
+                    found, error = [[] for _ in texts], f"Timed out after {timeout}s."
+                except Exception as e:
+                    found, error = [[] for _ in texts], f"{type(e).__name__}: {e}"
+                seconds = time.perf_counter() - start
+                for position, chunks in zip(batch, found):
+                    yield position, RetrievalResult(queries[position], chunks, error, seconds)
+
+    async def retrieve_many(self, queries: Iterable[RetrievalQuery], max_concurrency: Optional[int] = None,
+                            timeout: Optional[float] = None) -> List[RetrievalResult]:
+        """Searches the batch in sub-batches of `max_concurrency` queries, one `search_many` call each."""
+        queries = list(queries)
+        results: List[Optional[RetrievalResult]] = [None] * len(queries)
+        async for position, result in self._search_batches(queries, max_concurrency, timeout):
+            results[position] = result
+        return results
+
+    async def stream(self, queries: Iterable[RetrievalQuery], max_concurrency: Optional[int] = None,
+                     timeout: Optional[float] = None) -> AsyncIterator[RetrievalResult]:
+        """Like `retrieve_many`, but yields each sub-batch's results as soon as its search finishes."""
+        async for _, result in self._search_batches(list(queries), max_concurrency, timeout):
+            yield result
@@ -0,0 +1,134 @@
+import gzip
+import hashlib
+import json
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.utils.serializers import GZIP_LEVEL
+
+DEFAULT_MAX_POINTS = 200
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Rewritten on every save, so it is left out of the content digest. Metadata
+# is serialized first, so the search stops near the start of the document.
+VOLATILE_FIELD = re.compile(rb'"last_updated"\s*:\s*(?:"[^"]*"|null)')
+
+def content_digest(data: bytes) -> str:
+    """The SHA-256 of a state file version, ignoring its `last_updated` timestamp."""
+    match = VOLATILE_FIELD.search(data)
+    if match is None:
+        return hashlib.sha256(data).hexdigest()
+    digest = hashlib.sha256(memoryview(data)[:match.start()])
+    digest.update(memoryview(data)[match.end():])
+    return digest.hexdigest()
+
+class BackupStore:
+    """
+    A content-addressed store of state file versions.
+
+    Each version is gzip-compressed and stored once under its content
+    digest, which ignores the `last_updated` timestamp: saving a map whose
+    content did not change adds no restore point, and a version identical
+    to an older one reuses its object (and restores with its timestamp). Restore
+    points are kept in `index.json`, oldest first. Once there are more than
+    `max_points` of them, or the stored objects exceed `max_bytes`, the
+    oldest points are dropped along with objects nothing references.
+    """
+    def __init__(self, backup_dir: Path, max_points: int = DEFAULT_MAX_POINTS,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        self.backup_dir = Path(backup_dir)
+        self.objects_dir = self.backup_dir / "objects"
+        self.index_file = self.backup_dir / "index.json"
+        self.max_points = max_points
+        self.max_bytes = max_bytes
+        self.bytes_written = 0  # running total, for benchmarking
+
+    def _object_path(self, digest: str) -> Path:
+        return self.objects_dir / f"{digest}.gz"
+
+    def _load_index(self) -> Dict:
+        if not self.index_file.exists():
+            return {"next_id": 1, "points": []}
+        with open(self.index_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _save_index(self, index: Dict):
+        temp_file = self.index_file.with_suffix(".tmp")
+        payload = json.dumps(index, indent=2).encode("utf-8")
+        with open(temp_file, "wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, self.index_file)
+        self.bytes_written += len(payload)
+
+    def list_points(self) -> List[Dict]:
+        return self._load_index()["points"]
+
+    def add(self, data: bytes, label: str = "", compressed: Optional[bytes] = None) -> Dict:
+        """
+        Records `data` as a new restore point and returns the point. Pass
+        `compressed` when the caller already has `data` gzip-compressed,
+        to save compressing it again.
+        """
+        digest = content_digest(data)
+        index = self._load_index()
+        if index["points"] and index["points"][-1]["digest"] == digest:
+            return index["points"][-1]
+
+        object_path = self._object_path(digest)
+        if object_path.exists():
+            stored_size = object_path.stat().st_size
+        else:
+            self.objects_dir.mkdir(parents=True, exist_ok=True)
+            if compressed is None:
+                compressed = gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+            temp_file = object_path.with_suffix(".tmp")
+            with open(temp_file, "wb") as f:
+                f.write(compressed)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_file, object_path)
+            self.bytes_written += len(compressed)
+            stored_size = len(compressed)
+
+        point = {
+            "id": index["next_id"],
+            "created_at": datetime.now().isoformat(),
+            "digest": digest,
+            "size": len(data),
+            "stored_size": stored_size,
+            "label": label,
+        }
+        index["next_id"] += 1
+        index["points"].append(point)
+        self._prune(index)
+        self._save_index(index)
+        return point
+
+    def _prune(self, index: Dict):
+        points = index["points"]
+        stored = {p["digest"]: p["stored_size"] for p in points}
+        while len(points) > 1 and (len(points) > self.max_points or sum(stored.values()) > self.max_bytes):
+            dropped = points.pop(0)
+            if all(p["digest"] != dropped["digest"] for p in points):
+                stored.pop(dropped["digest"], None)
+                object_path = self._object_path(dropped["digest"])
+                if object_path.exists():
+                    os.remove(object_path)
+
+    def get(self, point_id: int) -> Optional[bytes]:
+        """Returns the content of a restore point, or None if it does not exist."""
+        for point in self.list_points():
+            if point["id"] == point_id:
+                with open(self._object_path(point["digest"]), "rb") as f:
+                    return gzip.decompress(f.read())
+        return None
+
+    def total_stored_bytes(self) -> int:
+        if not self.objects_dir.exists():
+            return 0
+        return sum(path.stat().st_size for path in self.objects_dir.glob("*.gz"))
@@ -1,65 +1,347 @@
 import ast
+import mmap
+import os
 import sys
-from typing import Optional, Tuple
+from array import array
+from collections import OrderedDict
+from itertools import islice
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
 
 # Version check
 if sys.version_info < (3, 8):
     print("❌ ERROR: This tool requires Python 3.8+ (for AST end_lineno support)", file=sys.stderr)
     sys.exit(1)
 
-class ASTLocator(ast.NodeVisitor):
-    """A node visitor to find a specific class or function definition."""
-    def __init__(self, target_name: str):
-        self.target_name = target_name
-        self.found_node: Optional[ast.AST] = None
+DEFAULT_CACHE_SIZE = 128
 
-    def visit_ClassDef(self, node: ast.ClassDef):
-        if node.name == self.target_name:
-            self.found_node = node
-        self.generic_visit(node)
+_KINDS = {"ClassDef": "class", "FunctionDef": "function", "AsyncFunctionDef": "async_function"}
+# Fields holding nested statements, in source order (try: body, except, else, finally).
+_BODY_FIELDS = ("body", "handlers", "orelse", "finalbody", "cases")
 
-    def visit_FunctionDef(self, node: ast.FunctionDef):
-        if node.name == self.target_name:
-            self.found_node = node
-        self.generic_visit(node)
+@dataclass(frozen=True)
+class Symbol:
+    """A class or function definition, its qualified name and its line span."""
+    name: str
+    qualname: str
+    kind: str
+    line_start: int
+    line_end: Optional[int]
+
+def qualified_name(parent: Optional[Tuple[str, str]], name: str) -> str:
+    """The __qualname__ of `name` defined inside `parent`, a (qualname, kind) pair or None at module level."""
+    if parent is None:
+        return name
+    if parent[1] == "class":
+        return f"{parent[0]}.{name}"
+    return f"{parent[0]}.<locals>.{name}"
+
+class SymbolCollector(ast.NodeVisitor):
+    """
+    Collects every class and function definition in a single pass.
 
-    def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef):
-        if node.name == self.target_name:
-            self.found_node = node
+    Qualified names follow Python's __qualname__ rules: methods become
+    `Class.method` and functions nested in a function become
+    `outer.<locals>.inner`.
+    """
+    def __init__(self):
+        self.symbols: List[Symbol] = []
+        self._scope: List[Tuple[str, str]] = []
+
+    def _collect(self, node):
+        kind = _KINDS[type(node).__name__]
+        qualname = qualified_name(self._scope[-1] if self._scope else None, node.name)
+        self.symbols.append(Symbol(
+            name=node.name, qualname=qualname, kind=kind,
+            line_start=node.lineno, line_end=getattr(node, "end_lineno", None),
+        ))
+        self._scope.append((qualname, kind))
         self.generic_visit(node)
+        self._scope.pop()
 
-def find_lines_by_identifier(file_path: str, identifier: str) -> Tuple[Optional[int], Optional[int]]:
-    """Parses a Python file to find the start and end lines of a class or function."""
-    try:
+    visit_ClassDef = _collect
+    visit_FunctionDef = _collect
+    visit_AsyncFunctionDef = _collect
+
+    def generic_visit(self, node):
+        # Definitions are statements, so only statement lists can hold them.
+        # Skipping expression subtrees avoids visiting most of the tree.
+        for field in _BODY_FIELDS:
+            children = getattr(node, field, None)
+            if isinstance(children, list):
+                for child in children:
+                    self.visit(child)
+
+class SymbolTable:
+    """Maps bare and qualified names to every matching definition, in source order."""
+    def __init__(self, symbols: List[Symbol], module: Optional[str] = None):
+        self.symbols = symbols
+        self.module = module
+        self.by_name: Dict[str, List[Symbol]] = {}
+        self.by_qualname: Dict[str, List[Symbol]] = {}
+        for symbol in symbols:
+            self.by_name.setdefault(symbol.name, []).append(symbol)
+            self.by_qualname.setdefault(symbol.qualname, []).append(symbol)
+
+    @classmethod
+    def from_tree(cls, tree: ast.AST, module: Optional[str] = None) -> "SymbolTable":
+        collector = SymbolCollector()
+        collector.visit(tree)
+        return cls(collector.symbols, module)
+
+    def lookup(self, name: str) -> List[Symbol]:
+        return self.by_name.get(name, [])
+
+    def resolve(self, identifier: str) -> List[Symbol]:
+        """
+        Returns every definition matching an identifier.
+
+        Accepts a bare name (`__init__`), a qualified name (`Class.method`,
+        `outer.<locals>.inner`) or a module-qualified name
+        (`package.module:Class.method`). More than one result means the
+        identifier is ambiguous in this file.
+        """
+        if ":" in identifier and identifier not in self.by_qualname and identifier not in self.by_name:
+            module, identifier = identifier.split(":", 1)  # route names such as `app.get /users/:id` keep theirs
+            if self.module and not _module_matches(self.module, module):
+                return []
+        if identifier in self.by_qualname:
+            return self.by_qualname[identifier]
+        return self.by_name.get(identifier, [])
+
+def module_name(file_path: str) -> str:
+    """Derives a dotted module path from a file path (`pkg/mod.py` → `pkg.mod`)."""
+    path = os.path.splitext(os.path.normpath(file_path))[0]
+    parts = [part for part in path.split(os.sep) if part and part not in (".", "..")]
+    if parts and parts[-1] == "__init__":
+        parts.pop()
+    return ".".join(parts)
+
+def _module_matches(full_module: str, module: str) -> bool:
+    return full_module == module or full_module.endswith("." + module)
+
+def build_symbol_table(content: str, file_path: str) -> SymbolTable:
+    """
+    The symbol table of a Python, JavaScript or TypeScript source, chosen by
+    extension. Raises SyntaxError for Python that does not parse; the
+    JavaScript locator never fails, it finds what it can.
+    """
+    from src.utils import js_locator  # it builds on this module
+    if js_locator.is_javascript(file_path):
+        return SymbolTable(js_locator.locate(content), module_name(file_path))
+    return SymbolTable.from_tree(ast.parse(content, filename=file_path), module_name(file_path))
+
+def format_candidates(symbols: List[Symbol]) -> str:
+    return ", ".join(f"{s.qualname} ({s.line_start}-{s.line_end})" for s in symbols)
+
+class SourceFile:
+    """A source file read once, so several lookups share a single read and parse."""
+    def __init__(self, file_path: str):
+        self.file_path = file_path
         with open(file_path, "r", encoding="utf-8") as f:
-            content = f.read()
+            self.content = f.read()
+        self._line_offsets: Optional[array] = None
+        self._symbols: Optional[SymbolTable] = None
+        self._parse_failed = False
 
-        tree = ast.parse(content, filename=file_path)
-        locator = ASTLocator(identifier)
-        locator.visit(tree)
+    @property
+    def symbols(self) -> Optional[SymbolTable]:
+        """
+        The symbol table, built on first use. None if the file does not parse.
 
-        if locator.found_node:
-            start = locator.found_node.lineno
-            end = getattr(locator.found_node, "end_lineno", None)
-            return start, end
-        return None, None
-    except SyntaxError as e:
-        print(f"❌ Syntax Error in {file_path}:{e.lineno}: {e.msg}", file=sys.stderr)
+        Taken from the persistent symbol index when one is set and still
+        matches the file; parsed otherwise.
+        """
+        if self._symbols is None and not self._parse_failed and _symbol_index is not None:
+            self._symbols = _symbol_index.table_for(self.file_path)
+        if self._symbols is None and not self._parse_failed:
+            try:
+                self._symbols = build_symbol_table(self.content, self.file_path)
+            except SyntaxError as e:
+                print(f"❌ Syntax Error in {self.file_path}:{e.lineno}: {e.msg}", file=sys.stderr)
+                self._parse_failed = True
+            except Exception as e:
+                print(f"⚠️  AST Parse Error in {self.file_path}: {e}", file=sys.stderr)
+                self._parse_failed = True
+        return self._symbols
+
+    def resolve(self, identifier: str) -> List[Symbol]:
+        """Returns every definition matching a bare or qualified identifier."""
+        symbols = self.symbols
+        return symbols.resolve(identifier) if symbols else []
+
+    def find_lines(self, identifier: str) -> Tuple[Optional[int], Optional[int]]:
+        """Finds the start and end lines of a class or function in this file."""
+        matches = self.resolve(identifier)
+        if len(matches) == 1:
+            return matches[0].line_start, matches[0].line_end
+        if matches:
+            print(f"⚠️  Identifier '{identifier}' is ambiguous in {self.file_path}: "
+                  f"{format_candidates(matches)}", file=sys.stderr)
         return None, None
+
+    @property
+    def line_offsets(self) -> array:
+        """Character offset of the start of every line, built once on first use."""
+        if self._line_offsets is None:
+            offsets = array("q", [0])
+            find, content = self.content.find, self.content
+            pos = find("\n")
+            while pos != -1:
+                offsets.append(pos + 1)
+                pos = find("\n", pos + 1)
+            self._line_offsets = offsets
+        return self._line_offsets
+
+    def snippet(self, start_line: int, end_line: Optional[int]) -> Optional[str]:
+        """Slices lines out of the already-loaded content without splitting it."""
+        if end_line is None:
+            return None
+        offsets = self.line_offsets
+        line_count = len(offsets) - (1 if offsets[-1] == len(self.content) else 0)
+        start_idx = max(0, start_line - 1)
+        end_idx = min(line_count, end_line)
+        if start_idx >= end_idx:
+            return ""
+        end_offset = offsets[end_idx] if end_idx < len(offsets) else len(self.content)
+        return self.content[offsets[start_idx]:end_offset]
+
+class ParseCache:
+    """
+    An LRU cache of SourceFile objects keyed by path.
+
+    Entries are revalidated against the file's mtime and size on every
+    lookup, so an edited file is transparently re-read and re-parsed.
+    """
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, Tuple[int, int, SourceFile]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, file_path: str) -> SourceFile:
+        """Returns the cached SourceFile, reading the file if it is new or changed."""
+        key = os.path.abspath(file_path)
+        st = os.stat(key)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+        self.misses += 1
+        source = SourceFile(file_path)
+        self._entries[key] = (st.st_mtime_ns, st.st_size, source)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return source
+
+    def peek(self, file_path: str) -> Optional[SourceFile]:
+        """Returns the cached SourceFile only if it is still fresh; never reads the file."""
+        key = os.path.abspath(file_path)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        st = os.stat(key)
+        if entry[0] != st.st_mtime_ns or entry[1] != st.st_size:
+            return None
+        return entry[2]
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+_parse_cache = ParseCache()
+_symbol_index = None
+
+def set_symbol_index(index):
+    """Makes lookups use a persistent SymbolIndex (see src.utils.symbol_index). None turns it off."""
+    global _symbol_index
+    _symbol_index = index
+    _parse_cache.clear()
+
+def get_symbol_index():
+    return _symbol_index
+
+def get_source_file(file_path: str) -> SourceFile:
+    """Returns the SourceFile for a path from the shared parse cache."""
+    return _parse_cache.get(file_path)
+
+def clear_parse_cache():
+    _parse_cache.clear()
+
+def resolve_identifier(file_path: str, identifier: str) -> List[Symbol]:
+    """Returns every definition of a bare or qualified identifier in a file."""
+    try:
+        source = get_source_file(file_path)
+    except Exception as e:
+        print(f"⚠️  AST Parse Error in {file_path}: {e}", file=sys.stderr)
+        return []
+    return source.resolve(identifier)
+
+def find_lines_by_identifier(file_path: str, identifier: str) -> Tuple[Optional[int], Optional[int]]:
+    """Finds the start and end lines of a class or function (or a JS/TS route) in a source file."""
+    try:
+        source = get_source_file(file_path)
     except Exception as e:
         print(f"⚠️  AST Parse Error in {file_path}: {e}", file=sys.stderr)
         return None, None
+    return source.find_lines(identifier)
+
+def _read_lines_mmap(file_path: str, start_line: int, end_line: int) -> Optional[str]:
+    """
+    Seeks to a line range by scanning newline offsets over an mmap.
+
+    Returns None when the file contains carriage returns, whose universal
+    newline handling the byte scan cannot reproduce.
+    """
+    with open(file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return ""
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if mm.find(b"\r") != -1:
+                return None
+            begin = 0
+            for _ in range(start_line - 1):
+                pos = mm.find(b"\n", begin)
+                if pos == -1:
+                    return ""
+                begin = pos + 1
+            end = begin
+            for _ in range(end_line - start_line + 1):
+                pos = mm.find(b"\n", end)
+                if pos == -1:
+                    end = len(mm)
+                    break
+                end = pos + 1
+            return mm[begin:end].decode("utf-8")
 
 def extract_snippet(file_path: str, start_line: int, end_line: Optional[int]) -> Optional[str]:
-    """Reads specific lines from a file to create a code snippet."""
+    """
+    Reads specific lines from a file to create a code snippet.
+
+    Reuses the buffer of a file already in the parse cache; otherwise reads
+    only up to `end_line`. Never materializes the full list of lines.
+    """
     if end_line is None:
         return None
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            lines = f.readlines()
-        start_idx = max(0, start_line - 1)
-        end_idx = min(len(lines), end_line)
-        return "".join(lines[start_idx:end_idx])
+        source = _parse_cache.peek(file_path)
+        if source is not None:
+            return source.snippet(start_line, end_line)
+
+        start_line = max(1, start_line)
+        if end_line < start_line:
+            return ""
+        snippet = _read_lines_mmap(file_path, start_line, end_line)
+        if snippet is None:
+            with open(file_path, "r", encoding="utf-8") as f:
+                snippet = "".join(islice(f, start_line - 1, end_line))
+        return snippet
     except Exception as e:
         print(f"❌ Failed to read {file_path}: {e}", file=sys.stderr)
-        return None
\ No newline at end of file
+        return None
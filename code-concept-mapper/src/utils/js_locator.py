@@ -0,0 +1,439 @@
+import re
+from bisect import bisect_right
+from typing import List, Optional, Set, Tuple
+
+from src.utils.code_parser import Symbol, qualified_name
+
+JS_EXTENSIONS = (".js", ".jsx", ".mjs", ".cjs", ".ts", ".tsx", ".mts", ".cts")
+
+# One significant token per match: comments and whitespace are skipped. A
+# string may not span lines, so a stray quote (an apostrophe in JSX text)
+# costs one token instead of swallowing the rest of the file.
+_TOKEN = re.compile(r"""
+    (?:\s+|//[^\n]*|/\*(?s:.*?)(?:\*/|\Z))*
+    ( '(?:[^'\\\n]|\\.)*'
+    | "(?:[^"\\\n]|\\.)*"
+    | [A-Za-z_$#\u0080-\uffff][\w$\u0080-\uffff]*
+    | \d[\w.]*
+    | =>|[=!]==?|[-+*/%&|^<>?]{1,3}=
+    | \S
+    )""", re.VERBOSE)
+# A regular expression literal, tried where a `/` cannot be a division.
+_REGEX = re.compile(r"/(?![*/])(?:[^/\\\[\n]|\\.|\[(?:[^\]\\\n]|\\.)*\])+/[A-Za-z]*")
+# The text of a template literal up to its end or its next substitution.
+_TEMPLATE = re.compile(r"(?:[^`\\$]|\\.|\$(?!\{))*(?:`|\$\{|\Z)", re.DOTALL)
+
+_OPENERS = {"(": ")", "[": "]", "{": "}"}
+_CLOSERS = {")": "(", "]": "[", "}": "{"}
+# After these a `/` starts a regular expression, not a division.
+_EXPRESSION_KEYWORDS = {"return", "typeof", "case", "do", "else", "in", "of", "new", "delete", "void",
+                        "throw", "instanceof", "yield", "await"}
+_MEMBER_MODIFIERS = {"static", "async", "get", "set", "public", "private", "protected", "readonly",
+                     "abstract", "override", "declare", "accessor"}
+_STATEMENT_KEYWORDS = {"function", "class", "const", "let", "var"}
+_DECLARATION_MODIFIERS = {"export", "default", "declare", "abstract"}
+_HTTP_METHODS = {"get", "post", "put", "patch", "delete", "del", "options", "head", "all"}
+_ROUTE_METHODS = _HTTP_METHODS | {"use", "route", "param"}
+# Receivers assumed to be Express applications or routers, besides the
+# names a file assigns from express(), express.Router() or Router().
+_ROUTER_NAME = re.compile(r"(?:app|router|server|routes?)$", re.IGNORECASE)
+_ROUTER_FACTORIES = {"express", "Router"}
+
+def is_javascript(file_path: str) -> bool:
+    return file_path.endswith(JS_EXTENSIONS)
+
+def _is_name(token: str) -> bool:
+    return token[:1].isalpha() or token[:1] in ("_", "$", "#")
+
+def _is_value(token: str) -> bool:
+    """Whether a token can end an operand, so a `/` after it is a division."""
+    return token in (")", "]", "}") or token[0] in "'\"`" or token[0].isdigit() or (
+        _is_name(token) and token not in _EXPRESSION_KEYWORDS)
+
+def tokenize(content: str) -> Tuple[List[str], List[int]]:
+    """
+    Splits JavaScript or TypeScript into significant tokens and their offsets.
+
+    Strings, regular expressions and template literals without
+    substitutions are single tokens. A template literal with substitutions
+    is a "`" token followed by the tokens of each substitution.
+    """
+    tokens: List[str] = []
+    offsets: List[int] = []
+    templates: List[int] = []  # open braces when each enclosing template substitution began
+    braces = 0
+    pos, end = 0, len(content)
+    while pos < end:
+        restart = None
+        for match in _TOKEN.finditer(content, pos):
+            token, start = match.group(1), match.start(1)
+            if token == "`" or (token == "}" and templates and braces == templates[-1]):
+                if token == "}":
+                    templates.pop()
+                text = _TEMPLATE.match(content, start + 1)
+                if text.group().endswith("${"):
+                    templates.append(braces)
+                    if token == "`":
+                        tokens.append("`")
+                        offsets.append(start)
+                elif token == "`":
+                    tokens.append(content[start:text.end()])
+                    offsets.append(start)
+                restart = text.end()
+                break
+            if token == "/" and (not tokens or (tokens[-1] != "<" and not _is_value(tokens[-1]))):
+                regex = _REGEX.match(content, start)
+                if regex:
+                    tokens.append(regex.group())
+                    offsets.append(start)
+                    restart = regex.end()
+                    break
+            if token == "{":
+                braces += 1
+            elif token == "}":
+                braces -= 1
+            tokens.append(token)
+            offsets.append(start)
+        if restart is None:
+            break
+        pos = restart
+    return tokens, offsets
+
+def _brackets(tokens: List[str]) -> Tuple[List[int], List[int]]:
+    """
+    The index of the matching bracket of every opening bracket, and the
+    innermost opening bracket around every token (-1 at top level).
+    Unbalanced brackets are tolerated: an unclosed one ends at the last token.
+    """
+    n = len(tokens)
+    match = [-1] * n
+    parent = [-1] * n
+    stack: List[int] = []
+    top = -1
+    for i, token in enumerate(tokens):
+        if token in _OPENERS:
+            parent[i] = top
+            stack.append(i)
+            top = i
+        elif token in _CLOSERS:
+            opener = _CLOSERS[token]
+            if stack and (tokens[top] == opener or any(tokens[j] == opener for j in stack)):
+                while True:
+                    j = stack.pop()
+                    match[j] = i
+                    if tokens[j] == opener:
+                        break
+                top = stack[-1] if stack else -1
+            parent[i] = top
+        else:
+            parent[i] = top
+    for j in stack:
+        match[j] = n - 1
+    return match, parent
+
+class DefinitionLocator:
+    """
+    Finds the definitions of a JavaScript or TypeScript file from its tokens:
+
+    - function declarations, `export`ed, `async` or generators;
+    - functions and arrow functions assigned to a `const`, `let` or `var`,
+      to a member (`exports.handler = ...`, `Foo.prototype.bar = ...`) or to
+      a class property;
+    - classes and their methods, including getters, setters and
+      constructors;
+    - Express route registrations such as `app.get('/users', ...)` and
+      `router.use(...)`, named `router.get /users` after their receiver,
+      method and literal path.
+
+    Qualified names follow the same rules as SymbolCollector: methods are
+    `Class.method` and definitions nested in a function are
+    `outer.<locals>.inner`. A definition spans from its first keyword to
+    its closing brace, or to the closing parenthesis of a route.
+    """
+    def __init__(self, content: str):
+        self.content = content
+        self.tokens, self.offsets = tokenize(content)
+        self.match, self.parent = _brackets(self.tokens)
+        self._line_starts = [0] + [m.end() for m in re.finditer("\n", content)]
+        self.symbols: List[Symbol] = []
+        self._scopes: List[Tuple[int, str, str]] = []  # (last token, qualname, kind)
+        self._class_bodies: Set[int] = set()
+        self._claimed: Set[int] = set()  # `function` and `class` tokens already named by an assignment
+        self._routers: Set[str] = set()
+        self._member_from = 0  # class members are not looked for again before this token
+
+    def line(self, i: int) -> int:
+        return bisect_right(self._line_starts, self.offsets[i])
+
+    def _token(self, i: int) -> str:
+        return self.tokens[i] if 0 <= i < len(self.tokens) else ""
+
+    def locate(self) -> List[Symbol]:
+        tokens, parent, scopes, class_bodies = self.tokens, self.parent, self._scopes, self._class_bodies
+        # Most tokens start nothing: only keywords, names followed by `.` and
+        # tokens directly in a class body are looked at further.
+        for i, (token, following) in enumerate(zip(tokens, tokens[1:] + [""])):
+            while scopes and i > scopes[-1][0]:
+                scopes.pop()
+            if parent[i] in class_bodies and i >= self._member_from and self._starts_member(i):
+                self._member(i)
+            elif token in _STATEMENT_KEYWORDS:
+                if token in ("const", "let", "var"):
+                    self._variable(i)
+                elif i not in self._claimed:
+                    if token == "function":
+                        self._function_declaration(i)
+                    else:
+                        self._class(i, None, self._declaration_start(i))
+            elif following == "." and _is_name(token):
+                if not self._route(i):
+                    self._member_assignment(i)
+        return self.symbols
+
+    # --- definitions
+
+    def _add(self, name: str, kind: str, start: int, end: int, scope: bool = True):
+        parent = (self._scopes[-1][1], self._scopes[-1][2]) if self._scopes else None
+        qualname = qualified_name(parent, name)
+        self.symbols.append(Symbol(name=name, qualname=qualname, kind=kind,
+                                   line_start=self.line(start), line_end=self.line(end)))
+        if scope:
+            self._scopes.append((end, qualname, kind))
+
+    def _declaration_start(self, i: int) -> int:
+        """The first of the `export`, `default`, `declare` or `async` keywords before token i."""
+        while self._token(i - 1) in _DECLARATION_MODIFIERS or self._token(i - 1) == "async":
+            i -= 1
+        return i
+
+    def _function_declaration(self, i: int):
+        if self._token(i - 1) == ".":
+            return
+        j = i + 1 + (self._token(i + 1) == "*")
+        name = self._token(j)
+        if not name or not _is_name(name):
+            return
+        body = self._body(j + 1)
+        if body is not None:
+            start = self._declaration_start(i)
+            kind = "async_function" if "async" in self.tokens[start:i] else "function"
+            self._add(name, kind, start, self.match[body])
+
+    def _class(self, i: int, name: Optional[str], start: int):
+        """A class declaration, or a class expression named by the assignment it is in."""
+        j = i + 1
+        if _is_name(self._token(j)) and self._token(j) not in ("extends", "implements"):
+            name = name or self._token(j)
+        if name is None:
+            return
+        while j < len(self.tokens) and self.tokens[j] not in ("{", ";", "="):
+            j = self.match[j] + 1 if self.tokens[j] in _OPENERS else j + 1
+        if self._token(j) != "{":
+            return
+        self._class_bodies.add(j)
+        self._add(name, "class", start, self.match[j])
+
+    def _variable(self, i: int):
+        """`const name = function ...`, `const name = (...) => ...` or `const name = class ...`."""
+        name = self._token(i + 1)
+        if not name or not _is_name(name):
+            return
+        j = i + 2
+        if self._token(j) == ":":  # a type annotation
+            limit = min(len(self.tokens), j + 64)
+            while j < limit and self.tokens[j] not in ("=", ";", "=>"):
+                j = self.match[j] + 1 if self.tokens[j] in _OPENERS else j + 1
+        if self._token(j) != "=":
+            return
+        if self._router_factory(j + 1):
+            self._routers.add(name)
+        self._value(name, self._declaration_start(i), j + 1)
+
+    def _member_assignment(self, i: int):
+        """`exports.name = ...`, `module.exports.name = ...` or `Foo.prototype.name = ...` at statement start."""
+        tokens = self.tokens
+        parts, j = [tokens[i]], i + 1
+        while j + 1 < len(tokens) and tokens[j] == "." and _is_name(tokens[j + 1]):
+            parts.append(tokens[j + 1])
+            j += 2
+        if self._token(j) != "=" or len(parts) < 2 or parts[0] == "this" or not self._starts_statement(i):
+            return
+        if parts[:2] == ["module", "exports"]:
+            parts = parts[2:]
+        elif parts[0] == "exports":
+            parts = parts[1:]
+        parts = [part for part in parts if part != "prototype"]
+        if not parts:  # module.exports = function name() {...} keeps its own name
+            return
+        self._value(".".join(parts), i, j + 1)
+
+    def _value(self, name: str, start: int, i: int) -> bool:
+        """Records the function, arrow function or class starting at token i as `name`."""
+        is_async = self._token(i) == "async"
+        i += is_async
+        kind = "async_function" if is_async else "function"
+        token = self._token(i)
+        if token == "function":
+            self._claimed.add(i)
+            body = self._body(i + 1)
+            if body is None:
+                return False
+            self._add(name, kind, start, self.match[body])
+            return True
+        if token == "class":
+            self._claimed.add(i)
+            self._class(i, name, start)
+            return True
+        if token == "<":  # type parameters of a generic arrow function
+            limit = min(len(self.tokens), i + 16)
+            while i < limit and self.tokens[i] != "(":
+                i += 1
+        arrow = self._arrow(i)
+        if arrow is None:
+            return False
+        body = arrow + 1
+        end = self.match[body] if self._token(body) == "{" else self._expression_end(body)
+        self._add(name, kind, start, end)
+        return True
+
+    def _arrow(self, i: int) -> Optional[int]:
+        """The `=>` of an arrow function whose parameters start at token i, if it is one."""
+        token = self._token(i)
+        if token and _is_name(token):
+            return i + 1 if self._token(i + 1) == "=>" else None
+        if token != "(":
+            return None
+        j = self.match[i] + 1
+        limit = min(len(self.tokens), j + 32)  # a return type annotation may sit between
+        while j < limit and self.tokens[j] not in (";", "{", "=", ","):
+            if self.tokens[j] == "=>":
+                return j
+            j = self.match[j] + 1 if self.tokens[j] in _OPENERS else j + 1
+        return None
+
+    def _body(self, i: int) -> Optional[int]:
+        """
+        The opening brace of the body of a function whose name or `*` ends
+        before token i: after its type parameters, parameters and return
+        type. None for an overload or abstract signature, which has none.
+        """
+        if self._token(i) == "<":  # type parameters
+            limit = min(len(self.tokens), i + 32)
+            while i < limit and self.tokens[i] != "(":
+                i += 1
+        if self._token(i) != "(":
+            return None
+        close = self.match[i]
+        line = self.line(close)
+        j = close + 1
+        while j < len(self.tokens):
+            token = self.tokens[j]
+            if token == "{":
+                return j
+            if token in (";", "}", "=", "=>", ",") or self.line(j) > line:
+                return None
+            j = self.match[j] + 1 if token in _OPENERS else j + 1
+        return None
+
+    def _expression_end(self, i: int) -> int:
+        """The last token of the expression body of an arrow function starting at token i."""
+        parent = self.parent[i]
+        last = i
+        j = i
+        while j < len(self.tokens):
+            token = self.tokens[j]
+            if self.parent[j] != parent or token in (";", ","):
+                break
+            if j > i and self.line(j) > self.line(last) and _is_value(self.tokens[last]) and (
+                    _is_name(token) or token[0] in "'\"`" or token[0].isdigit() or token in ("{", "!", "~")):
+                break  # a new statement on the next line
+            last = self.match[j] if token in _OPENERS else j
+            j = last + 1
+        return last
+
+    def _starts_member(self, i: int) -> bool:
+        previous = self._token(i - 1)
+        return i - 1 == self.parent[i] or previous in ("}", ";") or (
+            self.line(i) > self.line(i - 1) and _is_value(previous))
+
+    def _member(self, i: int):
+        """A method, or a function assigned to a class property, starting at token i."""
+        j = i
+        while self._token(j) == "@":  # decorators are not part of the span, as in Python
+            j += 2
+            while self._token(j) == "." and _is_name(self._token(j + 1)):
+                j += 2
+            if self._token(j) == "(":
+                j = self.match[j] + 1
+        start = j
+        is_async = False
+        while self._token(j) in _MEMBER_MODIFIERS and self._token(j + 1) not in ("(", "=", ";", ":", "?", "!", "<", "}"):
+            is_async = is_async or self.tokens[j] == "async"
+            j += 1
+        j += self._token(j) == "*"
+        name = self._token(j)
+        self._member_from = j + 1
+        if not name or not (_is_name(name) or name[0] in "'\"" or name[0].isdigit()):
+            return
+        name = name.strip("'\"")
+        j += 1
+        j += self._token(j) in ("?", "!")
+        if self._token(j) in ("(", "<"):
+            body = self._body(j)
+            if body is not None:
+                self._add(name, "async_function" if is_async else "function", start, self.match[body])
+            return
+        if self._token(j) == ":":
+            limit = min(len(self.tokens), j + 64)
+            while j < limit and self.tokens[j] not in ("=", ";", "}"):
+                j = self.match[j] + 1 if self.tokens[j] in _OPENERS else j + 1
+        if self._token(j) == "=":
+            self._value(name, start, j + 1)
+
+    # --- routes
+
+    def _route(self, i: int) -> bool:
+        """`app.get('/path', ...)`, `router.use(...)` and the like, with i at the receiver."""
+        tokens = self.tokens
+        if i + 3 >= len(tokens) or tokens[i + 2] not in _ROUTE_METHODS or tokens[i + 3] != "(":
+            return False
+        receiver, method = tokens[i], tokens[i + 2]
+        if receiver not in self._routers and not _ROUTER_NAME.search(receiver):
+            return False
+        paren = i + 3
+        close = self.match[paren]
+        first = self._token(paren + 1)
+        if method in _HTTP_METHODS and not any(tokens[j] == "," and self.parent[j] == paren
+                                               for j in range(paren + 1, close)):
+            return False  # app.get('setting') reads a setting; a route also takes a handler
+        start = i
+        while self._token(start - 1) == "." and _is_name(self._token(start - 2)):
+            start -= 2
+        name = f"{receiver}.{method}"
+        if first and first[0] in "'\"`" and len(first) > 1 and first[-1] == first[0]:
+            name += " " + first[1:-1]
+        self._add(name, "route", start, close, scope=False)
+        return True
+
+    def _router_factory(self, i: int) -> bool:
+        """Whether the value at token i creates an application or router: `express()`, `express.Router()`."""
+        i += self._token(i) == "new"
+        last = None
+        while _is_name(self._token(i)):
+            last = self.tokens[i]
+            if self._token(i + 1) == "(" and self._token(i + 2) != ")" and last == "require":
+                i = self.match[i + 1] + 1  # require('express').Router()
+            else:
+                i += 1
+            if self._token(i) != ".":
+                break
+            i += 1
+        return last in _ROUTER_FACTORIES and self._token(i) == "("
+
+    def _starts_statement(self, i: int) -> bool:
+        previous = self._token(i - 1)
+        return i == 0 or previous in (";", "{", "}") or (self.line(i) > self.line(i - 1) and _is_value(previous))
+
+def locate(content: str) -> List[Symbol]:
+    """Every definition and route registration of a JavaScript or TypeScript source, in source order."""
+    return DefinitionLocator(content).locate()
@@ -0,0 +1,184 @@
+import json
+import sqlite3
+import sys
+from contextlib import closing
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from src.domain.models import ConceptMap, Metadata, Concept, Implementation
+from src.utils.state_manager import StateManager
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS metadata (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS concepts (
+    key TEXT PRIMARY KEY,
+    display_name TEXT NOT NULL,
+    definition TEXT NOT NULL,
+    keywords TEXT NOT NULL,
+    languages TEXT NOT NULL,
+    category TEXT
+);
+CREATE TABLE IF NOT EXISTS implementations (
+    id INTEGER PRIMARY KEY,
+    concept_key TEXT NOT NULL REFERENCES concepts(key),
+    file_path TEXT NOT NULL,
+    identifier TEXT,
+    line_start INTEGER NOT NULL,
+    line_end INTEGER,
+    code_snippet TEXT NOT NULL,
+    confidence TEXT NOT NULL,
+    pattern_type TEXT NOT NULL,
+    evidence TEXT NOT NULL,
+    added_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_implementations_concept ON implementations(concept_key, file_path, line_start);
+CREATE INDEX IF NOT EXISTS idx_implementations_file ON implementations(file_path);
+CREATE INDEX IF NOT EXISTS idx_implementations_confidence ON implementations(confidence);
+"""
+
+IMPLEMENTATION_COLUMNS = ("concept_key",) + Implementation.FIELDS
+_INSERT_IMPLEMENTATION = (
+    f"INSERT INTO implementations ({', '.join(IMPLEMENTATION_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in IMPLEMENTATION_COLUMNS)})"
+)
+_INSERT_CONCEPT = (
+    "INSERT OR REPLACE INTO concepts (key, display_name, definition, keywords, languages, category) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+
+RESTORE_UNSUPPORTED = ("❌ Restore points are only kept for the JSON backend. "
+                       "Export a copy with 'export' instead.")
+
+class SQLiteStateManager(StateManager):
+    """
+    Persists a ConceptMap in a local SQLite database.
+
+    Honours the same load_state/save_state/initialize_state contract as the
+    JSON StateManager. A save whose differences are all in the ConceptMap's
+    change log (e.g. one `add`) only inserts the new rows; anything else
+    rewrites the tables inside one transaction. Implementations are indexed
+    by concept key, file path and confidence, so `query_implementations`
+    can answer lookups without loading the whole map.
+    """
+    def __init__(self, state_file_path: str):
+        super().__init__(state_file_path, keep_backups=False)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.state_file)
+        conn.execute("PRAGMA synchronous = FULL")
+        conn.executescript(SCHEMA)
+        return conn
+
+    @staticmethod
+    def _concept_row(key: str, concept: Concept) -> tuple:
+        return (key, concept.display_name, concept.definition, json.dumps(concept.keywords),
+                json.dumps(concept.languages), concept.category)
+
+    @staticmethod
+    def _implementation_row(key: str, impl: Implementation) -> tuple:
+        return (key,) + tuple(getattr(impl, name) for name in Implementation.FIELDS)
+
+    def _insert_concept(self, conn: sqlite3.Connection, key: str, concept: Concept):
+        conn.execute(_INSERT_CONCEPT, self._concept_row(key, concept))
+        conn.executemany(_INSERT_IMPLEMENTATION,
+                         (self._implementation_row(key, impl) for impl in concept.implementations))
+
+    def _write_metadata(self, conn: sqlite3.Connection, metadata: Metadata):
+        conn.executemany("INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)",
+                         ((name, json.dumps(value)) for name, value in metadata.__dict__.items()))
+
+    def load_state(self) -> Optional[ConceptMap]:
+        if not self.state_file.exists():
+            return None
+        try:
+            with closing(self._connect()) as conn:
+                metadata_rows = conn.execute("SELECT key, value FROM metadata").fetchall()
+                if not metadata_rows:
+                    return None
+                metadata = Metadata(**{key: json.loads(value) for key, value in metadata_rows})
+                concepts = {}
+                for key, display_name, definition, keywords, languages, category in conn.execute(
+                        "SELECT key, display_name, definition, keywords, languages, category "
+                        "FROM concepts ORDER BY rowid"):
+                    concepts[key] = Concept(display_name=display_name, definition=definition,
+                                            keywords=json.loads(keywords), languages=json.loads(languages),
+                                            category=category)
+                for row in conn.execute(f"SELECT {', '.join(IMPLEMENTATION_COLUMNS)} FROM implementations ORDER BY id"):
+                    concepts[row[0]].implementations.append(Implementation(*row[1:]))
+            state = ConceptMap(metadata=metadata, concepts=concepts)
+            self._track(state)
+            return state
+        except Exception as e:
+            print(f"❌ Failed to load state: {e}", file=sys.stderr)
+            sys.exit(1)
+
+    def save_state(self, state: ConceptMap) -> bool:
+        incremental = self._is_incremental(state)
+        state.metadata.last_updated = datetime.now().isoformat()
+        try:
+            with closing(self._connect()) as conn, conn:
+                if incremental:
+                    for kind, key, payload in state.pending_changes:
+                        if kind == "concept":
+                            self._insert_concept(conn, key, payload)
+                        else:
+                            conn.execute(_INSERT_IMPLEMENTATION, self._implementation_row(key, payload))
+                else:
+                    conn.execute("DELETE FROM implementations")
+                    conn.execute("DELETE FROM concepts")
+                    conn.execute("DELETE FROM metadata")
+                    for key, concept in state.concepts.items():
+                        self._insert_concept(conn, key, concept)
+                self._write_metadata(conn, state.metadata)
+        except Exception as e:
+            print(f"❌ Save failed: {e}", file=sys.stderr)
+            return False
+        state.clear_changes()
+        self._track(state)
+        return True
+
+    def compact(self) -> bool:
+        """Reclaims free pages in the database file."""
+        if not self.state_file.exists():
+            return False
+        with closing(self._connect()) as conn:
+            conn.execute("VACUUM")
+        return True
+
+    def list_backups(self) -> Optional[List[dict]]:
+        """Refuses: the backup store next to the database belongs to the JSON state file."""
+        print(RESTORE_UNSUPPORTED, file=sys.stderr)
+        return None
+
+    def restore_backup(self, point_id: int) -> bool:
+        """Refuses, like list_backups: restoring would overwrite the JSON state file."""
+        print(RESTORE_UNSUPPORTED, file=sys.stderr)
+        return False
+
+    def query_implementations(self, concept_key: Optional[str] = None, file_path: Optional[str] = None,
+                              confidence: Optional[str] = None) -> List[Tuple[str, Implementation]]:
+        """Returns (concept key, implementation) pairs matching every given filter, using the indexes."""
+        clauses, params = [], []
+        for column, value in (("concept_key", concept_key), ("file_path", file_path), ("confidence", confidence)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        if not self.state_file.exists():
+            return []
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                f"SELECT {', '.join(IMPLEMENTATION_COLUMNS)} FROM implementations{where} ORDER BY id", params
+            ).fetchall()
+        return [(row[0], Implementation(*row[1:])) for row in rows]
+
+def copy_state(source: StateManager, target: StateManager) -> bool:
+    """Copies a concept map between backends, e.g. JSON to SQLite and back."""
+    state = source.load_state()
+    if state is None:
+        print(f"❌ No state found at {source.state_file}.", file=sys.stderr)
+        return False
+    return target.save_state(state)
@@ -1,48 +1,103 @@
+import gzip
+import io
 import json
 import os
-import shutil
 import sys
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional
 
 from src.domain.models import ConceptMap, Metadata, Concept, Implementation
+from src.utils.backup_store import BackupStore
+from src.utils.serializers import GZIP_LEVEL, get_serializer, loads, read_document
+
+STORAGE_MODES = ("snapshot", "journal")
+DEFAULT_JOURNAL_THRESHOLD = 1024 * 1024  # bytes of journal before it is folded into the snapshot
 
 class StateManager:
-    def __init__(self, state_file_path: str):
+    """
+    Persists a ConceptMap as a JSON snapshot.
+
+    In "journal" storage mode, a save appends the pending mutations of the
+    ConceptMap as one line of a write-ahead journal next to the snapshot
+    instead of rewriting it. `load_state` replays the journal on top of the
+    snapshot in either mode, and the journal is folded into a new snapshot
+    once it grows past `journal_threshold` bytes.
+
+    Snapshots are written by the named serializer ("pretty", "compact" or
+    "fast"), gzip-compressed if `compress` is set. Loading detects both, so
+    the format can change from one save to the next.
+    """
+    def __init__(self, state_file_path: str, storage_mode: str = "snapshot",
+                 journal_threshold: int = DEFAULT_JOURNAL_THRESHOLD, keep_backups: bool = True,
+                 serializer: str = "pretty", compress: bool = False):
+        if storage_mode not in STORAGE_MODES:
+            raise ValueError(f"Unknown storage mode '{storage_mode}'. Expected one of {STORAGE_MODES}.")
         self.state_file = Path(state_file_path)
-        self.backup_dir = self.state_file.parent / ".mapper_backups"
+        # One store per state file, so maps sharing a directory never see each other's versions.
+        self.backup_dir = self.state_file.parent / ".mapper_backups" / self.state_file.stem
+        self.backups = BackupStore(self.backup_dir)
         self.temp_file = self.state_file.parent / f"{self.state_file.name}.tmp"
+        self.journal_file = self.state_file.parent / f"{self.state_file.name}.journal"
+        self.storage_mode = storage_mode
+        self.journal_threshold = journal_threshold
+        self.keep_backups = keep_backups
+        self.serializer = get_serializer(serializer)
+        self.compress = compress
+        # Bookkeeping about the last state loaded or saved, used to decide
+        # whether a save can be journaled or must rewrite the snapshot.
+        self._tracked_state: Optional[ConceptMap] = None
+        self._tracked_counts: Dict[str, int] = {}
+        self._snapshot_id: Optional[str] = None
+        self._stale_journal = False
 
-    def _ensure_backup_dir(self):
-        self.backup_dir.mkdir(exist_ok=True)
+    def _record_backup(self, label: str, data: Optional[bytes] = None, compressed: Optional[bytes] = None):
+        """
+        Adds a version to the backup store: `data` if given, the current
+        state file otherwise. Failures only warn.
+        """
+        if not self.keep_backups:
+            return
+        try:
+            if data is None:
+                data = self.state_file.read_bytes()
+            self.backups.add(data, label=label, compressed=compressed)
+        except Exception as e:
+            print(f"⚠️  Backup failed: {e}", file=sys.stderr)
 
-    def _create_backup(self):
-        if self.state_file.exists():
-            self._ensure_backup_dir()
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_path = self.backup_dir / f"{self.state_file.stem}_{timestamp}.json"
-            shutil.copy2(self.state_file, backup_path)
-            
-            backups = sorted(self.backup_dir.glob(f"{self.state_file.stem}_*.json"), key=os.path.getmtime)
-            for old_backup in backups[:-5]:
-                os.remove(old_backup)
+    def _serialize_concept(self, concept: Concept) -> dict:
+        return {
+            "display_name": concept.display_name,
+            "definition": concept.definition,
+            # --- NEW SERIALIZATION LOGIC ---
+            "keywords": concept.keywords,
+            "languages": concept.languages,
+            "category": concept.category,
+            # --- END ---
+            "implementations": [impl.to_dict() for impl in concept.implementations],
+        }
+
+    def _deserialize_concept(self, concept_data: dict) -> Concept:
+        return Concept(
+            display_name=concept_data["display_name"],
+            definition=concept_data.get("definition", ""),
+            # --- NEW DESERIALIZATION LOGIC (with .get for safety) ---
+            keywords=concept_data.get("keywords", []),
+            languages=concept_data.get("languages", []),
+            category=concept_data.get("category", None),
+            # --- END ---
+            implementations=[
+                Implementation(**impl_data)
+                for impl_data in concept_data.get("implementations", [])
+            ],
+        )
 
     def _serialize(self, concept_map: ConceptMap) -> dict:
         """Converts the ConceptMap object to a JSON-serializable dictionary."""
         return {
             "metadata": concept_map.metadata.__dict__,
             "concepts": {
-                key: {
-                    "display_name": concept.display_name,
-                    "definition": concept.definition,
-                    # --- NEW SERIALIZATION LOGIC ---
-                    "keywords": concept.keywords,
-                    "languages": concept.languages,
-                    "category": concept.category,
-                    # --- END ---
-                    "implementations": [impl.__dict__ for impl in concept.implementations],
-                }
+                key: self._serialize_concept(concept)
                 for key, concept in concept_map.concepts.items()
             },
         }
@@ -51,32 +106,77 @@ class StateManager:
         """Converts a dictionary from JSON into a ConceptMap object."""
         metadata = Metadata(**data["metadata"])
         concepts = {
-            key: Concept(
-                display_name=concept_data["display_name"],
-                definition=concept_data.get("definition", ""),
-                # --- NEW DESERIALIZATION LOGIC (with .get for safety) ---
-                keywords=concept_data.get("keywords", []),
-                languages=concept_data.get("languages", []),
-                category=concept_data.get("category", None),
-                # --- END ---
-                implementations=[
-                    Implementation(**impl_data)
-                    for impl_data in concept_data.get("implementations", [])
-                ],
-            )
+            key: self._deserialize_concept(concept_data)
             for key, concept_data in data["concepts"].items()
         }
         return ConceptMap(metadata=metadata, concepts=concepts)
 
+    def _read_journal(self) -> List[dict]:
+        """
+        Returns the committed journal entries that extend the current snapshot.
+
+        The first line names the snapshot it was started against; a journal
+        left over from an interrupted compaction therefore does not match
+        and is ignored. A torn final line from an interrupted append is
+        dropped, since every entry is written as a single line.
+        """
+        if not self.journal_file.exists():
+            return []
+        with open(self.journal_file, "r", encoding="utf-8") as f:
+            lines = f.read().split("\n")
+        entries = []
+        for line in lines[:-1]:  # the text after the last newline is never committed
+            try:
+                entries.append(loads(line))
+            except json.JSONDecodeError:
+                break
+        if not entries or entries[0].get("snapshot") != self._snapshot_id:
+            self._stale_journal = True
+            return []
+        return entries[1:]
+
+    def _replay(self, state: ConceptMap, entries: List[dict]):
+        for entry in entries:
+            for kind, key, payload in entry["changes"]:
+                if kind == "concept":
+                    state.add_concept(key, self._deserialize_concept(payload))
+                else:
+                    state.add_implementation(key, Implementation(**payload))
+            state.metadata.last_updated = entry["last_updated"]
+        state.clear_changes()
+
+    def _track(self, state: ConceptMap):
+        self._tracked_state = state
+        self._tracked_counts = {key: len(c.implementations) for key, c in state.concepts.items()}
+
+    def _is_incremental(self, state: ConceptMap) -> bool:
+        """True if every difference since the last load/save is in the change log."""
+        if state is not self._tracked_state or state.is_modified or not self.state_file.exists():
+            return False
+        expected = dict(self._tracked_counts)
+        for kind, key, payload in state.pending_changes:
+            if kind == "concept":
+                expected[key] = len(payload.implementations)
+            elif key in expected:
+                expected[key] += 1
+        if expected.keys() != state.concepts.keys():
+            return False
+        return all(len(c.implementations) == expected[key] for key, c in state.concepts.items())
+
     def load_state(self) -> Optional[ConceptMap]:
         if not self.state_file.exists():
             return None
         try:
-            with open(self.state_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            with open(self.state_file, "rb") as f:
+                data = read_document(f)
             if "metadata" not in data or "concepts" not in data:
                 raise ValueError("Invalid schema: missing metadata or concepts")
-            return self._deserialize(data)
+            state = self._deserialize(data)
+            self._snapshot_id = state.metadata.last_updated
+            self._stale_journal = False
+            self._replay(state, self._read_journal())
+            self._track(state)
+            return state
         except json.JSONDecodeError as e:
             print(f"❌ CORRUPTION DETECTED: Invalid JSON at line {e.lineno}", file=sys.stderr)
             print(f"   Error: {e.msg}", file=sys.stderr)
@@ -86,21 +186,138 @@ class StateManager:
             sys.exit(1)
 
     def save_state(self, state: ConceptMap) -> bool:
-        self._create_backup()
+        if self.storage_mode == "journal" and self._is_incremental(state):
+            if self._append_journal(state):
+                if self.journal_file.stat().st_size > self.journal_threshold:
+                    return self._write_snapshot(state)
+                return True
+            return False
+        return self._write_snapshot(state)
+
+    def compact(self) -> bool:
+        """Folds the journal into a fresh snapshot."""
+        state = self.load_state()
+        if state is None:
+            return False
+        return self._write_snapshot(state)
+
+    def _drop_torn_tail(self):
+        """
+        Truncates the journal after its last newline. A torn line left by an
+        interrupted append would otherwise join the next entry, and the
+        reader stops at the first line that does not parse.
+        """
+        if not self.journal_file.exists():
+            return
+        with open(self.journal_file, "r+b") as f:
+            size = end = f.seek(0, os.SEEK_END)
+            while end > 0:  # scan back block by block; usually the last byte is the newline
+                start = max(0, end - 4096)
+                f.seek(start)
+                newline = f.read(end - start).rfind(b"\n")
+                if newline >= 0:
+                    end = start + newline + 1
+                    break
+                end = start
+            if end < size:
+                f.truncate(end)
+                f.flush()
+                os.fsync(f.fileno())
+        if end == 0:  # not even the header survived
+            os.remove(self.journal_file)
+
+    def _append_journal(self, state: ConceptMap) -> bool:
+        last_updated = datetime.now().isoformat()
+        changes = [
+            [kind, key, self._serialize_concept(payload) if kind == "concept" else payload.to_dict()]
+            for kind, key, payload in state.pending_changes
+        ]
+        lines = []
+        try:
+            if self._stale_journal and self.journal_file.exists():
+                os.remove(self.journal_file)
+                self._stale_journal = False
+            self._drop_torn_tail()
+        except Exception as e:
+            print(f"❌ Journal append failed: {e}", file=sys.stderr)
+            return False
+        if not self.journal_file.exists():
+            lines.append(json.dumps({"snapshot": self._snapshot_id}))
+        lines.append(json.dumps({"last_updated": last_updated, "changes": changes}, ensure_ascii=False))
+        try:
+            with open(self.journal_file, "a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+        except Exception as e:
+            print(f"❌ Journal append failed: {e}", file=sys.stderr)
+            return False
+        state.metadata.last_updated = last_updated
+        state.clear_changes()
+        self._track(state)
+        return True
+
+    def _write_snapshot(self, state: ConceptMap) -> bool:
+        if self.state_file.exists() and not self.backups.list_points():
+            self._record_backup("existing")
         state.metadata.last_updated = datetime.now().isoformat()
         try:
-            serializable_state = self._serialize(state)
-            with open(self.temp_file, "w", encoding="utf-8") as f:
-                json.dump(serializable_state, f, indent=2, ensure_ascii=False)
+            # Serialized in memory once: the same bytes (and, compressed, the
+            # same gzip stream) go to the state file and the backup store.
+            buffer = io.BytesIO()
+            self.serializer.dump(self._serialize(state), buffer)
+            data = buffer.getvalue()
+            compressed = gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0) if self.compress else None
+            with open(self.temp_file, "wb") as f:
+                f.write(compressed if self.compress else data)
                 f.flush()
                 os.fsync(f.fileno())
             os.replace(self.temp_file, self.state_file)
-            return True
+            self._record_backup("save", data, compressed)
         except Exception as e:
             print(f"❌ Save failed: {e}", file=sys.stderr)
             if self.temp_file.exists():
                 os.remove(self.temp_file)
             return False
+        # The new snapshot already contains every journaled change. Should we
+        # crash before the journal is removed, its header no longer matches
+        # the snapshot and it is ignored on the next load.
+        self._snapshot_id = state.metadata.last_updated
+        if self.journal_file.exists():
+            os.remove(self.journal_file)
+        state.clear_changes()
+        self._track(state)
+        return True
+
+    def list_backups(self) -> Optional[List[dict]]:
+        """The restore points of the state file, oldest first."""
+        return self.backups.list_points()
+
+    def restore_backup(self, point_id: int) -> bool:
+        """Replaces the state file with a restore point from the backup store."""
+        data = self.backups.get(point_id)
+        if data is None:
+            print(f"❌ Backup #{point_id} not found. Use 'restore --list' to see restore points.", file=sys.stderr)
+            return False
+        # Fold any journaled changes into a snapshot first so they are backed up too.
+        if self.journal_file.exists() and not self.compact():
+            return False
+        try:
+            with open(self.temp_file, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(self.temp_file, self.state_file)
+        except Exception as e:
+            print(f"❌ Restore failed: {e}", file=sys.stderr)
+            if self.temp_file.exists():
+                os.remove(self.temp_file)
+            return False
+        if self.journal_file.exists():
+            os.remove(self.journal_file)
+        self._tracked_state = None
+        self._record_backup(f"restore of #{point_id}")
+        return True
 
     def initialize_state(self, project_name: str) -> ConceptMap:
         """Creates a new, empty ConceptMap."""
@@ -0,0 +1,324 @@
+import ast
+import hashlib
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from src.utils.code_parser import Symbol, SymbolCollector, SymbolTable, module_name
+from src.utils.js_locator import JS_EXTENSIONS, is_javascript, locate
+
+INDEXED_EXTENSIONS = (".py",)
+# The symbol index also covers JavaScript and TypeScript, found by the token-based locator.
+SYMBOL_EXTENSIONS = INDEXED_EXTENSIONS + JS_EXTENSIONS
+SKIPPED_DIRS = {"__pycache__", "node_modules", "site-packages"}
+WRITE_BATCH = 500  # files per transaction
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    content_hash TEXT NOT NULL,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS symbols (
+    file_path TEXT NOT NULL REFERENCES files(path),
+    name TEXT NOT NULL,
+    qualname TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    line_start INTEGER NOT NULL,
+    line_end INTEGER,
+    content_hash TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_symbols_file ON symbols(file_path);
+CREATE INDEX IF NOT EXISTS idx_symbols_name ON symbols(name);
+CREATE INDEX IF NOT EXISTS idx_symbols_qualname ON symbols(qualname);
+"""
+
+# (name, qualname, kind, line_start, line_end, content_hash)
+SymbolRow = Tuple[str, str, str, int, Optional[int], str]
+
+@dataclass
+class FileResult:
+    """What a worker extracted from one file."""
+    path: str
+    size: int
+    mtime_ns: int
+    content_hash: str
+    symbols: List[SymbolRow]
+    error: Optional[str] = None
+    reparsed: bool = True  # False if the content matched the known hash and parsing was skipped
+
+def index_file(root: str, rel_path: str, known_hash: Optional[str] = None) -> FileResult:
+    """
+    Parses one file and hashes it and each of its definitions.
+
+    Runs in a worker process, so it only touches the file system. The file
+    is stat'ed before it is read: should it change in between, the stored
+    mtime is already stale and the next incremental run picks it up. If
+    the content still hashes to `known_hash` (the file was only touched),
+    it is not parsed again.
+    """
+    full_path = os.path.join(root, rel_path)
+    st = os.stat(full_path)
+    with open(full_path, "rb") as f:
+        data = f.read()
+    digest = hashlib.sha256(data).hexdigest()
+    result = FileResult(rel_path, st.st_size, st.st_mtime_ns, digest, [])
+    if digest == known_hash:
+        result.reparsed = False
+        return result
+    try:
+        if is_javascript(rel_path):
+            symbols = locate(data.decode("utf-8"))
+        else:
+            collector = SymbolCollector()
+            collector.visit(ast.parse(data, filename=full_path))
+            symbols = collector.symbols
+    except (SyntaxError, ValueError, RecursionError) as e:
+        result.error = f"{type(e).__name__}: {e}"
+        return result
+    lines = data.splitlines(keepends=True)
+    for s in symbols:
+        body = b"".join(lines[s.line_start - 1:s.line_end if s.line_end is not None else s.line_start])
+        result.symbols.append((s.name, s.qualname, s.kind, s.line_start, s.line_end,
+                               hashlib.sha256(body).hexdigest()))
+    return result
+
+def _index_chunk(root: str, items: List[Tuple[str, Optional[str]]]) -> List[FileResult]:
+    results = []
+    for rel_path, known_hash in items:
+        try:
+            results.append(index_file(root, rel_path, known_hash))
+        except OSError as e:  # vanished or unreadable since the walk
+            results.append(FileResult(rel_path, -1, -1, "", [], f"{type(e).__name__}: {e}"))
+    return results
+
+def scan_source_files(root: str, extensions: Tuple[str, ...] = INDEXED_EXTENSIONS,
+                      _rel_dir: str = "") -> Iterator[Tuple[str, os.DirEntry]]:
+    """
+    Yields (path relative to `root`, directory entry) for every source file
+    to index, in sorted order. Hidden directories, symlinked directories
+    and SKIPPED_DIRS are not descended into.
+    """
+    with os.scandir(os.path.join(root, _rel_dir)) as it:
+        entries = sorted(it, key=lambda entry: entry.name)
+    for entry in entries:
+        rel_path = os.path.join(_rel_dir, entry.name)
+        if entry.is_dir():
+            if not entry.name.startswith(".") and entry.name not in SKIPPED_DIRS and not entry.is_symlink():
+                yield from scan_source_files(root, extensions, rel_path)
+        elif entry.name.endswith(extensions) and entry.is_file():
+            yield rel_path, entry
+
+def walk_source_files(root: str, extensions: Tuple[str, ...] = INDEXED_EXTENSIONS) -> Iterator[str]:
+    """Yields the paths, relative to `root`, of the source files to index."""
+    for rel_path, _ in scan_source_files(root, extensions):
+        yield rel_path
+
+class SymbolIndex:
+    """
+    A persistent index of the classes and functions of a source tree.
+
+    Stored in SQLite with one row per file (size, mtime, content hash) and
+    one row per definition (qualified name, line span, content hash), with
+    the definitions indexed by file, name and qualified name. Paths are
+    stored relative to the indexed root.
+    """
+    def __init__(self, index_path: str):
+        self.index_path = index_path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._root: Optional[str] = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.index_path)
+            self._conn.executescript(SCHEMA)
+        return self._conn
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    @property
+    def root(self) -> Optional[str]:
+        if self._root is None:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = 'root'").fetchone()
+            self._root = row[0] if row else None
+        return self._root
+
+    def set_root(self, root: str):
+        self._root = os.path.abspath(root)
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('root', ?)", (self._root,))
+
+    def clear(self):
+        with self.conn:
+            self.conn.execute("DELETE FROM symbols")
+            self.conn.execute("DELETE FROM files")
+
+    def manifest(self) -> Dict[str, Tuple[int, int, str]]:
+        """Maps every indexed path to its (size, mtime_ns, content hash)."""
+        return {path: (size, mtime_ns, content_hash) for path, size, mtime_ns, content_hash
+                in self.conn.execute("SELECT path, size, mtime_ns, content_hash FROM files")}
+
+    def remove(self, paths: List[str]):
+        """Evicts files and their symbols from the index."""
+        with self.conn:
+            self.conn.executemany("DELETE FROM symbols WHERE file_path = ?", ((p,) for p in paths))
+            self.conn.executemany("DELETE FROM files WHERE path = ?", ((p,) for p in paths))
+
+    def write(self, results: List[FileResult]):
+        """Stores file results, replacing anything previously indexed for those files."""
+        with self.conn:
+            for result in results:
+                if not result.reparsed:
+                    self.conn.execute("UPDATE files SET size = ?, mtime_ns = ? WHERE path = ?",
+                                      (result.size, result.mtime_ns, result.path))
+                    continue
+                self.conn.execute("DELETE FROM symbols WHERE file_path = ?", (result.path,))
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO files (path, size, mtime_ns, content_hash, error) VALUES (?, ?, ?, ?, ?)",
+                    (result.path, result.size, result.mtime_ns, result.content_hash, result.error))
+                self.conn.executemany(
+                    "INSERT INTO symbols (file_path, name, qualname, kind, line_start, line_end, content_hash) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    ((result.path,) + row for row in result.symbols))
+
+    def file_count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def symbol_count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM symbols").fetchone()[0]
+
+    def _relative(self, file_path: str) -> Optional[str]:
+        root = self.root
+        if root is None:
+            return None
+        rel_path = os.path.relpath(os.path.abspath(file_path), root)
+        return None if rel_path.startswith(os.pardir) else rel_path
+
+    def table_for(self, file_path: str) -> Optional[SymbolTable]:
+        """
+        Returns the indexed symbol table of a file, or None if the file is
+        not indexed, failed to parse, or changed since it was indexed.
+        """
+        rel_path = self._relative(file_path)
+        if rel_path is None:
+            return None
+        row = self.conn.execute("SELECT size, mtime_ns, error FROM files WHERE path = ?", (rel_path,)).fetchone()
+        if row is None or row[2] is not None:
+            return None
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return None
+        if (st.st_size, st.st_mtime_ns) != (row[0], row[1]):
+            return None
+        rows = self.conn.execute(
+            "SELECT name, qualname, kind, line_start, line_end FROM symbols WHERE file_path = ? ORDER BY rowid",
+            (rel_path,))
+        return SymbolTable([Symbol(*r) for r in rows], module_name(file_path))
+
+    def lookup(self, identifier: str) -> List[Tuple[str, Symbol]]:
+        """Returns (file path, symbol) for every definition whose name or qualified name is `identifier`."""
+        rows = self.conn.execute(
+            "SELECT file_path, name, qualname, kind, line_start, line_end FROM symbols "
+            "WHERE qualname = ? OR name = ? ORDER BY file_path, line_start",
+            (identifier, identifier))
+        return [(r[0], Symbol(*r[1:])) for r in rows]
+
+class RepositoryIndexer:
+    """
+    Builds a SymbolIndex for a source tree, parsing files across a process pool.
+
+    `build` indexes everything from scratch. `update` uses the files table
+    as a manifest: files whose size and mtime are unchanged are skipped
+    without being read, files whose content hash is unchanged are not
+    parsed, and files no longer in the tree are evicted with their symbols.
+    """
+    def __init__(self, root: str, index: SymbolIndex, workers: Optional[int] = None,
+                 chunk_size: int = 64):
+        self.root = os.path.abspath(root)
+        self.index = index
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+
+    def _parse(self, items: List[Tuple[str, Optional[str]]]) -> Iterator[FileResult]:
+        chunks = [items[i:i + self.chunk_size] for i in range(0, len(items), self.chunk_size)]
+        if self.workers == 1 or len(chunks) <= 1:
+            for chunk in chunks:
+                yield from _index_chunk(self.root, chunk)
+            return
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            for results in pool.map(_index_chunk, [self.root] * len(chunks), chunks):
+                yield from results
+
+    def _store(self, results: Iterator[FileResult]) -> int:
+        """Writes results in batches and returns how many files were parsed."""
+        parsed, batch = 0, []
+        for result in results:
+            batch.append(result)
+            parsed += result.reparsed
+            if len(batch) >= WRITE_BATCH:
+                self.index.write(batch)
+                batch = []
+        self.index.write(batch)
+        return parsed
+
+    def _stats(self, start: float, **counts) -> dict:
+        elapsed = time.perf_counter() - start
+        files = self.index.file_count()
+        return dict(counts, files=files, symbols=self.index.symbol_count(), seconds=elapsed,
+                    files_per_second=files / elapsed if elapsed else 0.0)
+
+    def build(self) -> dict:
+        """Indexes every source file under the root from scratch. Returns run statistics."""
+        start = time.perf_counter()
+        items = [(rel_path, None) for rel_path in walk_source_files(self.root, SYMBOL_EXTENSIONS)]
+        self.index.clear()
+        self.index.set_root(self.root)
+        parsed = self._store(self._parse(items))
+        return self._stats(start, added=parsed, changed=0, touched=0, removed=0, unchanged=0)
+
+    def update(self) -> dict:
+        """
+        Re-indexes only the files added, changed or removed since the last
+        run. Falls back to `build` if the index was built for another root.
+        """
+        if self.index.root != self.root:
+            return self.build()
+        start = time.perf_counter()
+        manifest = self.index.manifest()
+        pending, seen, unchanged, added = [], set(), 0, 0
+        for rel_path, entry in scan_source_files(self.root, SYMBOL_EXTENSIONS):
+            seen.add(rel_path)
+            known = manifest.get(rel_path)
+            if known is None:
+                added += 1
+                pending.append((rel_path, None))
+                continue
+            st = entry.stat()
+            if st.st_size == known[0] and st.st_mtime_ns == known[1]:
+                unchanged += 1
+            else:
+                pending.append((rel_path, known[2]))
+        removed = [rel_path for rel_path in manifest if rel_path not in seen]
+        self.index.remove(removed)
+        parsed = self._store(self._parse(pending))
+        return self._stats(start, added=added, changed=parsed - added, touched=len(pending) - parsed,
+                           removed=len(removed), unchanged=unchanged)
+
+    def errors(self) -> List[Tuple[str, str]]:
+        """(path, error) for every file that could not be read or parsed."""
+        return self.index.conn.execute(
+            "SELECT path, error FROM files WHERE error IS NOT NULL ORDER BY path").fetchall()
@@ -0,0 +1,17 @@
+import re
+from typing import List, Tuple
+
+# Words, or single punctuation characters: `app.use(` → ["app", ".", "use", "("].
+# Keywords are matched as whole runs of these, so `with` does not match inside
+# `without`, and chunk budgets are counted in them.
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text)
+
+def count_tokens(text: str) -> int:
+    return len(TOKEN_PATTERN.findall(text))
+
+def keyword_tokens(keyword: str) -> Tuple[str, ...]:
+    """The token run a taxonomy keyword matches; empty for a keyword of only whitespace."""
+    return tuple(TOKEN_PATTERN.findall(keyword))